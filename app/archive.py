@@ -0,0 +1,160 @@
+import gzip
+import json
+import base64
+import time
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from utils.cache import TTLCache
+
+TABLE = "newsletter"
+# GSI on the newsletter table: partition key `type`, sort key `created` (YYYY-MM-DD),
+# projecting newsletterId so list pages never read the issue html
+TYPE_CREATED_INDEX = "type-created-index"
+LIST_PROJECTION = "newsletterId, #type, created"
+MAX_PAGE_SIZE = 100
+# bodies smaller than this are sent as they are; compressing them saves less than the headers cost
+MIN_COMPRESS_BYTES = 1024
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def encode_cursor(last_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not last_key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_key, sort_keys=True).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """LastEvaluatedKey of an opaque cursor; ValueError when it was not issued by encode_cursor"""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, dict) or not all(isinstance(value, str) for value in key.values()):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def content_etag(content: Optional[str]) -> str:
+    """ETag of an issue body; save_to_db stores it with the issue so readers can revalidate cheaply"""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()[:32]
+
+
+def parse_day(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+class RenderedIssue:
+    """An issue's html with its ETag; compressed variants are built on first request and kept"""
+
+    def __init__(self, item: Dict[str, Any]):
+        self.newsletter_id = item["newsletterId"]
+        self.type = item.get("type")
+        self.created = item.get("created")
+        self.body = (item.get("content") or "").encode("utf-8")
+        self.etag = item.get("etag") or content_etag(item.get("content"))
+        # issues saved before the etag attribute existed have none to revalidate against
+        self.stored_etag = item.get("etag")
+        self.checked = time.time()
+        self._encoded: Dict[str, bytes] = {}
+
+    def encodings(self):
+        """Codings this server can produce, in order of preference"""
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            return []
+        return ["br", "gzip"] if _brotli() else ["gzip"]
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if not encoding:
+            return self.body
+        if encoding not in self._encoded:
+            if encoding == "br":
+                self._encoded[encoding] = _brotli().compress(self.body, quality=5)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self._encoded[encoding]
+
+
+class Archive:
+    """
+    Read side of the newsletter table.
+    Issues are listed through the type/created GSI one page at a time and fetched by id
+    into an LRU of rendered issues, so repeated hits on the same issue or page are
+    served from memory instead of DynamoDB. A save in this process invalidates its
+    entries; issues re-saved by a worker process are caught by revalidating a cached
+    issue's stored etag at most every `revalidate` seconds, a read of one attribute.
+    DynamoDB errors propagate and are never cached.
+    """
+
+    def __init__(self, dynamo: Callable[[], Any], issue_ttl: float = 60 * 60, list_ttl: float = 60,
+                 maxsize: int = 128, revalidate: float = 60):
+        self.dynamo = dynamo
+        self.issues = TTLCache(issue_ttl, maxsize)
+        self.pages = TTLCache(list_ttl, maxsize)
+        self.revalidate = revalidate
+
+    def invalidate(self, newsletter_id: str) -> None:
+        """Forget a saved or re-saved issue and every listed page, which may now be missing it"""
+        self.issues.pop(newsletter_id)
+        self.pages.clear()
+
+    def list_issues(self, issue_type: str, since: Optional[str] = None, until: Optional[str] = None,
+                    limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Newest first; `since`/`until` are inclusive YYYY-MM-DD days"""
+        limit = min(max(1, limit), MAX_PAGE_SIZE)
+        key = (issue_type, since, until, limit, cursor)
+
+        def fetch():
+            condition, values = "#type = :type", {":type": issue_type}
+            if since and until:
+                condition += " AND created BETWEEN :since AND :until"
+                values.update({":since": since, ":until": until})
+            elif since:
+                condition += " AND created >= :since"
+                values[":since"] = since
+            elif until:
+                condition += " AND created <= :until"
+                values[":until"] = until
+            items, last_key = self.dynamo().query_page(
+                TABLE, condition, values, expression_names={"#type": "type"}, index_name=TYPE_CREATED_INDEX,
+                projection=LIST_PROJECTION, limit=limit, start_key=decode_cursor(cursor), newest_first=True
+            )
+            return {"issues": items, "next_cursor": encode_cursor(last_key)}
+
+        return self.pages.get_or_set(key, fetch)
+
+    def get_issue(self, newsletter_id: str) -> Optional[RenderedIssue]:
+        issue = self.issues.get(newsletter_id)
+        if issue and time.time() - issue.checked > self.revalidate:
+            stored = self.dynamo().get_item(TABLE, {"newsletterId": newsletter_id}, raise_errors=True,
+                                            projection="etag")
+            if stored.get("etag") == issue.stored_etag:
+                issue.checked = time.time()
+            else:
+                issue = None
+        if issue is None:
+            # read errors propagate, so a throttle or missing credentials never gets cached as a 404
+            item = self.dynamo().get_item(TABLE, {"newsletterId": newsletter_id}, raise_errors=True)
+            issue = RenderedIssue(item) if item else False
+            # unknown ids are remembered briefly so probing them does not turn into a read per hit
+            self.issues.set(newsletter_id, issue, ttl=None if item else self.pages.ttl)
+        return issue or None
+
+
+def _dynamo():
+    from app.main import get_dynamo
+    return get_dynamo()
+
+
+archive = Archive(_dynamo)
@@ -1,70 +1,82 @@
+import csv
 import time
+import asyncio
 import logging
-import schedule
-import configparser
-import pandas as pd
 from utils import utility
-from typing import Optional
-from services import EmailService
-from threading import Thread, Event
-from db_handler import sites, Dynamo, TaskType
-from builder.builder import NewsletterBuilder
+from functools import lru_cache
+from datetime import timedelta
+from app.scheduler import Scheduler, report_progress
+from app.archive import archive, content_etag
+from db_handler import sites, TaskType, JobQueue
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-stop_event = Event()
-scheduler_thread: Optional[Thread] = None
-scheduler_state = {"is_running": False, "is_paused": False, "task_type": None}
+RECIPIENTS_CSV = "db_handler/vault/recipients.csv"
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
-region = config["Dynamo"]["region"]
+# job name -> "module:function" run inside a scheduler worker process
+JOBS = {
+    TaskType.DAILY.value: "app.main:daily_task",
+    TaskType.WEEKLY.value: "app.main:weekly_task",
+    "generate_and_send": "app.main:generate_and_send_task"
+}
 
-dynamo = Dynamo(region)
+CRON = {
+    TaskType.DAILY.value: "0 0 * * *",
+    TaskType.WEEKLY.value: "0 0 * * 1"
+}
 
-df = pd.read_csv("db_handler/vault/recipients.csv")
-subscribers = df['email'].tolist()
+scheduler = Scheduler(JobQueue(), JOBS)
 
-def run_scheduler(task_type: str):
-    if task_type == TaskType.WEEKLY.value:
-        schedule.every().monday.at("00:00").do(weekly_task)
-        logging.info("Weekly scheduler started")
-    else:
-        schedule.every().day.at("00:00").do(daily_task)
-        logging.info("Daily scheduler started")
 
-    while not stop_event.is_set():
-        if not scheduler_state["is_paused"]:
-            schedule.run_pending()
-        time.sleep(1)
+@lru_cache(maxsize=1)
+def get_dynamo():
+    """DynamoDB client, created on first use so importing the app needs no AWS config"""
+    from db_handler import Dynamo
+    return Dynamo(utility.get_config()["Dynamo"]["region"])
 
-    schedule.clear()
-    scheduler_state["is_running"] = False
-    logging.info("Scheduler stopped")
 
+def get_subscribers():
+    with open(RECIPIENTS_CSV, newline='') as file:
+        return [row["email"] for row in csv.DictReader(file) if row.get("email")]
 
-async def generate_newsletter(sections, task_type):
-    if task_type == TaskType.WEEKLY.value:
-        urls = sites["gh_weekly_url"]
-    else:
-        urls = sites["gh_daily_url"]
 
-    weekly = NewsletterBuilder({
-        "gh_url": urls,
-        "gh_ftype": task_type},
-        dynamo)
+def restore_scheduler():
+    """Restart the scheduler on boot if triggers survived from a previous process"""
+    if scheduler.queue.list_triggers():
+        scheduler.start()
+
+
+async def in_thread(func, *args, **kwargs):
+    """Run blocking work off the event loop; coroutine functions get their own loop in the thread"""
+    if asyncio.iscoroutinefunction(func):
+        return await asyncio.to_thread(asyncio.run, func(*args, **kwargs))
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+def builder_vars(task_type):
+    from services.ingestion_service import is_store_fresh
+    weekly = task_type == TaskType.WEEKLY.value
+    return {
+        "gh_url": sites["gh_weekly_url"] if weekly else sites["gh_daily_url"],
+        "gh_ftype": task_type,
+        "from_store": is_store_fresh(),
+        "window": timedelta(days=7 if weekly else 1)
+    }
+
+
+async def generate_newsletter(sections, task_type, on_section_done=None):
+    from builder.builder import NewsletterBuilder
+    weekly = NewsletterBuilder(builder_vars(task_type), get_dynamo())
     weekly.set_sections(sections)
-    content = await weekly.section_generator()
+    content = await weekly.section_generator(on_section_done=on_section_done)
     newsletter_html = await weekly.build(content)
     return newsletter_html
 
 
 async def daily_task():
-    daily = NewsletterBuilder({
-        "gh_url": sites["gh_daily_url"],
-        "gh_ftype": "daily"},
-        dynamo)
+    from builder.builder import NewsletterBuilder
+    daily = NewsletterBuilder(builder_vars(TaskType.DAILY.value), get_dynamo())
     daily.set_sections(["news"])
     logger.info(f"starting generator")
     content = await daily.section_generator()
@@ -77,13 +89,12 @@ async def daily_task():
     logger.info(f"saved to db, sending email")
     await send_email(content=item["content"])
     logger.info(f"email sent")
+    return item["newsletterId"]
 
 
 async def weekly_task():
-    weekly = NewsletterBuilder({
-        "gh_url": sites["gh_weekly_url"],
-        "gh_ftype": "weekly"},
-        dynamo)
+    from builder.builder import NewsletterBuilder
+    weekly = NewsletterBuilder(builder_vars(TaskType.WEEKLY.value), get_dynamo())
     weekly.set_sections(["all"])
     logger.info(f"starting generator")
     content = await weekly.section_generator()
@@ -97,6 +108,32 @@ async def weekly_task():
     logger.info(f"saved to db, sending email")
     await send_email(content=item["content"])
     logger.info(f"email sent")
+    return item["newsletterId"]
+
+
+async def generate_and_send_task(sections, task_type, recipients=None):
+    recipients = recipients or get_subscribers()
+    report_progress(stage="generating", sections_done=0)
+    newsletter_html = await generate_newsletter(
+        sections, task_type,
+        on_section_done=lambda name, done, total: report_progress(
+            sections_done=done, sections_total=total, last_section=name)
+    )
+
+    report_progress(stage="saving")
+    item = save_to_db(newsletter_html, task_type)
+
+    report_progress(stage="sending", recipients_total=len(recipients), sent=0, failed=0)
+    started = time.time()
+
+    def on_email_progress(sent, failed, total):
+        elapsed = max(time.time() - started, 1e-6)
+        report_progress(sent=sent, failed=failed, recipients_total=total,
+                        throughput=round((sent + failed) / elapsed, 2))
+
+    email_result = await send_email(content=item["content"], recipients=recipients, on_progress=on_email_progress)
+    report_progress(stage="done")
+    return {"newsletterId": item["newsletterId"], "email_status": email_result}
 
 
 def save_to_db(content, content_type):
@@ -108,19 +145,34 @@ def save_to_db(content, content_type):
             "created": utility.get_formatted_timestamp()
         }
 
-        item_id = utility.generate_deterministic_id(item, key_fields=["item_name", "type"], prefix="nl")
+        # one id per type and day; keyed on type alone, every issue overwrote the previous one
+        item_id = utility.generate_deterministic_id(item, key_fields=["item_name", "type", "created"], prefix="nl")
         item["newsletterId"] = item_id
-        dynamo.add_item("newsletter", "newsletterId", item, False)
+        item["etag"] = content_etag(content)
+        get_dynamo().add_item("newsletter", "newsletterId", item, False)
+        # a same-day re-save reuses the id; readers in this process see the new body right away
+        archive.invalidate(item_id)
+        index_newsletter(item)
         return item
     except Exception as e:
         logging.info("Error saving to dynamo db", e)
 
 
-async def send_email(content=None, template_id=None, recipients=subscribers):
+def index_newsletter(item):
+    """Make a saved issue searchable; the archive itself stays the source of truth"""
+    try:
+        from services import SearchService
+        SearchService().index_newsletters([item])
+    except Exception as e:
+        logging.error(f"Error indexing newsletter {item.get('newsletterId')}: {str(e)}")
+
+
+async def send_email(content=None, template_id=None, recipients=None, on_progress=None):
+    from services import EmailService
     email_service = EmailService(
-        recipients=recipients,
+        recipients=recipients if recipients is not None else get_subscribers(),
         body_text = content,
         template_id=template_id
     )
-    result = email_service.send_email()
+    result = await asyncio.to_thread(email_service.send_email, on_progress)
     return result
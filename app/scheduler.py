@@ -0,0 +1,249 @@
+import os
+import time
+import asyncio
+import logging
+import importlib
+from functools import partial
+from contextvars import ContextVar
+from threading import Thread, Event, Lock
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Any, Dict, List, Optional, Set
+from db_handler import JobQueue, SchedulerState
+
+logger = logging.getLogger(__name__)
+
+# (low, high) per field; day-of-week accepts both 0 and 7 for sunday
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+class CronTrigger:
+    """Five-field cron expression (minute hour day-of-month month day-of-week), local time"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expression}'")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Cron field out of range: '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, t: datetime) -> bool:
+        day_ok = t.day in self.days
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+
+# (queue, job id) of the job running in this worker process, if any
+_current_job: ContextVar[Optional[tuple]] = ContextVar("current_job", default=None)
+
+
+def report_progress(**progress: Any) -> None:
+    """Merge progress fields into the running job's record; a no-op outside a scheduler job"""
+    current = _current_job.get()
+    if current is None:
+        return
+    queue, job_id = current
+    try:
+        queue.set_progress(job_id, {**progress, "updated_at": time.time()})
+    except Exception as e:
+        logger.error(f"Error reporting progress for job {job_id}: {str(e)}")
+
+
+def execute_job(target: str, payload: Dict[str, Any], job_id: Optional[str] = None,
+                queue_path: Optional[str] = None) -> Any:
+    """Runs in a worker process: import 'module:function' and call it, awaiting coroutines"""
+    if job_id and queue_path:
+        _current_job.set((JobQueue(queue_path), job_id))
+    module_name, func_name = target.split(":")
+    func = getattr(importlib.import_module(module_name), func_name)
+    if asyncio.iscoroutinefunction(func):
+        return asyncio.run(func(**payload))
+    return func(**payload)
+
+
+class Scheduler:
+    def __init__(self, queue: JobQueue, jobs: Dict[str, str], max_workers: Optional[int] = None,
+                 tick_seconds: float = 1.0, retry_backoff: float = 60.0):
+        self.queue = queue
+        self.jobs = jobs
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tick_seconds = tick_seconds
+        self.retry_backoff = retry_backoff
+        self.state = SchedulerState.STOPPED
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._running: Dict[str, Future] = {}
+        self._lock = Lock()
+
+    def start(self) -> bool:
+        if self.state != SchedulerState.STOPPED:
+            return False
+        recovered = self.queue.recover()
+        if recovered:
+            logger.info(f"Requeued {recovered} interrupted jobs")
+        self._stop_event.clear()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._thread = Thread(target=self._loop, name="scheduler", daemon=True)
+        self.state = SchedulerState.RUNNING
+        self._thread.start()
+        logger.info(f"Scheduler started with {self.max_workers} workers")
+        return True
+
+    def pause(self) -> bool:
+        if self.state != SchedulerState.RUNNING:
+            return False
+        self.state = SchedulerState.PAUSED
+        return True
+
+    def resume(self) -> bool:
+        if self.state != SchedulerState.PAUSED:
+            return False
+        self.state = SchedulerState.RUNNING
+        return True
+
+    def stop(self, clear_triggers: bool = True) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if clear_triggers:
+            self.queue.remove_trigger()
+        self._thread = None
+        self._pool = None
+        self.state = SchedulerState.STOPPED
+        logger.info("Scheduler stopped")
+
+    def add_trigger(self, name: str, job_name: str, cron: str, payload: Optional[Dict] = None) -> Optional[float]:
+        """Register a cron trigger; returns its first fire time, or None if the name is taken"""
+        if job_name not in self.jobs:
+            raise KeyError(f"Unknown job '{job_name}'")
+        next_run = CronTrigger(cron).next_after(datetime.now()).timestamp()
+        if not self.queue.add_trigger(name, job_name, cron, next_run, payload):
+            return None
+        return next_run
+
+    def submit(self, job_name: str, payload: Optional[Dict] = None, max_retries: int = 3) -> str:
+        if job_name not in self.jobs:
+            raise KeyError(f"Unknown job '{job_name}'")
+        return self.queue.enqueue(job_name, payload, max_retries=max_retries)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            running = list(self._running)
+        return {
+            "state": self.state.value,
+            "is_running": self.state != SchedulerState.STOPPED,
+            "workers": self.max_workers,
+            "running_jobs": running,
+            "jobs": self.queue.counts(),
+            "triggers": self.queue.list_triggers()
+        }
+
+    def _fire_triggers(self) -> None:
+        now = time.time()
+        for trigger in self.queue.due_triggers(now):
+            # runs missed while the scheduler was down or paused are caught up with a single job
+            self.queue.enqueue(trigger["job_name"], trigger["payload"])
+            next_run = CronTrigger(trigger["cron"]).next_after(datetime.now()).timestamp()
+            self.queue.advance_trigger(trigger["name"], now, next_run)
+            logger.info(f"Trigger {trigger['name']} fired, next run at {datetime.fromtimestamp(next_run)}")
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            free = self.max_workers - len(self._running)
+        claimed = self.queue.claim(free)
+        for index, job in enumerate(claimed):
+            target = self.jobs.get(job["name"])
+            if target is None:
+                self.queue.fail(job["id"], f"Unknown job '{job['name']}'", self.retry_backoff)
+                continue
+            try:
+                future = self._pool.submit(execute_job, target, job["payload"], job["id"], self.queue.path)
+            except Exception as e:
+                # a broken pool (a worker died) rejects every submit: hand the claimed jobs back and start over
+                for unsent in claimed[index:]:
+                    self.queue.fail(unsent["id"], f"Dispatch failed: {str(e)}", self.retry_backoff)
+                self._restart_pool()
+                logger.error(f"Dispatch failed, requeued {len(claimed) - index} jobs: {str(e)}")
+                return
+            with self._lock:
+                self._running[job["id"]] = future
+            future.add_done_callback(partial(self._on_done, job["id"]))
+            logger.info(f"Dispatched job {job['name']} ({job['id']}), attempt {job['attempts']}")
+
+    def _restart_pool(self) -> None:
+        pool, self._pool = self._pool, ProcessPoolExecutor(max_workers=self.max_workers)
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            self._running.pop(job_id, None)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.queue.complete(job_id, future.result())
+            logger.info(f"Job {job_id} succeeded")
+        else:
+            status = self.queue.fail(job_id, str(error), self.retry_backoff)
+            logger.error(f"Job {job_id} failed ({status}): {str(error)}")
+
+    def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            if self.state == SchedulerState.RUNNING:
+                try:
+                    self._fire_triggers()
+                    self._dispatch()
+                except Exception as e:
+                    logger.error(f"Scheduler tick failed: {str(e)}")
+            self._stop_event.wait(self.tick_seconds)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.queue.list_jobs(status, limit)
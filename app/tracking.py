@@ -0,0 +1,76 @@
+import time
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from db_handler import EngagementLog, engagement_log
+
+logger = logging.getLogger(__name__)
+
+
+class Tracker:
+    """
+    Buffers tracking hits in memory and writes them to the engagement log in batches.
+    record() is a list append, so a burst right after a send never waits on SQLite;
+    a background task flushes every `flush_seconds` or as soon as a batch fills up.
+    """
+
+    def __init__(self, log: Optional[EngagementLog] = None, batch_size: int = 1000,
+                 flush_seconds: float = 2.0, max_buffer: int = 200_000):
+        self.log = log
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer: List[Tuple[str, str, Optional[str], float]] = []
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, key: str, kind: str, edition: Optional[str] = None) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            # the log is falling behind; shed load rather than grow without bound
+            self.dropped += 1
+            return
+        self._buffer.append((key, kind, edition, time.time()))
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def flush(self) -> int:
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        if self.log is None:
+            self.log = await asyncio.to_thread(engagement_log)
+        try:
+            await asyncio.to_thread(self.log.append, batch)
+            await asyncio.to_thread(self.log.aggregate)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} tracking events: {str(e)}")
+            self._buffer = batch + self._buffer
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._batch_ready = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+tracker = Tracker()
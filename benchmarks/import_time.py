@@ -0,0 +1,59 @@
+"""
+Import-time benchmark for the app entry points.
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per module
+and reports the cumulative import time plus the top-level packages that cost the most
+(self time summed over each package and its submodules).
+
+    python benchmarks/import_time.py                  # launch, router.routes, app.main
+    python benchmarks/import_time.py app.main --top 20
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from typing import List, Tuple
+
+DEFAULT_MODULES = ["launch", "router.routes", "app.main"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> List[Tuple[int, int, str]]:
+    """Returns (self_us, cumulative_us, package) for every import made while importing `module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, package = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), package.rstrip()))
+    return rows
+
+
+def report(module: str, top: int) -> None:
+    rows = measure(module)
+    total = next((cum for _, cum, pkg in reversed(rows) if pkg.strip() == module), sum(r[0] for r in rows))
+    print(f"{module}: {total / 1000:.1f} ms cumulative, {len(rows)} modules imported")
+
+    by_package = {}
+    for self_us, _, package in rows:
+        root = package.strip().split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+    for root, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {root}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold import time of app entry points")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="number of heaviest top-level imports to list")
+    args = parser.parse_args()
+
+    for name in args.modules:
+        report(name, args.top)
@@ -1,12 +1,15 @@
 import re
 import logging
 import asyncio
-from typing import Dict, Any
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, Optional
 from services import *
 from typing import List
-from db_handler import rss_feed
+from db_handler import rss_feed, FeedRegistry
 from datetime import datetime
 from utils.utility import load_template, truncate_text
+from utils.tracking_utility import item_key, click_link, open_pixel, feedback_link
 from db_handler import NewsItem, Competitions, ResearchPaper, Products, Repo, Event, NewsletterContent
 
 logging.basicConfig(
@@ -15,6 +18,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# section task name -> NewsletterContent field; the "news" task fills highlights and breaking_news
+SECTION_FIELDS = {
+    "papers": "research_papers",
+    "competitions": "latest_competitions",
+    "products": "top_products",
+    "github": "github_trending",
+    "events": "upcoming_events"
+}
+
+
+@lru_cache(maxsize=4)
+def warm_services(gh_url: str, gh_ftype: str, from_store: bool, window) -> SimpleNamespace:
+    """
+    Section services for one build configuration, kept for the life of the process.
+    Services return per-run results and keep no growing state, so consecutive and
+    concurrent builds can share them along with their clients and caches. Feed urls
+    are not part of that state: each build resolves them from the registry.
+    """
+    return SimpleNamespace(
+        news=NewsService(rss_feed, from_store=from_store, window=window),
+        research=ResearchService(from_store=from_store, window=window),
+        github=GitHubScanner(gh_url, gh_ftype, from_store=from_store),
+        product=ProductService(from_store=from_store),
+        competition=CompetitionService(),
+        events=EventsService()
+    )
+
+
 class NewsletterBuilder:
     def __init__(self, dict_vars: Dict, db_object: Any, brand_name: str = "AiLert", template_path: str = "static/newsletter.html", sections=None):
         self.sections = sections if sections else ["all"]
@@ -22,16 +53,25 @@ class NewsletterBuilder:
         self.template_path = template_path
         self.db_object = db_object
         self.template = load_template(self.template_path)
-        self.news_service = NewsService(rss_feed)
-        self.research_service = ResearchService()
-        self.github_service = GitHubScanner(dict_vars["gh_url"], dict_vars["gh_ftype"])
-        self.product_service = ProductService()
-        self.competition_service = CompetitionService()
-        self.events_service = EventsService()
+        # identifies this issue in click/open/feedback tracking
+        self.edition = dict_vars.get("edition") or f"{dict_vars['gh_ftype']}-{datetime.now():%Y-%m-%d}"
+        services = warm_services(dict_vars["gh_url"], dict_vars["gh_ftype"],
+                                 dict_vars.get("from_store", False), dict_vars.get("window"))
+        self.news_service = services.news
+        # feeds added or retired in the registry since the services were warmed take effect on this build
+        self.news_service.rss_urls = FeedRegistry().urls(rss_feed)
+        self.research_service = services.research
+        self.github_service = services.github
+        self.product_service = services.product
+        self.competition_service = services.competition
+        self.events_service = services.events
 
     def set_sections(self, sections):
         self.sections = sections
 
+    def _link(self, kind: str, link: str) -> str:
+        return click_link(link, item_key(kind, link), self.edition)
+
     def _format_highlights(self, highlights: List[dict]) -> str:
         """Format highlights section with proper list items"""
         formatted_items = []
@@ -65,7 +105,7 @@ class NewsletterBuilder:
 
             formatted.append(
                 '<div class="news-item">'
-                f'<div class="news-title"><a href="{item.link}" target="_blank">{item.title}</a></div>'
+                f'<div class="news-title"><a href="{self._link("news", item.link)}" target="_blank">{item.title}</a></div>'
                 f'<p>{truncate_text(item.description, 300)}...</p>'
                 f'{engagement_html}'
                 '</div>'
@@ -82,7 +122,7 @@ class NewsletterBuilder:
 
             formatted.append(
                 '<div class="news-item">'
-                f'<div class="news-title"><a href="{paper.link}" target="_blank">{paper.title}</a></div>'
+                f'<div class="news-title"><a href="{self._link("paper", paper.link)}" target="_blank">{paper.title}</a></div>'
                 f'<p>Authors: {", ".join(paper.authors)}</p>'
                 f'<p>{truncate_text(paper.abstract, 250)}...</p>'
                 f'<p>Published in: {paper.publication}</p>'
@@ -96,7 +136,7 @@ class NewsletterBuilder:
         for comp in competitions:
             formatted.append(
                 '<div class="news-item">'
-                f'<div class="news-title"><a href="{comp.link}" target="_blank">{comp.name}</a></div>'
+                f'<div class="news-title"><a href="{self._link("competition", comp.link)}" target="_blank">{comp.name}</a></div>'
                 f'<p>Deadline: {comp.deadline}</p>'
                 f'<p>Reward: <b>${comp.reward}</b></p>'
                 '</div>'
@@ -113,7 +153,7 @@ class NewsletterBuilder:
 
             formatted.append(
                 '<div class="news-item">'
-                f'<div class="news-title"><a href="{product.link}" target="_blank">{product.name}</a></div>'
+                f'<div class="news-title"><a href="{self._link("product", product.link)}" target="_blank">{product.name}</a></div>'
                 f'<p>{truncate_text(product.summary, 200)}...</p>'
                 f'{engagement_html}'
                 '</div>'
@@ -130,7 +170,7 @@ class NewsletterBuilder:
 
             formatted.append(
                 '<div class="news-item">'
-                f'<div class="news-title"><a href="https://github.com/{repo.name}" target="_blank">{repo.name}</a></div>'
+                f'<div class="news-title"><a href="{self._link("repo", repo.link or f"https://github.com/{repo.name}")}" target="_blank">{repo.name}</a></div>'
                 f'<p>{truncate_text(repo.summary, 200)}...</p>'
                 f'{engagement_html}'
                 '</div>'
@@ -150,9 +190,36 @@ class NewsletterBuilder:
             )
         return chr(10).join(formatted)
 
-    async def section_generator(self, selected_sections: List[str] = None) -> NewsletterContent:
+    @staticmethod
+    def _track_progress(tasks: List[asyncio.Task], on_section_done: Optional[Callable[[str, int, int], None]]):
+        if not on_section_done:
+            return
+        done = []
+
+        def _done(task: asyncio.Task):
+            done.append(task.get_name())
+            on_section_done(task.get_name(), len(done), len(tasks))
+
+        for task in tasks:
+            task.add_done_callback(_done)
+
+    @staticmethod
+    def _collect(tasks: List[asyncio.Task], results: List[Any], content: Dict[str, Any]):
+        for task, result in zip(tasks, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error in {task.get_name()}: {str(result)}")
+                continue
+            logger.info(f"Successfully completed {task.get_name()}")
+            if task.get_name() == "news":
+                content["highlights"], content["breaking_news"] = result.summary, result.news
+            else:
+                content[SECTION_FIELDS[task.get_name()]] = result
+
+    async def section_generator(self, selected_sections: List[str] = None,
+                                on_section_done: Optional[Callable[[str, int, int], None]] = None) -> NewsletterContent:
+        """Generate the selected sections; on_section_done(name, done, total) fires as each one finishes"""
         if not selected_sections:
-            selected_sections = ["all"]
+            selected_sections = self.sections or ["all"]
 
         content = {
             "highlights": None,
@@ -168,39 +235,21 @@ class NewsletterBuilder:
             if "all" in selected_sections:
                 logger.info("Generating all sections")
                 tasks = [
-                    asyncio.create_task(self.news_service.get_highlights(3), name="highlights"),
-                    asyncio.create_task(self.news_service.get_news(), name="news"),
+                    asyncio.create_task(self.news_service.get_digest(3), name="news"),
                     asyncio.create_task(self.research_service.get_latest_papers(), name="papers"),
                     asyncio.create_task(self.competition_service.get_latest_competitions(), name="competitions"),
                     asyncio.create_task(self.product_service.get_latest_products(), name="products"),
                     asyncio.create_task(self.github_service.get_trending_repos(), name="github"),
                     asyncio.create_task(self.events_service.get_upcoming_events(), name="events")
                 ]
+                self._track_progress(tasks, on_section_done)
                 completed_tasks = await asyncio.gather(*tasks, return_exceptions=True)
-
-                for task, result in zip(tasks, completed_tasks):
-                    if isinstance(result, Exception):
-                        logger.error(f"Error in {task.get_name()}: {str(result)}")
-                    else:
-                        logger.info(f"Successfully completed {task.get_name()}")
-                        content_key = {
-                            "highlights": "highlights",
-                            "news": "breaking_news",
-                            "papers": "research_papers",
-                            "competitions": "latest_competitions",
-                            "products": "top_products",
-                            "github": "github_trending",
-                            "events": "upcoming_events"
-                        }[task.get_name()]
-                        content[content_key] = result
+                self._collect(tasks, completed_tasks, content)
             else:
                 tasks = []
                 if "news" in selected_sections:
                     logger.info("Generating news sections")
-                    tasks.extend([
-                        asyncio.create_task(self.news_service.get_highlights(10), name="highlights"),
-                        asyncio.create_task(self.news_service.get_news(), name="news")
-                    ])
+                    tasks.append(asyncio.create_task(self.news_service.get_digest(10), name="news"))
                 if "papers" in selected_sections:
                     logger.info("Generating research section")
                     tasks.append(asyncio.create_task(self.research_service.get_latest_papers(), name="papers"))
@@ -217,22 +266,9 @@ class NewsletterBuilder:
                     logger.info("Generating upcoming events")
                     tasks.append(asyncio.create_task(self.events_service.get_upcoming_events(), name="events"))
 
+                self._track_progress(tasks, on_section_done)
                 completed_tasks = await asyncio.gather(*tasks, return_exceptions=True)
-                for task, result in zip(tasks, completed_tasks):
-                    if isinstance(result, Exception):
-                        logger.error(f"Error in {task.get_name()}: {str(result)}")
-                    else:
-                        logger.info(f"Successfully completed {task.get_name()}")
-                        content_key = {
-                            "highlights": "highlights",
-                            "news": "breaking_news",
-                            "papers": "research_papers",
-                            "competitions": "latest_competitions",
-                            "products": "top_products",
-                            "github": "github_trending",
-                            "events": "upcoming_events"
-                        }[task.get_name()]
-                        content[content_key] = result
+                self._collect(tasks, completed_tasks, content)
 
         except Exception as e:
             logger.error(f"Error generating sections: {str(e)}")
@@ -251,19 +287,20 @@ class NewsletterBuilder:
         </div>'''
 
     def _format_feedback_section(self) -> str:
-        return '''
+        return f'''
         <div class="section feedback-section">
             <h2 class="section-title">💝 Enjoying AiLert?</h2>
             <p>Your feedback shapes our future editions!</p>
             <div class="feedback-buttons">
-                <button class="feedback-button positive">
+                <a href="{feedback_link(self.edition, "up")}" class="feedback-button positive">
                     <i class="fas fa-thumbs-up"></i> Loving It!
-                </button>
-                <button class="feedback-button negative">
+                </a>
+                <a href="{feedback_link(self.edition, "down")}" class="feedback-button negative">
                     <i class="fas fa-thumbs-down"></i> Could Be Better
-                </button>
+                </a>
             </div>
-        </div>'''
+        </div>
+        {open_pixel(self.edition)}'''
 
     async def build(self, content: NewsletterContent) -> str:
         logger.info("Starting newsletter build")
@@ -1,4 +1,16 @@
 from db_handler.db import *
 from db_handler.models import *
-from db_handler.dynamo import Dynamo
-from db_handler.vault.links import rss_feed, sites
\ No newline at end of file
+from db_handler.job_queue import JobQueue
+from db_handler.engagement_log import EngagementLog, engagement_log
+from db_handler.event_index import EventIndex
+from db_handler.feed_registry import FeedRegistry
+from db_handler.search_index import SearchIndex
+from db_handler.vault.links import rss_feed, sites
+
+
+def __getattr__(name):
+    # boto3 is slow to import and only needed once something talks to DynamoDB
+    if name == "Dynamo":
+        from db_handler.dynamo import Dynamo
+        return Dynamo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -139,3 +139,274 @@ def load_features():
     with open(FEATURES_FILE, 'rb') as f:
         features = pickle.load(f)
     return features
+
+# linear paper ranking model, trained incrementally by the ingestion worker (see services/rank_model.py)
+RANK_MODEL_FILE = os.path.join(DATA_DIR, 'rank_model.p')
+
+def save_rank_model(model):
+    """ saves the paper ranking model to disk in a simple pickle file """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    safe_pickle_dump(model, RANK_MODEL_FILE)
+
+_rank_model_cache = {}
+
+def load_rank_model():
+    """ loads the paper ranking model from disk, None if it was never trained; reused until the file changes """
+    if not os.path.isfile(RANK_MODEL_FILE):
+        return None
+    mtime = os.path.getmtime(RANK_MODEL_FILE)
+    cached = _rank_model_cache.get(RANK_MODEL_FILE)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(RANK_MODEL_FILE, 'rb') as f:
+        model = pickle.load(f)
+    _rank_model_cache[RANK_MODEL_FILE] = (mtime, model)
+    return model
+
+# inverted keyword index over ingested papers (see services/keyword_index.py)
+PAPER_INDEX_FILE = os.path.join(DATA_DIR, 'paper_index.p')
+
+def save_paper_index(index):
+    """ saves the paper keyword index to disk in a simple pickle file """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    safe_pickle_dump(index, PAPER_INDEX_FILE)
+
+_paper_index_cache = {}
+
+def load_paper_index():
+    """ loads the paper keyword index from disk, None if it was never built; reused until the file changes """
+    if not os.path.isfile(PAPER_INDEX_FILE):
+        return None
+    mtime = os.path.getmtime(PAPER_INDEX_FILE)
+    cached = _paper_index_cache.get(PAPER_INDEX_FILE)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(PAPER_INDEX_FILE, 'rb') as f:
+        index = pickle.load(f)
+    _paper_index_cache[PAPER_INDEX_FILE] = (mtime, index)
+    return index
+
+# -----------------------------------------------------------------------------
+"""
+the semantic index keeps its dense float32 vectors in a flat file that is
+memory-mapped on load and only ever appended to; ids, timestamps and lsh buckets
+are pickled next to it. compaction writes a new generation of the file, which
+the pickle then points at, so a reader holding the previous pickle still maps
+the file it was written against. generation 0 is the original vectors.f32.
+"""
+
+VECTORS_FILE = os.path.join(DATA_DIR, 'vectors.f32')
+VECTOR_INDEX_FILE = os.path.join(DATA_DIR, 'vector_index.p')
+
+def vectors_file(generation=0):
+    return VECTORS_FILE if not generation else os.path.join(DATA_DIR, f'vectors.{generation}.f32')
+
+def append_vectors(vectors, rows, generation=0):
+    """
+    appends rows of float32 vectors after the first `rows` already in the file.
+    rows written after the index was last saved (e.g. a crash in between) are
+    truncated away first so row numbers stay aligned with the saved index.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(vectors_file(generation), 'ab') as f:
+        f.truncate(rows * vectors.shape[1] * 4)
+        f.write(vectors.astype('float32').tobytes())
+
+def write_vectors(vectors, generation):
+    """ writes a new generation of the vectors file, e.g. after dropping removed rows """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open_atomic(vectors_file(generation), 'wb') as f:
+        f.write(vectors.astype('float32').tobytes())
+
+def drop_vectors(before):
+    """ deletes vector file generations older than `before` """
+    for generation in range(before):
+        path = vectors_file(generation)
+        if os.path.isfile(path):
+            os.remove(path)
+
+def open_vectors(dim, rows, generation=0):
+    """ memory-maps the first `rows` vectors read-only """
+    import numpy as np
+    path = vectors_file(generation)
+    if rows == 0 or not os.path.isfile(path):
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode='r', shape=(rows, dim))
+
+def save_vector_index(index):
+    """ saves the semantic index metadata in a simple pickle file """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    safe_pickle_dump(index, VECTOR_INDEX_FILE)
+
+def load_vector_index():
+    """ loads the semantic index metadata, None if it was never built """
+    if not os.path.isfile(VECTOR_INDEX_FILE):
+        return None
+    with open(VECTOR_INDEX_FILE, 'rb') as f:
+        index = pickle.load(f)
+    return index
+
+# -----------------------------------------------------------------------------
+"""
+the ingestion store holds everything the background ingestion worker has pulled
+in (news, papers, products, repos). as with papers, the heavy payload lives in a
+compressed table and a lightweight metas table carries kind/time for filtering.
+"""
+
+# stores ingested items and their lighter-weight metadata
+ITEMS_DB_FILE = os.path.join(DATA_DIR, 'items.db')
+
+def get_items_db(flag='r', autocommit=True):
+    assert flag in ['r', 'c']
+    idb = CompressedSqliteDict(ITEMS_DB_FILE, tablename='items', flag=flag, autocommit=autocommit)
+    return idb
+
+def get_item_metas_db(flag='r', autocommit=True):
+    assert flag in ['r', 'c']
+    imdb = SqliteDict(ITEMS_DB_FILE, tablename='metas', flag=flag, autocommit=autocommit)
+    return imdb
+
+def get_ingest_state_db(flag='r', autocommit=True):
+    assert flag in ['r', 'c']
+    sdb = SqliteDict(ITEMS_DB_FILE, tablename='state', flag=flag, autocommit=autocommit)
+    return sdb
+
+def save_ingested(kind, items, time_key='time'):
+    """ upserts a dict of key -> item into the store, keeping the first-seen time """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    # two connections on one file would lock each other, so write the tables one at a time
+    with get_item_metas_db(flag='c', autocommit=False) as imdb:
+        for key, item in items.items():
+            meta = imdb.get(key)
+            first_seen = meta['first_seen'] if meta else item['ingested']
+            imdb[key] = {'kind': kind, 'time': item.get(time_key) or first_seen, 'first_seen': first_seen}
+        imdb.commit()
+    with get_items_db(flag='c', autocommit=False) as idb:
+        for key, item in items.items():
+            idb[key] = item
+        idb.commit()
+
+def load_ingested(kind, since=0.0):
+    """ returns the stored items of one kind whose time is at or after `since` (epoch seconds) """
+    if not os.path.isfile(ITEMS_DB_FILE):
+        return []
+    with get_item_metas_db() as imdb:
+        keys = [k for k, m in imdb.items() if m['kind'] == kind and m['time'] >= since]
+    with get_items_db() as idb:
+        return [idb[k] for k in keys if k in idb]
+
+def get_ingested(keys):
+    """ returns the stored items for the given keys, in order, skipping missing ones """
+    if not os.path.isfile(ITEMS_DB_FILE):
+        return []
+    with get_items_db() as idb:
+        return [idb[k] for k in keys if k in idb]
+
+def prune_ingested(before):
+    """ drops every stored item whose time is before `before` (epoch seconds) """
+    if not os.path.isfile(ITEMS_DB_FILE):
+        return 0
+    with get_item_metas_db(flag='c', autocommit=False) as imdb:
+        stale = [k for k, m in imdb.items() if m['time'] < before]
+        for k in stale:
+            del imdb[k]
+        imdb.commit()
+    with get_items_db(flag='c', autocommit=False) as idb:
+        for k in stale:
+            if k in idb:
+                del idb[k]
+        idb.commit()
+    return len(stale)
+
+def mark_ingested(source, when):
+    """ records when a source was last swept by the ingestion worker """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with get_ingest_state_db(flag='c') as sdb:
+        sdb[source] = when
+
+def last_ingested(source):
+    """ epoch seconds of the last successful sweep of a source, 0 if never """
+    if not os.path.isfile(ITEMS_DB_FILE):
+        return 0.0
+    with get_ingest_state_db() as sdb:
+        return sdb.get(source, 0.0)
+
+# -----------------------------------------------------------------------------
+"""
+the job queue and its cron triggers live in a plain sqlite file, shared by the
+api process and the scheduler's worker processes (see db_handler/job_queue.py)
+"""
+
+JOBS_DB_FILE = os.path.join(DATA_DIR, 'jobs.db')
+
+# -----------------------------------------------------------------------------
+"""
+click/open/feedback hits from sent newsletters go to an append-only sqlite log
+that is folded into per-item counts (see db_handler/engagement_log.py)
+"""
+
+ENGAGEMENT_DB_FILE = os.path.join(DATA_DIR, 'engagement.db')
+
+# -----------------------------------------------------------------------------
+"""
+collected events live in a small sqlite index keyed by normalized title + date,
+with the start date stored as epoch seconds so "upcoming" is a range query
+(see db_handler/event_index.py)
+"""
+
+EVENTS_DB_FILE = os.path.join(DATA_DIR, 'events.db')
+
+# -----------------------------------------------------------------------------
+"""
+raw http responses cached by the shared client (see utils/http_client.py), one
+zlib-compressed pickle per request key, fanned out over two-character subdirs.
+AILERT_HTTP_CACHE_DIR points record/replay runs at a fixture directory instead
+"""
+
+HTTP_CACHE_DIR = os.environ.get('AILERT_HTTP_CACHE_DIR', os.path.join(DATA_DIR, 'http_cache'))
+
+def _http_cache_path(key):
+    return os.path.join(HTTP_CACHE_DIR, key[:2], key + '.z')
+
+def save_http_response(key, record):
+    """ stores one response record under a hex request key """
+    path = _http_cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open_atomic(path, 'wb') as f:
+        f.write(zlib.compress(pickle.dumps(record, -1)))
+
+def load_http_response(key):
+    """ the record stored under a request key, None if there is none """
+    path = _http_cache_path(key)
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.loads(zlib.decompress(f.read()))
+
+def prune_http_cache(before):
+    """ deletes cached responses stored before `before` (epoch seconds) """
+    pruned = 0
+    for root, _, files in os.walk(HTTP_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.getmtime(path) < before:
+                os.remove(path)
+                pruned += 1
+    return pruned
+
+# -----------------------------------------------------------------------------
+"""
+feeds found or re-checked by the discovery tool, with their size, latency and
+health, kept in a sqlite registry read next to the static rss_feed list
+(see db_handler/feed_registry.py and discover_feeds.py)
+"""
+
+FEEDS_DB_FILE = os.path.join(DATA_DIR, 'feeds.db')
+
+# -----------------------------------------------------------------------------
+"""
+full-text index over ingested items and archived newsletter issues, an sqlite
+fts5 table kept in sync with a plain docs table (see db_handler/search_index.py)
+"""
+
+SEARCH_DB_FILE = os.path.join(DATA_DIR, 'search.db')
@@ -2,7 +2,7 @@ import uuid
 import boto3
 from utils import utility
 from botocore.exceptions import ClientError
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 
 
 class Dynamo:
@@ -78,12 +78,19 @@ class Dynamo:
             print(f"Error adding item: {e}")
             return ""
 
-    def get_item(self, table_name: str, key: Dict[str, Any]) -> Dict:
+    def get_item(self, table_name: str, key: Dict[str, Any], raise_errors: bool = False,
+                 projection: Optional[str] = None) -> Dict:
+        """{} when the item does not exist; with `raise_errors`, failures raise instead of looking like that"""
         try:
             table = self.dynamodb.Table(table_name)
-            response = table.get_item(Key=key)
+            params = {'Key': key}
+            if projection:
+                params['ProjectionExpression'] = projection
+            response = table.get_item(**params)
             return response.get('Item', {})
         except ClientError as e:
+            if raise_errors:
+                raise
             print(f"Error getting item: {e}")
             return {}
 
@@ -197,4 +204,64 @@ class Dynamo:
             return response.get('Items', [])
         except ClientError as e:
             print(f"Error scanning items: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def scan_all(self, table_name: str, page_size: int = 100) -> Iterator[Dict]:
+        """Every item of the table, following LastEvaluatedKey one page at a time"""
+        table = self.dynamodb.Table(table_name)
+        params = {'Limit': page_size}
+        while True:
+            try:
+                response = table.scan(**params)
+            except ClientError as e:
+                print(f"Error scanning items: {e}")
+                return
+            yield from response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                return
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def query_page(self,
+                   table_name: str,
+                   key_condition_expression: str,
+                   expression_values: Dict[str, Any],
+                   expression_names: Optional[Dict[str, str]] = None,
+                   index_name: Optional[str] = None,
+                   projection: Optional[str] = None,
+                   limit: Optional[int] = None,
+                   start_key: Optional[Dict[str, Any]] = None,
+                   newest_first: bool = False) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        One page of a query and the key to resume from
+
+        Args:
+            expression_names: placeholders for reserved attribute names such as `type`
+            projection: ProjectionExpression, so list views skip large attributes
+            start_key: LastEvaluatedKey of the previous page
+            newest_first: walk the sort key in descending order
+        Returns:
+            (items, last_key), last_key is None on the final page
+        Raises:
+            ClientError / BotoCoreError: unlike the other helpers, so callers that cache
+            pages never mistake a missing index or a throttle for an empty result
+        """
+        table = self.dynamodb.Table(table_name)
+        params = {
+            'KeyConditionExpression': key_condition_expression,
+            'ExpressionAttributeValues': expression_values,
+            'ScanIndexForward': not newest_first
+        }
+
+        if expression_names:
+            params['ExpressionAttributeNames'] = expression_names
+        if index_name:
+            params['IndexName'] = index_name
+        if projection:
+            params['ProjectionExpression'] = projection
+        if limit:
+            params['Limit'] = limit
+        if start_key:
+            params['ExclusiveStartKey'] = start_key
+
+        response = table.query(**params)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
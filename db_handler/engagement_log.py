@@ -0,0 +1,108 @@
+import os
+import sqlite3
+from functools import lru_cache
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+from db_handler.db import ENGAGEMENT_DB_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    edition TEXT,
+    ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counts (
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (key, kind)
+);
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+# sqlite's default limit on bound parameters per statement
+MAX_PARAMS = 999
+
+
+class EngagementLog:
+    """
+    Append-only log of tracking hits backed by SQLite.
+    Writers only ever insert batches into `events`; aggregate() folds everything
+    past a watermark into per-(key, kind) counts, which rankers read.
+    """
+
+    def __init__(self, path: str = ENGAGEMENT_DB_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def append(self, events: List[Tuple[str, str, Optional[str], float]]) -> int:
+        """Insert (key, kind, edition, ts) rows in one transaction"""
+        if not events:
+            return 0
+        with self._connection() as conn:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("BEGIN")
+            conn.executemany("INSERT INTO events (key, kind, edition, ts) VALUES (?, ?, ?, ?)", events)
+            conn.execute("COMMIT")
+        return len(events)
+
+    def aggregate(self) -> int:
+        """Fold events past the watermark into counts and return how many were folded"""
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT value FROM state WHERE name = 'aggregated'").fetchone()
+            watermark = int(row[0]) if row else 0
+            last = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+            if last > watermark:
+                # "WHERE true" disambiguates the upsert clause from a join for sqlite's parser
+                conn.execute(
+                    "INSERT INTO counts (key, kind, count) "
+                    "SELECT key, kind, COUNT(*) FROM events WHERE id > ? AND id <= ? AND true GROUP BY key, kind "
+                    "ON CONFLICT (key, kind) DO UPDATE SET count = count + excluded.count",
+                    (watermark, last)
+                )
+                conn.execute("INSERT OR REPLACE INTO state (name, value) VALUES ('aggregated', ?)", (last,))
+            conn.execute("COMMIT")
+        return max(last - watermark, 0)
+
+    def prune(self, before: float) -> int:
+        """Drop already-aggregated events older than `before`; counts are kept"""
+        with self._connection() as conn:
+            row = conn.execute("SELECT value FROM state WHERE name = 'aggregated'").fetchone()
+            cursor = conn.execute("DELETE FROM events WHERE ts < ? AND id <= ?", (before, int(row[0]) if row else 0))
+            return cursor.rowcount
+
+    def counts(self, keys: Iterable[str], kind: str = "click") -> Dict[str, int]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._connection() as conn:
+            for i in range(0, len(keys), MAX_PARAMS - 1):
+                chunk = keys[i:i + MAX_PARAMS - 1]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(conn.execute(
+                    f"SELECT key, count FROM counts WHERE kind = ? AND key IN ({placeholders})",
+                    [kind, *chunk]
+                ).fetchall())
+        return {key: found.get(key, 0) for key in keys}
+
+
+@lru_cache(maxsize=1)
+def engagement_log() -> EngagementLog:
+    """The shared log; connections are opened per call, so one instance serves every thread"""
+    return EngagementLog()
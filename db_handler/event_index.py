@@ -0,0 +1,109 @@
+import os
+import re
+import time
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from db_handler.db import EVENTS_DB_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    starts REAL,
+    date TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    source TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_starts ON events (starts);
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def event_key(title: str, starts: Optional[float]) -> str:
+    """Normalized title plus start day, so the same event from two sites collapses to one row"""
+    normalized = re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+    day = time.strftime("%Y-%m-%d", time.gmtime(starts)) if starts is not None else ""
+    return f"{normalized}|{day}"
+
+
+class EventIndex:
+    """Persistent index of collected events backed by SQLite"""
+
+    def __init__(self, path: str = EVENTS_DB_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def upsert(self, events: List[Dict[str, Any]]) -> int:
+        """Insert or refresh events carrying title, starts (epoch or None), date, location, description, source"""
+        now = time.time()
+        rows = [(event_key(e["title"], e.get("starts")), e["title"], e.get("starts"), e.get("date", ""),
+                 e.get("location", ""), e.get("description", ""), e.get("source"), now, now)
+                for e in events if e.get("title")]
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO events (key, title, starts, date, location, description, source, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET last_seen = excluded.last_seen, "
+                "location = CASE WHEN excluded.location != '' THEN excluded.location ELSE location END, "
+                "description = CASE WHEN length(excluded.description) > length(description) "
+                "THEN excluded.description ELSE description END",
+                rows
+            )
+            conn.execute("INSERT OR REPLACE INTO state (name, value) VALUES ('collected', ?)", (now,))
+            conn.execute("COMMIT")
+        return len(rows)
+
+    def upcoming(self, since: Optional[float] = None, until: Optional[float] = None,
+                 limit: int = 10) -> List[Dict[str, Any]]:
+        """Dated events starting in [since, until), soonest first"""
+        since = time.time() if since is None else since
+        query = "SELECT * FROM events WHERE starts >= ?"
+        params: List[Any] = [since]
+        if until is not None:
+            query += " AND starts < ?"
+            params.append(until)
+        query += " ORDER BY starts LIMIT ?"
+        params.append(limit)
+        with self._connection() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def undated(self, seen_since: float, limit: int = 10) -> List[Dict[str, Any]]:
+        """Recently seen events whose date could not be parsed"""
+        with self._connection() as conn:
+            return [dict(row) for row in conn.execute(
+                "SELECT * FROM events WHERE starts IS NULL AND last_seen >= ? ORDER BY last_seen DESC LIMIT ?",
+                (seen_since, limit)
+            )]
+
+    def prune(self, before: float) -> int:
+        """Drop events that started before `before` and undated ones not seen since then"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM events WHERE starts < ? OR (starts IS NULL AND last_seen < ?)", (before, before)
+            )
+            return cursor.rowcount
+
+    def last_collected(self) -> float:
+        with self._connection() as conn:
+            row = conn.execute("SELECT value FROM state WHERE name = 'collected'").fetchone()
+            return row["value"] if row else 0.0
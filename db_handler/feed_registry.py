@@ -0,0 +1,107 @@
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+from db_handler.db import FEEDS_DB_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    site TEXT,
+    entries INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    latency_ms REAL NOT NULL DEFAULT 0,
+    active INTEGER NOT NULL DEFAULT 1,
+    failures INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    added REAL NOT NULL,
+    checked REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feeds_active ON feeds (active, latency_ms);
+"""
+
+# consecutive failed checks before a feed drops out of the sweep
+MAX_FAILURES = 3
+
+
+class FeedRegistry:
+    """
+    Validated feeds backed by SQLite.
+    The discovery tool records every check here; the news sweep reads the active
+    feeds next to the static list, so growing the source list needs no code edit.
+    """
+
+    def __init__(self, path: str = FEEDS_DB_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record_valid(self, feeds: List[Dict[str, Any]]) -> int:
+        """Upsert feeds that passed a check: url, title, site, entries, size_bytes, latency_ms"""
+        now = time.time()
+        rows = [(f["url"], f.get("title", ""), f.get("site"), f.get("entries", 0), f.get("size_bytes", 0),
+                 f.get("latency_ms", 0.0), now, now) for f in feeds]
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO feeds (url, title, site, entries, size_bytes, latency_ms, added, checked) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET title = excluded.title, "
+                "site = COALESCE(excluded.site, site), entries = excluded.entries, "
+                "size_bytes = excluded.size_bytes, latency_ms = excluded.latency_ms, "
+                "active = 1, failures = 0, last_error = NULL, checked = excluded.checked",
+                rows
+            )
+            conn.execute("COMMIT")
+        return len(rows)
+
+    def record_failed(self, failures: Dict[str, str]) -> int:
+        """Count a failed check for feeds already registered; they go inactive after MAX_FAILURES"""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE feeds SET failures = failures + 1, last_error = ?, checked = ?, "
+                "active = CASE WHEN failures + 1 >= ? THEN 0 ELSE active END WHERE url = ?",
+                [(error, now, MAX_FAILURES, url) for url, error in failures.items()]
+            )
+            conn.execute("COMMIT")
+        return len(failures)
+
+    def active_urls(self, max_latency_ms: Optional[float] = None) -> List[str]:
+        """Active feeds, fastest first"""
+        query = "SELECT url FROM feeds WHERE active = 1"
+        params: List[Any] = []
+        if max_latency_ms is not None:
+            query += " AND latency_ms <= ?"
+            params.append(max_latency_ms)
+        with self._connection() as conn:
+            return [row["url"] for row in conn.execute(query + " ORDER BY latency_ms", params)]
+
+    def urls(self, static: Iterable[str] = ()) -> List[str]:
+        """The static list followed by registered active feeds not already in it"""
+        static = list(static)
+        seen = set(static)
+        return static + [url for url in self.active_urls() if url not in seen]
+
+    def all(self) -> List[Dict[str, Any]]:
+        with self._connection() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM feeds ORDER BY url")]
+
+    def remove(self, urls: Iterable[str]) -> int:
+        with self._connection() as conn:
+            cursor = conn.executemany("DELETE FROM feeds WHERE url = ?", [(url,) for url in urls])
+            return cursor.rowcount
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from db_handler.db import JOBS_DB_FILE
+from db_handler.models import JobStatus
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL DEFAULT 3,
+    run_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    progress TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_run_at ON jobs (status, run_at);
+CREATE TABLE IF NOT EXISTS triggers (
+    name TEXT PRIMARY KEY,
+    job_name TEXT NOT NULL,
+    cron TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    next_run REAL NOT NULL,
+    last_run REAL
+);
+"""
+
+
+class JobQueue:
+    """Persistent job queue and trigger table backed by SQLite"""
+
+    def __init__(self, path: str = JOBS_DB_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "progress" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN progress TEXT")
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else {}
+        return job
+
+    def enqueue(self, name: str, payload: Optional[Dict] = None,
+                run_at: Optional[float] = None, max_retries: int = 3) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, name, payload, status, max_retries, run_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, name, json.dumps(payload or {}), JobStatus.QUEUED.value,
+                 max_retries, run_at or now, now)
+            )
+        return job_id
+
+    def claim(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """Atomically move up to `limit` due jobs to running and return them"""
+        if limit <= 0:
+            return []
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND run_at <= ? ORDER BY run_at LIMIT ?",
+                (JobStatus.QUEUED.value, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(JobStatus.RUNNING.value, now, row["id"]) for row in rows]
+            )
+            conn.execute("COMMIT")
+        jobs = [self._job_dict(row) for row in rows]
+        for job in jobs:
+            job["status"] = JobStatus.RUNNING.value
+            job["attempts"] += 1
+        return jobs
+
+    def complete(self, job_id: str, result: Any = None) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = NULL WHERE id = ?",
+                (JobStatus.SUCCEEDED.value, time.time(), json.dumps(result, default=str), job_id)
+            )
+
+    def fail(self, job_id: str, error: str, backoff: float = 60.0) -> str:
+        """Requeue the job with exponential backoff, or mark it failed once retries run out"""
+        with self._connection() as conn:
+            row = conn.execute("SELECT attempts, max_retries FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return JobStatus.FAILED.value
+            now = time.time()
+            if row["attempts"] <= row["max_retries"]:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, run_at = ?, error = ? WHERE id = ?",
+                    (JobStatus.QUEUED.value, now + backoff * 2 ** (row["attempts"] - 1), error, job_id)
+                )
+                return JobStatus.QUEUED.value
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                (JobStatus.FAILED.value, now, error, job_id)
+            )
+            return JobStatus.FAILED.value
+
+    def set_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        """Merge `progress` into the job's progress document"""
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = json_patch(COALESCE(progress, '{}'), ?) WHERE id = ?",
+                (json.dumps(progress, default=str), job_id)
+            )
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a process that died mid-job"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ? WHERE status = ?",
+                (JobStatus.QUEUED.value, time.time(), JobStatus.RUNNING.value)
+            )
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job_dict(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._connection() as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._job_dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def add_trigger(self, name: str, job_name: str, cron: str, next_run: float,
+                    payload: Optional[Dict] = None) -> bool:
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO triggers (name, job_name, cron, payload, next_run) VALUES (?, ?, ?, ?, ?)",
+                (name, job_name, cron, json.dumps(payload or {}), next_run)
+            )
+            return cursor.rowcount == 1
+
+    def remove_trigger(self, name: Optional[str] = None) -> int:
+        """Remove one trigger by name, or every trigger when no name is given"""
+        with self._connection() as conn:
+            if name:
+                return conn.execute("DELETE FROM triggers WHERE name = ?", (name,)).rowcount
+            return conn.execute("DELETE FROM triggers").rowcount
+
+    def list_triggers(self) -> List[Dict[str, Any]]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT * FROM triggers ORDER BY name").fetchall()
+        return [{**dict(row), "payload": json.loads(row["payload"])} for row in rows]
+
+    def due_triggers(self, now: float) -> List[Dict[str, Any]]:
+        return [t for t in self.list_triggers() if t["next_run"] <= now]
+
+    def advance_trigger(self, name: str, last_run: float, next_run: float) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE triggers SET last_run = ?, next_run = ? WHERE name = ?", (last_run, next_run, name)
+            )
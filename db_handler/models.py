@@ -1,6 +1,8 @@
 from enum import Enum
 from pydantic import BaseModel
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
 class TaskType(Enum):
     DAILY = "daily"
@@ -11,6 +13,12 @@ class SchedulerState(Enum):
     PAUSED = "paused"
     STOPPED = "stopped"
 
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
 class NewsItem(BaseModel):
     title: str
     description: str
@@ -20,6 +28,50 @@ class NewsItem(BaseModel):
     engagement: Optional[str] = None
     additional_info: Optional[dict] = None
 
+@dataclass(slots=True)
+class FeedItem:
+    """
+    Compact internal record for the fetch -> dedup -> score path.
+    Sources are interned and dates are epoch seconds (0.0 when unknown);
+    only the final top-N are converted to NewsItem.
+    """
+    title: str
+    description: str
+    link: str
+    source: str
+    published: float = 0.0
+    author: Optional[str] = None
+    categories: Tuple[str, ...] = ()
+    guid: Optional[str] = None
+    score: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return self.link or self.guid or self.title
+
+    @property
+    def text(self) -> str:
+        return f"{self.title} {self.description}"
+
+    def to_news_item(self, read_time: int, engagement: Optional[str] = None) -> NewsItem:
+        published = datetime.fromtimestamp(self.published, timezone.utc) if self.published \
+            else datetime.min.replace(tzinfo=timezone.utc)
+        return NewsItem(
+            title=self.title,
+            description=self.description,
+            link=self.link,
+            read_time=read_time,
+            source=self.source,
+            engagement=engagement,
+            additional_info={
+                'published_date': published,
+                'author': self.author,
+                'categories': list(self.categories),
+                'guid': self.guid,
+                'importance_score': self.score
+            }
+        )
+
 class Competitions(BaseModel):
     name: str
     link: str
@@ -32,6 +84,7 @@ class Repo(BaseModel):
     summary: str
     source: Optional[str] = None
     engagement: Optional[str] = None
+    additional_info: Optional[dict] = None
 
 class Products(BaseModel):
     name: str
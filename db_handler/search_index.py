@@ -0,0 +1,143 @@
+import os
+import re
+import time
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+from db_handler.db import SEARCH_DB_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL DEFAULT '',
+    link TEXT,
+    source TEXT,
+    published REAL,
+    indexed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_kind_published ON docs (kind, published);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, body, content='docs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO docs_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+"""
+
+# bm25 column weights: a hit in the title counts ten times a hit in the body
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+TERM_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def match_query(text: str) -> str:
+    """
+    Turn free text into a safe fts5 query: every word must match, a trailing * keeps
+    prefix search, and fts5 operators typed by the user are treated as plain words.
+    """
+    terms = []
+    for term in TERM_RE.findall(text):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """Full-text index over ingested items and newsletter issues backed by SQLite FTS5"""
+
+    def __init__(self, path: str = SEARCH_DB_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def add(self, docs: Iterable[Dict[str, Any]], replace: bool = False) -> int:
+        """
+        Index docs carrying key, kind, title, body, link, source, published (epoch or None).
+        Keys already indexed are skipped unless `replace`, so re-ingesting a sweep only
+        tokenizes what is new. Returns the number of rows written.
+        """
+        now = time.time()
+        rows = [(d["key"], d["kind"], d.get("title") or "", d.get("body") or "", d.get("link"),
+                 d.get("source"), d.get("published"), now) for d in docs]
+        conflict = ("DO UPDATE SET kind = excluded.kind, title = excluded.title, body = excluded.body, "
+                    "link = excluded.link, source = excluded.source, published = excluded.published, "
+                    "indexed = excluded.indexed") if replace else "DO NOTHING"
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            # total_changes also counts fts5's internal writes, so count rows instead
+            before = conn.execute("SELECT count(*) FROM docs").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO docs (key, kind, title, body, link, source, published, indexed) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) {conflict}",
+                rows
+            )
+            after = conn.execute("SELECT count(*) FROM docs").fetchone()[0]
+            conn.execute("COMMIT")
+        return len(rows) if replace else after - before
+
+    def search(self, query: str, kinds: Optional[List[str]] = None, since: Optional[float] = None,
+               page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        """One page of matches, best first, with a highlighted snippet and the total match count"""
+        match = match_query(query)
+        if not match:
+            return {"total": 0, "results": []}
+        where = "docs_fts MATCH ?"
+        params: List[Any] = [match]
+        if kinds:
+            where += f" AND docs.kind IN ({', '.join('?' * len(kinds))})"
+            params += kinds
+        if since is not None:
+            where += " AND docs.published >= ?"
+            params.append(since)
+        joined = "FROM docs_fts JOIN docs ON docs.id = docs_fts.rowid WHERE " + where
+        with self._connection() as conn:
+            total = conn.execute(f"SELECT count(*) {joined}", params).fetchone()[0]
+            rows = conn.execute(
+                "SELECT docs.key, docs.kind, docs.title, docs.link, docs.source, docs.published, "
+                "snippet(docs_fts, 1, '<mark>', '</mark>', '…', 24) AS snippet, "
+                f"bm25(docs_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS rank "
+                f"{joined} ORDER BY rank LIMIT ? OFFSET ?",
+                params + [per_page, (page - 1) * per_page]
+            ).fetchall()
+        results = []
+        for row in rows:
+            result = dict(row)
+            result["score"] = -result.pop("rank")
+            results.append(result)
+        return {"total": total, "results": results}
+
+    def prune(self, before: float, kinds: Iterable[str]) -> int:
+        """Drop docs of the given kinds published (or, if undated, indexed) before `before`"""
+        kinds = list(kinds)
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM docs WHERE kind IN ({', '.join('?' * len(kinds))}) "
+                "AND COALESCE(published, indexed) < ?", kinds + [before]
+            )
+            return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT count(*) FROM docs").fetchone()[0]
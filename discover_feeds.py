@@ -0,0 +1,29 @@
+import argparse
+from db_handler import FeedRegistry, rss_feed
+from services.crawler.feed_discovery import FeedDiscovery
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate candidate feeds or sites and add the working feeds to the registry")
+    parser.add_argument("urls", nargs="*", help="feed urls or site pages to search for <link rel=alternate> feeds")
+    parser.add_argument("--file", help="file with one candidate url per line")
+    parser.add_argument("--recheck", action="store_true", help="re-validate the static list and every registered feed")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-latency-ms", type=float, default=None, help="reject feeds slower than this")
+    parser.add_argument("--dry-run", action="store_true", help="report without writing to the registry")
+    args = parser.parse_args()
+
+    registry = FeedRegistry()
+    candidates = list(args.urls)
+    if args.file:
+        with open(args.file) as f:
+            candidates += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if args.recheck:
+        candidates += rss_feed + [feed["url"] for feed in registry.all()]
+
+    checks = FeedDiscovery(args.concurrency, args.max_latency_ms).run(candidates, None if args.dry_run else registry)
+    for check in sorted(checks, key=lambda c: (not c.ok, c.latency_ms)):
+        status = "ok  " if check.ok else "fail"
+        detail = f"{check.entries} entries, {check.size_bytes / 1024:.0f} KiB" if check.ok else check.error
+        print(f"{status} {check.latency_ms:7.0f}ms  {check.url}  ({detail})")
+    print(f"{sum(c.ok for c in checks)} valid of {len(checks)} checked")
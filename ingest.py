@@ -0,0 +1,24 @@
+import argparse
+from db_handler import rss_feed
+from services import IngestionService
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Continuously ingest feeds, papers, products and repos into the local store")
+    parser.add_argument("--once", action="store_true", help="run a single forced sweep and exit")
+    parser.add_argument("--poll", type=int, default=30, help="seconds between interval checks")
+    parser.add_argument("--retention-days", type=int, default=8)
+    parser.add_argument("--index-archive", action="store_true", help="backfill the search index from the newsletter archive and exit")
+    parser.add_argument("--train-ranker", action="store_true", help="retrain the paper ranking model on the stored history and exit")
+    args = parser.parse_args()
+
+    worker = IngestionService(rss_feed, retention_days=args.retention_days)
+    if args.index_archive:
+        from app.main import get_dynamo
+        print(f"indexed {worker.search_service.index_archive(get_dynamo())} newsletters")
+    elif args.train_ranker:
+        print(f"trained on {worker.train_rank_model(epochs=5)} papers")
+    elif args.once:
+        print(worker.run_once(force=True))
+    else:
+        worker.run_forever(poll_seconds=args.poll)
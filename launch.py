@@ -1,13 +1,31 @@
-from flask import Flask
-from router.routes import bp, limiter
 import os
+import uvicorn
+from quart import Quart
+from router.routes import bp, track_bp, archive_bp, limiter
+from app.main import restore_scheduler, scheduler
+from app.tracking import tracker
 
-app = Flask(__name__)
+app = Quart(__name__)
 
 limiter.init_app(app)
 app.register_blueprint(bp)
+app.register_blueprint(track_bp)
+app.register_blueprint(archive_bp)
+
+
+@app.before_serving
+async def startup():
+    restore_scheduler()
+    tracker.start()
+
+
+@app.after_serving
+async def shutdown():
+    # keep triggers so the next boot picks them up again
+    scheduler.stop(clear_triggers=False)
+    await tracker.stop()
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5001))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    uvicorn.run(app, host="0.0.0.0", port=port)
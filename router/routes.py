@@ -1,39 +1,54 @@
 import os
 import csv
+import json
+import base64
+import asyncio
 from app.main import *
-from db_handler import TaskType, SchedulerState
+from app.tracking import tracker
+from app.archive import archive, parse_day
+from db_handler import TaskType, SchedulerState, JobStatus
 from utils.auth_utility import create_token, token_required
 from utils.utility import is_valid_email, is_email_subscribed, save_to_csv
+from utils.tracking_utility import verify
 
-from flask_cors import CORS
-from flask_limiter import Limiter
-from flask import Blueprint, jsonify, request
-from flask_limiter.util import get_remote_address
+from datetime import timedelta
+from quart_cors import cors
+from quart import Blueprint, jsonify, request, make_response, redirect
+from quart_rate_limiter import RateLimiter, RateLimit, rate_limit, rate_exempt
 
 
 bp = Blueprint("ailert", __name__, url_prefix="/internal/v1")
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["10 per day", "2 per hour"]
+limiter = RateLimiter(
+    default_limits=[RateLimit(10, timedelta(days=1)), RateLimit(2, timedelta(hours=1))]
 )
 
-CORS(bp, resources={
-    r"/api/*": {
-        "origins": ["https://ailert.tech"],
-        "methods": ["GET", "POST", "PUT", "DELETE"],
-        "allow_headers": ["Content-Type", "Authorization"]
-    }
-})
+bp = cors(
+    bp,
+    allow_origin=["https://ailert.tech"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Content-Type", "Authorization"]
+)
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
-user_id = config["JWT"]["user_id"]
+# public endpoints hit from sent newsletters: signed links, no auth, no rate limit
+track_bp = Blueprint("tracking", __name__, url_prefix="/t")
+
+# public past-issues pages: read-only and served from the archive caches, so not rate limited
+archive_bp = cors(
+    Blueprint("archive", __name__, url_prefix="/archive"),
+    allow_origin=["https://ailert.tech"],
+    allow_methods=["GET"]
+)
+
+TERMINAL_JOB_STATUSES = {JobStatus.SUCCEEDED.value, JobStatus.FAILED.value}
+
+# 1x1 transparent gif
+PIXEL_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
 
 
 @bp.route('/login', methods=['POST'])
-def login():
-    token = create_token(user_id)
+async def login():
+    token = create_token(utility.get_config()["JWT"]["user_id"])
     return jsonify({
         "status": "success",
         "token": token
@@ -41,72 +56,60 @@ def login():
 
 
 @bp.route('/start-scheduler/<task_type>', methods=['POST'])
-@limiter.limit("5 per hour")
+@rate_limit(5, timedelta(hours=1))
 @token_required
-def start_scheduler(task_type):
+async def start_scheduler(task_type):
     if task_type not in [t.value for t in TaskType]:
         return jsonify({
             "status": "error",
             "message": "Invalid task type. Use 'daily' or 'weekly'"
         }), 400
 
-    if scheduler_state["is_running"]:
+    next_run = scheduler.add_trigger(task_type, task_type, CRON[task_type])
+    if next_run is None:
         return jsonify({
             "status": "error",
-            "message": "Scheduler is already running"
+            "message": f"{task_type} scheduler is already running"
         }), 400
 
-    stop_event.clear()
-    scheduler_state["is_running"] = True
-    scheduler_state["is_paused"] = False
-    scheduler_state["task_type"] = task_type
-
-    scheduler_thread.start()
+    scheduler.start()
 
     return jsonify({
         "status": "success",
         "message": f"{task_type} scheduler started successfully",
-        "state": SchedulerState.RUNNING.value
+        "state": scheduler.state.value,
+        "next_run": next_run
     })
 
 
 @bp.route('/manage-scheduler/<action>', methods=['POST'])
-@limiter.limit("5 per hour")
+@rate_limit(5, timedelta(hours=1))
 @token_required
-def manage_scheduler(action):
-    if not scheduler_state["is_running"]:
+async def manage_scheduler(action):
+    if scheduler.state == SchedulerState.STOPPED:
         return jsonify({
             "status": "error",
             "message": "No scheduler is currently running"
         }), 400
 
     if action == "pause":
-        if scheduler_state["is_paused"]:
+        if not scheduler.pause():
             return jsonify({
                 "status": "error",
                 "message": "Scheduler is already paused"
             }), 400
-        scheduler_state["is_paused"] = True
-        state = SchedulerState.PAUSED.value
         message = "Scheduler paused successfully"
 
     elif action == "resume":
-        if not scheduler_state["is_paused"]:
+        if not scheduler.resume():
             return jsonify({
                 "status": "error",
                 "message": "Scheduler is not paused"
             }), 400
-        scheduler_state["is_paused"] = False
-        state = SchedulerState.RUNNING.value
         message = "Scheduler resumed successfully"
 
     elif action == "stop":
-        stop_event.set()
-        if scheduler_thread:
-            scheduler_thread.join()
-        schedule.clear()
-        scheduler_state["task_type"] = None
-        state = SchedulerState.STOPPED.value
+        scheduler.stop()
         message = "Scheduler stopped successfully"
 
     else:
@@ -118,35 +121,161 @@ def manage_scheduler(action):
     return jsonify({
         "status": "success",
         "message": message,
-        "state": state,
-        "task_type": scheduler_state["task_type"]
+        "state": scheduler.state.value,
+        "task_types": [t["name"] for t in scheduler.queue.list_triggers()]
     })
 
 
 @bp.route('/scheduler-status', methods=['GET'])
-@limiter.limit("5 per hour")
+@rate_limit(5, timedelta(hours=1))
 @token_required
-def get_scheduler_status():
-    if not scheduler_state["is_running"]:
-        state = SchedulerState.STOPPED.value
-    elif scheduler_state["is_paused"]:
-        state = SchedulerState.PAUSED.value
-    else:
-        state = SchedulerState.RUNNING.value
+async def get_scheduler_status():
+    return jsonify(scheduler.status())
+
+
+@bp.route('/jobs', methods=['GET'])
+@rate_limit(60, timedelta(hours=1))
+@token_required
+async def list_jobs():
+    status = request.args.get('status')
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({
+        "status": "success",
+        "jobs": scheduler.list_jobs(status, min(limit, 500))
+    })
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@rate_limit(60, timedelta(hours=1))
+@token_required
+async def get_job(job_id):
+    job = scheduler.queue.get(job_id)
+    if not job:
+        return jsonify({
+            "status": "error",
+            "message": "Job not found"
+        }), 404
+    return jsonify({
+        "status": "success",
+        "job": job
+    })
+
+
+@bp.route('/jobs/<job_id>/events', methods=['GET'])
+@rate_limit(60, timedelta(hours=1))
+@token_required
+async def stream_job(job_id):
+    if not await in_thread(scheduler.queue.get, job_id):
+        return jsonify({
+            "status": "error",
+            "message": "Job not found"
+        }), 404
+
+    async def events():
+        last_payload, idle_ticks = None, 0
+        while True:
+            job = await in_thread(scheduler.queue.get, job_id)
+            payload = json.dumps({
+                "status": job["status"],
+                "attempts": job["attempts"],
+                "progress": job["progress"],
+                "error": job["error"]
+            }, default=str)
+            if payload != last_payload:
+                yield f"event: progress\ndata: {payload}\n\n".encode()
+                last_payload, idle_ticks = payload, 0
+            elif idle_ticks >= 15:
+                yield b": keepalive\n\n"
+                idle_ticks = 0
+            if job["status"] in TERMINAL_JOB_STATUSES:
+                yield f"event: end\ndata: {json.dumps(job['result'], default=str)}\n\n".encode()
+                return
+            idle_ticks += 1
+            await asyncio.sleep(1)
+
+    response = await make_response(events(), 200, {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    response.timeout = None
+    return response
+
+
+@bp.route('/search', methods=['GET'])
+@rate_limit(120, timedelta(hours=1))
+@token_required
+async def search():
+    from services import SearchService
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({
+            "status": "error",
+            "message": "Missing required query parameter: q"
+        }), 400
 
+    kinds = [kind for kind in request.args.get('kind', '').split(',') if kind] or None
+    found = await in_thread(SearchService().search, query, kinds, request.args.get('since', type=float),
+                            request.args.get('page', 1, type=int), request.args.get('per_page', 20, type=int))
     return jsonify({
-        "is_running": scheduler_state["is_running"],
-        "state": state,
-        "task_type": scheduler_state["task_type"]
+        "status": "success",
+        **found
     })
 
 
+@bp.route('/similar', methods=['GET'])
+@rate_limit(120, timedelta(hours=1))
+@token_required
+async def similar():
+    from dataclasses import asdict
+    from db_handler import rss_feed
+    from services import NewsService, ResearchService
+    kind, text, item_id = request.args.get('kind', 'news'), request.args.get('q'), request.args.get('id')
+    k = min(max(1, request.args.get('k', 5, type=int)), 50)
+    if kind not in ('news', 'paper') or not (text or item_id):
+        return jsonify({
+            "status": "error",
+            "message": "Use kind=news|paper with a q text or the id of a stored item"
+        }), 400
+
+    if kind == 'news':
+        items = [asdict(item) for item in await in_thread(NewsService(rss_feed).similar_news, text, None, k, item_id)]
+    else:
+        items = await in_thread(ResearchService(top_n=k).similar_papers, text, item_id, k)
+    return jsonify({
+        "status": "success",
+        "kind": kind,
+        "results": items
+    })
+
+
+@bp.route('/run-job/<task_type>', methods=['POST'])
+@rate_limit(5, timedelta(hours=1))
+@token_required
+async def run_job(task_type):
+    # generate_and_send is queued by /generate-newsletter with its payload; only the scheduled tasks run bare
+    if task_type not in {task.value for task in TaskType}:
+        return jsonify({
+            "status": "error",
+            "message": "Invalid task type. Use 'daily' or 'weekly'"
+        }), 400
+
+    job_id = scheduler.submit(task_type)
+    scheduler.start()
+
+    return jsonify({
+        "status": "success",
+        "message": f"{task_type} job queued",
+        "job_id": job_id
+    }), 202
+
+
 @bp.route('/generate-newsletter', methods=['POST'])
-@limiter.limit("5 per hour")
+@rate_limit(5, timedelta(hours=1))
 @token_required
 async def api_generate_newsletter():
     try:
-        data = request.get_json()
+        data = await request.get_json()
 
         if not data:
             return jsonify({
@@ -172,7 +301,7 @@ async def api_generate_newsletter():
                 "timestamp": utility.get_formatted_timestamp()
             }), 400
 
-        newsletter_html = await generate_newsletter(sections, task_type)
+        newsletter_html = await in_thread(generate_newsletter, sections, task_type)
 
         return jsonify({
             "status": "success",
@@ -191,11 +320,11 @@ async def api_generate_newsletter():
 
 
 @bp.route('/save-newsletter', methods=['POST'])
-@limiter.limit("5 per hour")
+@rate_limit(5, timedelta(hours=1))
 @token_required
-def api_save_newsletter():
+async def api_save_newsletter():
     try:
-        data = request.get_json()
+        data = await request.get_json()
 
         if not data:
             return jsonify({
@@ -221,7 +350,7 @@ def api_save_newsletter():
                 "timestamp": utility.get_formatted_timestamp()
             }), 400
 
-        saved_item = save_to_db(content, content_type)
+        saved_item = await in_thread(save_to_db, content, content_type)
 
         return jsonify({
             "status": "success",
@@ -240,11 +369,11 @@ def api_save_newsletter():
 
 
 @bp.route('/send-email', methods=['POST'])
-@limiter.limit("5 per hour")
+@rate_limit(5, timedelta(hours=1))
 @token_required
 async def api_send_email():
     try:
-        data = request.get_json()
+        data = await request.get_json()
 
         if not data:
             return jsonify({
@@ -264,7 +393,7 @@ async def api_send_email():
                 "timestamp": utility.get_formatted_timestamp()
             }), 400
 
-        result = await send_email(recipients, content, template_id)
+        result = await send_email(content=content, template_id=template_id, recipients=recipients or get_subscribers())
 
         return jsonify({
             **result,  # Include all fields from the EmailService response
@@ -281,11 +410,11 @@ async def api_send_email():
 
 
 @bp.route('/generate-and-send', methods=['POST'])
-@limiter.limit("5 per hour")
+@rate_limit(5, timedelta(hours=1))
 @token_required
 async def api_generate_and_send():
     try:
-        data = request.get_json()
+        data = await request.get_json()
 
         if not data:
             return jsonify({
@@ -305,22 +434,29 @@ async def api_generate_and_send():
                 "timestamp": utility.get_formatted_timestamp()
             }), 400
 
-        # Generate newsletter
-        newsletter_html = await generate_newsletter(sections, task_type)
-
-        # Save to database
-        saved_item = save_to_db(newsletter_html, task_type)
+        if task_type not in [TaskType.WEEKLY.value, TaskType.DAILY.value]:
+            return jsonify({
+                "status": "error",
+                "message": f"Invalid task_type. Must be either 'weekly' or 'daily'",
+                "timestamp": utility.get_formatted_timestamp()
+            }), 400
 
-        # Send email
-        email_result = await send_email(recipients, saved_item["content"], saved_item["newsletterId"])
+        # Sending is not idempotent, so the job is never retried automatically
+        job_id = scheduler.submit("generate_and_send", {
+            "sections": sections,
+            "task_type": task_type,
+            "recipients": recipients
+        }, max_retries=0)
+        scheduler.start()
 
         return jsonify({
-            "status": "success",
-            "message": "Newsletter generated and sent successfully",
-            "newsletterId": saved_item["newsletterId"],
-            "email_status": email_result,
+            "status": "accepted",
+            "message": "Newsletter generation and sending queued",
+            "job_id": job_id,
+            "status_url": f"{bp.url_prefix}/jobs/{job_id}",
+            "events_url": f"{bp.url_prefix}/jobs/{job_id}/events",
             "timestamp": utility.get_formatted_timestamp()
-        })
+        }), 202
 
     except Exception as e:
         logging.error(f"Error in generate and send workflow: {str(e)}")
@@ -332,9 +468,9 @@ async def api_generate_and_send():
 
 
 @bp.route('/subscribe', methods=['POST'])
-def subscribe():
+async def subscribe():
     try:
-        data = request.get_json()
+        data = await request.get_json()
 
         if not data or 'email' not in data:
             return jsonify({
@@ -382,9 +518,9 @@ def subscribe():
 
 
 @bp.route('/unsubscribe', methods=['POST'])
-def unsubscribe():
+async def unsubscribe():
     try:
-        data = request.get_json()
+        data = await request.get_json()
 
         if not data or 'email' not in data:
             return jsonify({
@@ -440,3 +576,111 @@ def unsubscribe():
             "timestamp": utility.get_formatted_timestamp()
         }), 500
 
+
+@track_bp.route('/c', methods=['GET'])
+@rate_exempt
+async def track_click():
+    key, edition, url = request.args.get("k", ""), request.args.get("e", ""), request.args.get("u", "")
+    if not verify(request.args.get("s", ""), key, edition, url):
+        return jsonify({
+            "status": "error",
+            "message": "Invalid tracking link"
+        }), 400
+
+    tracker.record(key, "click", edition)
+    return redirect(url)
+
+
+@track_bp.route('/o/<edition>.gif', methods=['GET'])
+@rate_exempt
+async def track_open(edition):
+    # always serve the pixel; only signed opens are counted
+    if verify(request.args.get("s", ""), edition):
+        tracker.record(edition, "open", edition)
+    response = await make_response(PIXEL_GIF)
+    response.headers["Content-Type"] = "image/gif"
+    response.headers["Cache-Control"] = "no-store, max-age=0"
+    return response
+
+
+@track_bp.route('/f', methods=['GET'])
+@rate_exempt
+async def track_feedback():
+    edition, vote = request.args.get("e", ""), request.args.get("v", "")
+    if vote not in ("up", "down") or not verify(request.args.get("s", ""), edition, vote):
+        return jsonify({
+            "status": "error",
+            "message": "Invalid feedback link"
+        }), 400
+
+    tracker.record(edition, vote, edition)
+    return "<p>Thanks for your feedback!</p>"
+
+
+@archive_bp.route('/newsletters', methods=['GET'])
+@rate_exempt
+async def list_newsletters():
+    issue_type = request.args.get('type', TaskType.WEEKLY.value)
+    if issue_type not in [t.value for t in TaskType]:
+        return jsonify({
+            "status": "error",
+            "message": "Invalid type. Use 'daily' or 'weekly'"
+        }), 400
+
+    try:
+        since, until = parse_day(request.args.get('since')), parse_day(request.args.get('until'))
+        page = await in_thread(archive.list_issues, issue_type, since, until,
+                               request.args.get('limit', 20, type=int), request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid query: {str(e)}"
+        }), 400
+    except Exception as e:
+        logging.error(f"Error listing newsletters: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Newsletter archive unavailable",
+            "timestamp": utility.get_formatted_timestamp()
+        }), 503
+
+    response = jsonify({
+        "status": "success",
+        "type": issue_type,
+        **page
+    })
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return response
+
+
+@archive_bp.route('/newsletters/<newsletter_id>', methods=['GET'])
+@rate_exempt
+async def get_newsletter(newsletter_id):
+    try:
+        issue = await in_thread(archive.get_issue, newsletter_id)
+    except Exception as e:
+        logging.error(f"Error reading newsletter {newsletter_id}: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Newsletter archive unavailable",
+            "timestamp": utility.get_formatted_timestamp()
+        }), 503
+    if issue is None:
+        return jsonify({
+            "status": "error",
+            "message": "Newsletter not found"
+        }), 404
+
+    headers = {
+        "ETag": f'"{issue.etag}"',
+        "Cache-Control": "public, max-age=300",
+        "Vary": "Accept-Encoding"
+    }
+    if request.if_none_match.contains_weak(issue.etag):
+        return "", 304, headers
+
+    encoding = request.accept_encodings.best_match(issue.encodings())
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    headers["Content-Type"] = "text/html; charset=utf-8"
+    return await in_thread(issue.encoded, encoding), 200, headers
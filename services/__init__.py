@@ -1,11 +1,17 @@
-from services.news_service import NewsService
-from services.event_service import EventsService
-from services.research_service import ResearchService
-from services.apps.gh_service import GitHubScanner
-from services.competition_service import CompetitionService
-from services.product_service import ProductService
-from services.email_service import EmailService
+import importlib
 
+# services pull in sklearn, feedparser, bs4 and sendgrid, so each one is imported on first use
+_modules = {
+    "NewsService": "services.news_service",
+    "EventsService": "services.event_service",
+    "ResearchService": "services.research_service",
+    "GitHubScanner": "services.apps.gh_service",
+    "CompetitionService": "services.competition_service",
+    "ProductService": "services.product_service",
+    "EmailService": "services.email_service",
+    "IngestionService": "services.ingestion_service",
+    "SearchService": "services.search_service"
+}
 
 __all__ = [
     "NewsService",
@@ -14,5 +20,13 @@ __all__ = [
     "EventsService",
     "ResearchService",
     "ProductService",
-    "EmailService"
-]
\ No newline at end of file
+    "EmailService",
+    "IngestionService",
+    "SearchService"
+]
+
+
+def __getattr__(name):
+    if name in _modules:
+        return getattr(importlib.import_module(_modules[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
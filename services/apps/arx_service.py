@@ -1,10 +1,11 @@
 import time
 import random
 import logging
-import urllib.request
 import feedparser
 import numpy as np
-from sklearn import svm
+from db_handler import load_paper_index
+from services.keyword_index import KeywordIndex, paper_fields
+from utils.http_client import http_client
 from typing import List, Dict, Any, Optional, Tuple
 
 
@@ -14,15 +15,16 @@ class ArxivScanner:
         self.top_n = top_n
         self.logger = logging.getLogger(__name__)
         self.default_query = 'cat:cs.CV+OR+cat:cs.LG+OR+cat:cs.CL+OR+cat:cs.AI+OR+cat:cs.NE+OR+cat:cs.RO'
+        self.rank_model = None
 
     def _get_response(self, search_query: str, start_index: int = 0) -> bytes:
         query_url = f'{self.base_url}search_query={search_query}&sortBy=lastUpdatedDate&start={start_index}&max_results=100'
 
-        with urllib.request.urlopen(query_url) as url:
-            response = url.read()
-            if url.status != 200:
-                raise Exception(f"ArXiv API returned status {url.status}")
-        return response
+        # the api is slow on large result pages; the client paces export.arxiv.org to its 3s rule
+        response = http_client().get(query_url, timeout=60)
+        if response.status_code != 200:
+            raise Exception(f"ArXiv API returned status {response.status_code}")
+        return response.content
 
     def _parse_arxiv_url(self, url: str) -> tuple:
         idv = url[url.rfind('/') + 1:]
@@ -58,6 +60,9 @@ class ArxivScanner:
                     query: str = None) -> List[Tuple[Dict, float]]:
         if not papers:
             return []
+        if method == 'model' and (self.rank_model is None or not self.rank_model.trained):
+            # no fitted model yet: rank the way ResearchService did before there was one
+            method = 'svm'
 
         if method == 'time':
             scored_papers = [(p, -p['_time']) for p in papers]
@@ -66,18 +71,21 @@ class ArxivScanner:
             scored_papers = [(p, random.random()) for p in papers]
 
         elif method == 'search' and query:
-            query_terms = query.lower().strip().split()
-            scored_papers = []
-
-            for p in papers:
-                score = 0.0
-                score += 20.0 * sum(1 for term in query_terms if term in p['title'].lower())
-                score += 10.0 * sum(
-                    1 for term in query_terms if term in ' '.join(a['name'].lower() for a in p['authors']))
-                score += 5.0 * sum(1 for term in query_terms if term in p['summary'].lower())
-                scored_papers.append((p, score))
+            # stored papers go through the worker's index, which stops once nothing else can reach the
+            # top_n; papers it has not seen are scored directly. Only the top_n reach the section, so
+            # stored matches below them keep 0 and fall back to recency order
+            index = load_paper_index() or KeywordIndex()
+            scores = dict(index.search(query, k=self.top_n, doc_ids=(p['_id'] for p in papers if p['_id'] in index)))
+            scores.update((p['_id'], index.score_fields(query, paper_fields(p))) for p in papers if p['_id'] not in index)
+            scored_papers = [(p, scores.get(p['_id'], 0.0)) for p in papers]
+            return sorted(scored_papers, key=lambda x: (x[1], x[0]['_time']), reverse=True)
+
+        elif method == 'model':
+            scores = self.rank_model.decision_function(papers)
+            scored_papers = [(p, float(score)) for p, score in zip(papers, scores)]
 
         elif method == 'svm':
+            from sklearn import svm
             from sklearn.feature_extraction.text import TfidfVectorizer
 
             # Prepare text data
@@ -130,13 +138,13 @@ class ArxivScanner:
 
         return sorted(scored_papers, key=lambda x: x[1], reverse=True)
 
-    def get_top_n_papers(self, search_query: Optional[str] = None,
-                         rank_method: str = 'svm') -> List[Dict[str, Any]]:
+    def fetch_papers(self, search_query: Optional[str] = None, max_papers: Optional[int] = None) -> List[Dict[str, Any]]:
         query = search_query or self.default_query
+        max_papers = max_papers or max(100, self.top_n)  # Get more papers for better SVM training
         papers = []
         start_index = 0
 
-        while len(papers) < max(100, self.top_n):  # Get more papers for better SVM training
+        while len(papers) < max_papers:
             try:
                 response = self._get_response(query, start_index)
                 batch = self._parse_response(response)
@@ -144,13 +152,22 @@ class ArxivScanner:
                     break
                 papers.extend(batch)
                 start_index += len(batch)
-                time.sleep(1 + random.uniform(0, 3))
             except Exception as e:
                 self.logger.error(f"Error fetching papers: {e}")
                 break
+        return papers
+
+    def get_top_n_papers(self, search_query: Optional[str] = None,
+                         rank_method: str = 'svm',
+                         papers: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        if papers is None:
+            papers = self.fetch_papers(search_query)
         ranked_papers = self.rank_papers(papers, method=rank_method, query=search_query)
+        return [self._format_paper(p, score) for p, score in ranked_papers[:self.top_n]]
 
-        return [{
+    @staticmethod
+    def _format_paper(p: Dict[str, Any], score: float) -> Dict[str, Any]:
+        return {
             'id': p['_id'],
             'title': p['title'],
             'authors': [a['name'] for a in p['authors']],
@@ -161,4 +178,4 @@ class ArxivScanner:
             'pdf_url': f"https://arxiv.org/pdf/{p['_id']}.pdf",
             'score': score,
             'publication': "ARXIV"
-        } for p, score in ranked_papers[:self.top_n]]
\ No newline at end of file
+        }
@@ -1,88 +1,307 @@
-import jwt
+import re
 import time
-import requests
-import configparser
-from db_handler import Repo
-from bs4 import BeautifulSoup
+import threading
+import concurrent.futures
+from functools import lru_cache
+from utils.cache import TTLCache
+from utils.http_client import http_client
+from utils.parse_pool import parse_pool
+from utils.utility import get_config
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, parse_qs
+from db_handler import Repo, sites, load_ingested
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
+TRENDING_URL = "https://github.com/trending/{language}?since={since}&spoken_language_code=en"
+
+# raw trending pages change slowly; one fetch per (language, since) every half hour is plenty
+_page_cache = TTLCache(30 * 60, maxsize=64)
+
+
+# app JWTs live 10 minutes and installation tokens an hour; both are reused until this close to expiry
+TOKEN_MARGIN = 60
+
+_tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_tokens_lock = threading.RLock()
+# url -> (etag, body) for conditional REST requests; a 304 does not count against the rate limit
+_etags = TTLCache(24 * 60 * 60, maxsize=512)
+_stats_cache = TTLCache(30 * 60, maxsize=256)
+
+REPO_FIELDS = """
+stargazerCount
+forkCount
+pushedAt
+repositoryTopics(first: 10) { nodes { topic { name } } }
+defaultBranchRef { target { ... on Commit { history(since: $since) { totalCount } } } }
+"""
+
+
+@lru_cache(maxsize=4)
+def _signing_key(pem_path: str) -> bytes:
+    with open(pem_path, 'rb') as pem_file:
+        return pem_file.read()
+
+
+class GitHubClient:
+    """
+    Minimal GitHub API client for the trending section.
+    Authenticates as a GitHub App (or with a plain token), caches the app JWT and the
+    installation token until shortly before they expire, revalidates REST GETs with
+    ETags and batches repository lookups into a single GraphQL query.
+    The base URL is configurable so it can run against a local stub of the API.
+    """
+
+    def __init__(self, api_url: Optional[str] = None, pem_path: Optional[str] = None,
+                 client_id: Optional[str] = None, installation_id: Optional[str] = None,
+                 token: Optional[str] = None):
+        config = get_config()
+        self.api_url = (api_url or config.get("GitHub", "api_url", fallback=None) or sites["gh_url"]).rstrip("/")
+        self.pem_path = pem_path or config.get("GitHub", "pem_path", fallback=None)
+        self.client_id = client_id or config.get("GitHub", "client_id", fallback=None)
+        self.installation_id = installation_id or config.get("GitHub", "installation_id", fallback=None)
+        self.token = token or config.get("GitHub", "token", fallback=None)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.token or (self.pem_path and self.client_id))
+
+    @staticmethod
+    def _cached_token(key: Tuple[str, str], issue) -> str:
+        with _tokens_lock:
+            token, expires = _tokens.get(key, (None, 0.0))
+            if token is None or expires - TOKEN_MARGIN < time.time():
+                token, expires = issue()
+                _tokens[key] = (token, expires)
+            return token
+
+    def app_jwt(self) -> str:
+        def issue():
+            import jwt
+            now = int(time.time())
+            # iat is backdated to allow for clock drift, as GitHub recommends
+            payload = {'iat': now - 60, 'exp': now + 600, 'iss': self.client_id}
+            return jwt.encode(payload, _signing_key(self.pem_path), algorithm='RS256'), now + 600
+
+        return self._cached_token(("jwt", self.client_id), issue)
+
+    def installation_token(self) -> str:
+        if self.token:
+            return self.token
+
+        def issue():
+            installation_id = self.installation_id
+            if not installation_id:
+                installations = self.get("/app/installations", bearer=self.app_jwt())
+                installation_id = installations[0]["id"]
+            response = http_client().post(
+                f"{self.api_url}/app/installations/{installation_id}/access_tokens",
+                headers={"Authorization": f"Bearer {self.app_jwt()}", "Accept": "application/vnd.github+json"}
+            )
+            response.raise_for_status()
+            body = response.json()
+            expires = datetime.strptime(body["expires_at"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            return body["token"], expires.timestamp()
+
+        return self._cached_token(("installation", self.client_id), issue)
+
+    def get(self, path: str, bearer: Optional[str] = None) -> Any:
+        """REST GET revalidated against the cached ETag"""
+        url = f"{self.api_url}{path}"
+        headers = {"Accept": "application/vnd.github+json",
+                   "Authorization": f"Bearer {bearer or self.installation_token()}"}
+        cached = _etags.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = http_client().get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        body = response.json()
+        if response.headers.get("ETag"):
+            _etags.set(url, (response.headers["ETag"], body))
+        return body
+
+    def graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        response = http_client().post(
+            f"{self.api_url}/graphql",
+            json={"query": query, "variables": variables},
+            headers={"Authorization": f"Bearer {self.installation_token()}"}
+        )
+        response.raise_for_status()
+        body = response.json()
+        # missing repos come back as null data plus an error; only fail when nothing came back
+        if body.get("errors") and not body.get("data"):
+            raise RuntimeError(body["errors"][0].get("message", "GraphQL error"))
+        return body.get("data") or {}
+
+    def repo_stats(self, names: List[str], activity_days: int = 30) -> Dict[str, Dict[str, Any]]:
+        """Stars, forks, topics and recent commit count for every "owner/name" in one query"""
+        since = (datetime.now(timezone.utc) - timedelta(days=activity_days)).strftime("%Y-%m-%dT00:00:00Z")
+        names = [name for name in dict.fromkeys(names) if name.count("/") == 1]
+        if not names:
+            return {}
+
+        def fetch():
+            variables: Dict[str, Any] = {"since": since}
+            definitions, selections = ["$since: GitTimestamp!"], []
+            for i, name in enumerate(names):
+                variables[f"o{i}"], variables[f"n{i}"] = name.split("/")
+                definitions.append(f"$o{i}: String!, $n{i}: String!")
+                selections.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ {REPO_FIELDS} }}")
+            data = self.graphql(f"query({', '.join(definitions)}) {{ {' '.join(selections)} }}", variables)
+
+            stats = {}
+            for i, name in enumerate(names):
+                repo = data.get(f"r{i}")
+                if not repo:
+                    continue
+                target = (repo.get("defaultBranchRef") or {}).get("target") or {}
+                stats[name] = {
+                    "stars": str(repo["stargazerCount"]),
+                    "forks": str(repo["forkCount"]),
+                    "pushed_at": repo.get("pushedAt"),
+                    "topics": [n["topic"]["name"] for n in repo["repositoryTopics"]["nodes"]],
+                    "recent_commits": (target.get("history") or {}).get("totalCount", 0)
+                }
+            return stats
+
+        return _stats_cache.get_or_set((tuple(sorted(names)), since), fetch)
+
+
+def _count(text: str) -> str:
+    digits = re.sub(r"[^0-9]", "", text or "")
+    return digits or "0"
+
+
+def parse_trending(html: str) -> List[Dict]:
+    """Single pass over the trending page's repo rows"""
+    from lxml import html as lxml_html
+    repos = []
+    for row in lxml_html.fromstring(html).cssselect("article.Box-row"):
+        anchor = row.cssselect("h2 a")
+        if not anchor:
+            continue
+        path = anchor[0].get("href", "").strip("/")
+        description = row.cssselect("p")
+        language = row.cssselect('[itemprop="programmingLanguage"]')
+        stars = row.cssselect('a[href$="/stargazers"]')
+        forks = row.cssselect('a[href$="/forks"]')
+        period = row.cssselect("span.float-sm-right")
+        repos.append({
+            'name': path,
+            'link': f"https://github.com/{path}",
+            'description': description[0].text_content().strip() if description else "No description provided.",
+            'language': language[0].text_content().strip() if language else "",
+            'stars': _count(stars[0].text_content()) if stars else "0",
+            'forks': _count(forks[0].text_content()) if forks else "0",
+            'stars_period': _count(period[0].text_content()) if period else "0"
+        })
+    return repos
+
+
+def parse_trending_page(language: str, since: str, html: str) -> List[Dict]:
+    """Parse-pool entry point for one trending page"""
+    try:
+        return parse_trending(html)
+    except Exception as e:
+        print(f"Error parsing trending {language or 'all'}/{since}: {str(e)}")
+        return []
 
-default_pem = config["GitHub"]["pem_path"]
-default_clientId = config["GitHub"]["client_id"]
 
 class GitHubScanner:
-    def __init__(self, site_url, ftype, top_n=5, pem_path=default_pem, client_id=default_clientId):
+    def __init__(self, site_url, ftype, top_n=5, pem_path=None, client_id=None, from_store=False, languages=None):
         self.site_url = site_url
         self.ftype = ftype
+        self.from_store = from_store
         self.top_n = top_n
-        self.pem_path = pem_path
-        self.client_id = client_id
+        self.client = GitHubClient(pem_path=pem_path, client_id=client_id)
+        language, since = self._parse_trending_url(site_url)
+        configured = get_config().get("GitHub", "languages", fallback="")
+        self.languages = languages or [l.strip() for l in configured.split(",") if l.strip()] or [language]
+        self.since = since or ftype
         self.response = []
 
     def _gh_authenticate(self):
-        with open(self.pem_path, 'rb') as pem_file:
-            signing_key = pem_file.read()
+        return self.client.app_jwt()
 
-        payload = {
-            'iat': int(time.time()),
-            'exp': int(time.time()) + 600,
-            'iss': self.client_id
-        }
+    @staticmethod
+    def _parse_trending_url(url: str) -> Tuple[str, Optional[str]]:
+        parsed = urlparse(url)
+        parts = [p for p in parsed.path.split('/') if p]
+        language = parts[1] if len(parts) > 1 and parts[0] == 'trending' else ''
+        since = parse_qs(parsed.query).get('since', [None])[0]
+        return language, since
 
-        encoded_jwt = jwt.encode(payload, signing_key, algorithm='RS256')
-        return encoded_jwt
-
-    def _extract_from_html(self, link):
-        repos = []
+    def _fetch_page(self, language: str, since: str) -> Optional[str]:
         try:
-            response = requests.get(link)
+            response = http_client().get(TRENDING_URL.format(language=language, since=since))
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            repo_list = soup.find_all('article', class_='Box-row')
-
-            for repo in repo_list:
-                name = repo.find('h2', class_='h3').text.strip().replace('\n', '').replace(' ', '')
-
-                description = repo.find('p', class_='col-9 color-fg-muted my-1 pr-4')
-                description = description.text.strip() if description else "No description provided."
-
-                stars_element = repo.find('a', class_='Link Link--muted d-inline-block mr-3') or \
-                                repo.find('a', class_='Link--muted d-inline-block mr-3')
-                stars = stars_element.text.strip().replace(',', '') if stars_element else "0"
+            return response.text
+        except Exception as e:
+            print(f"Error fetching trending {language or 'all'}/{since}: {str(e)}")
+            return None
 
-                fork_elements = repo.find_all('a', class_='Link Link--muted d-inline-block mr-3') or \
-                                repo.find_all('a', class_='Link--muted d-inline-block mr-3')
-                forks = fork_elements[1].text.strip().replace(',', '') if len(fork_elements) > 1 else "0"
+    def collect(self, languages: Iterable[str], periods: Iterable[str]) -> Dict[Tuple[str, str], List[Dict]]:
+        """Trending pages for every (language, since) pair, fetched concurrently and parsed in the parse pool"""
+        pairs = [(language, since) for language in languages for since in periods]
+        pages = {pair: _page_cache.get(pair) for pair in pairs}
+        missing = [pair for pair, page in pages.items() if page is None]
+        if missing:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(missing))) as executor:
+                fetched = [(pair, html) for pair, html in
+                           zip(missing, executor.map(lambda pair: self._fetch_page(*pair), missing)) if html is not None]
+            payloads = [(language, since, html) for (language, since), html in fetched]
+            for (pair, _), repos in zip(fetched, parse_pool().imap(parse_trending_page, payloads)):
+                _page_cache.set(pair, repos)
+                pages[pair] = repos
+        return {pair: pages[pair] or [] for pair in pairs}
 
-                repos.append({
-                    'name': name,
-                    'description': description,
-                    'stars': str(stars),
-                    'forks': str(forks)
-                })
+    def trending(self) -> List[Dict]:
+        pages = self.collect(self.languages, [self.since])
+        if len(pages) == 1:
+            repos = next(iter(pages.values()))
+        else:
+            # several languages: merge by stars gained in the period, GitHub's own trending signal
+            repos = sorted((repo for page in pages.values() for repo in page),
+                           key=lambda repo: int(repo['stars_period']), reverse=True)
+        unique = {}
+        for repo in repos:
+            unique.setdefault(repo['name'], repo)
+        return list(unique.values())[:self.top_n]
 
-            return repos[:self.top_n]
+    def enrich(self, repos: List[Dict]) -> List[Dict]:
+        """Overlay API stats on scraped repos; scraped values stay when the API is unavailable"""
+        if not repos or not self.client.configured:
+            return repos
+        try:
+            stats = self.client.repo_stats([repo["name"] for repo in repos])
         except Exception as e:
-            print(f"Error: {str(e)}")
+            print(f"Error enriching repos: {str(e)}")
+            return repos
+        return [{**repo, **stats.get(repo["name"], {})} for repo in repos]
 
-    def _daily_trending_repos(self):
-        repositories = self._extract_from_html(self.site_url)
-        return repositories
-
-    def _weekly_trending_repos(self):
-        repositories = self._extract_from_html(self.site_url)
-        return  repositories
+    def _ingested_repos(self):
+        snapshots = [snap for snap in load_ingested("repo") if snap["ftype"] == self.ftype]
+        if not snapshots:
+            return None
+        return max(snapshots, key=lambda snap: snap["ingested"])["repos"][:self.top_n]
 
     async def get_trending_repos(self):
-        if self.ftype == "daily":
-            repositories = self._daily_trending_repos()
-        else:
-            repositories = self._weekly_trending_repos()
-        self.response.extend(Repo(
+        repositories = self._ingested_repos() if self.from_store else None
+        if not repositories:
+            repositories = self.trending()
+        repositories = self.enrich(repositories)
+        repos = [Repo(
             name = repo["name"],
-            link = "",
+            link = repo.get("link") or f"https://github.com/{repo['name']}",
             summary = repo["description"],
             source = "GitHub",
-            engagement = repo["stars"]) for repo in repositories)
-        return self.response
\ No newline at end of file
+            engagement = repo["stars"],
+            additional_info = {
+                "forks": repo.get("forks"),
+                "language": repo.get("language"),
+                "topics": repo.get("topics", []),
+                "recent_commits": repo.get("recent_commits")
+            }) for repo in repositories]
+        self.response = repos
+        return repos
\ No newline at end of file
@@ -1,57 +1,72 @@
-import configparser
+import concurrent.futures
+from utils.cache import TTLCache
+from utils.http_client import http_client
+from utils.utility import get_config
 
-import requests
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
+# hub listings move slowly; share one response per (endpoint, limit) for half an hour
+_response_cache = TTLCache(30 * 60, maxsize=32)
+
+# section name -> hub listing endpoint
+ENDPOINTS = {
+    "top_models": "/api/models",
+    "top_datasets": "/api/datasets",
+    "top_apps": "/api/spaces"
+}
 
-default_token = config["HuggingFace"]["token"]
 
 class HuggingFaceScanner:
-    def __init__(self, base_url, top_n=5, auth_token=default_token):
+    def __init__(self, base_url, top_n=5, auth_token=None):
         self.base_url = base_url
         self.top_n = top_n
-        self.auth_token = "Bearer "+auth_token
+        token = auth_token or get_config().get("HuggingFace", "token", fallback=None)
+        self.headers = {"Authorization": "Bearer " + token} if token else {}
         self.response = {}
 
+    def _listing(self, endpoint, top_n):
+        def fetch():
+            # sorted server-side, and expand[] limits each entry to the fields used below
+            response = http_client().get(
+                self.base_url + endpoint,
+                params=[("sort", "trendingScore"), ("direction", "-1"), ("limit", top_n),
+                        ("expand[]", "author"), ("expand[]", "trendingScore")],
+                headers=self.headers
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return _response_cache.get_or_set((endpoint, top_n), fetch)
+
+    def _to_item(self, entry, prefix=""):
+        return {"title": entry["id"],
+                "link": f"{self.base_url}/{prefix}{entry['id']}",
+                "summary": entry.get("author", ""),
+                "source": "HuggingFace",
+                "engagement": str(entry.get("trendingScore", 0))}
+
     def _top_models(self, top_n):
-        url = self.base_url+"/api/models"
-        response = requests.get(
-            url, params={"limit": top_n, "full": "True", "config": "False"},
-            headers={"Authorization":self.auth_token}
-        )
-        return [{"title":model["modelId"],
-                 "link":self.base_url+model["id"],
-                 "summary": model["author"],
-                 "source":"HuggingFace",
-                 "engagement": str(model["trendingScore"])}for model in response.json()]
+        return [self._to_item(model) for model in self._listing(ENDPOINTS["top_models"], top_n)]
 
     def _top_datasets(self, top_n):
-        url = self.base_url+"/api/datasets"
-        response = requests.get(
-            url, params={"limit": top_n, "full": "False"},
-            headers={"Authorization":self.auth_token}
-        )
-        return [{"title": dataset["id"],
-                 "link": self.base_url + dataset["id"],
-                 "summary": dataset["author"],
-                 "source": "HuggingFace",
-                 "engagement": str(dataset["trendingScore"])} for dataset in response.json()]
+        return [self._to_item(dataset, "datasets/") for dataset in self._listing(ENDPOINTS["top_datasets"], top_n)]
 
     def _top_apps(self, top_n):
-        url = self.base_url+"/api/spaces"
-        response = requests.get(
-            url, params={"limit": top_n, "full": "True"},
-            headers={"Authorization":self.auth_token}
-        )
-        return [{"title": apps["id"],
-                 "link": self.base_url + apps["id"],
-                 "summary": apps["author"],
-                 "source": "HuggingFace",
-                 "engagement": str(apps["trendingScore"])} for apps in response.json()]
+        return [self._to_item(app, "spaces/") for app in self._listing(ENDPOINTS["top_apps"], top_n)]
 
     def weekly_scanner(self):
-        self.response["top_models"] =  self._top_models(self.top_n)
-        self.response["top_datasets"] = self._top_datasets(self.top_n)
-        self.response["top_apps"] = self._top_apps(self.top_n)
-        return self.response
\ No newline at end of file
+        scanners = {
+            "top_models": self._top_models,
+            "top_datasets": self._top_datasets,
+            "top_apps": self._top_apps
+        }
+        response = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(scanners)) as executor:
+            futures = {name: executor.submit(scan, self.top_n) for name, scan in scanners.items()}
+            for name, future in futures.items():
+                try:
+                    response[name] = future.result()
+                except Exception as e:
+                    print(f"Error fetching HuggingFace {name}: {str(e)}")
+                    response[name] = []
+        self.response = response
+        return response
@@ -1,53 +1,86 @@
-import configparser
 import os
-import subprocess
+import json
+from utils.cache import TTLCache
+from utils.http_client import http_client
+from utils.utility import get_config
+from typing import Dict, List, Optional, Tuple
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
+KAGGLE_API_URL = "https://www.kaggle.com/api/v1"
+KAGGLE_SITE_URL = "https://www.kaggle.com"
+# competitions per list page; a shorter page is the last one
+PAGE_SIZE = 20
+
+# the competitions list changes a few times a day at most
+_list_cache = TTLCache(60 * 60, maxsize=32)
+
+
+def load_credentials(path: Optional[str]) -> Tuple[str, str]:
+    """(username, key) from a kaggle.json file or the directory holding it, else the KAGGLE_* env vars"""
+    if path:
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "kaggle.json")
+        if os.path.isfile(path):
+            with open(path) as f:
+                creds = json.load(f)
+            return creds["username"], creds["key"]
+    return os.environ.get("KAGGLE_USERNAME", ""), os.environ.get("KAGGLE_KEY", "")
 
-default_cred = config["Kaggle"]["path"]
 
 class KaggleScanner:
-    def __init__(self, base_url: str = "", top_n=5, kaggle_cred_path=default_cred):
-        self.base_url = base_url
+    def __init__(self, base_url: str = "", top_n=5, kaggle_cred_path=None, sort_by: str = "prize",
+                 category: Optional[str] = None, search: Optional[str] = None, max_pages: int = 5):
+        self.base_url = (base_url or get_config().get("Kaggle", "api_url", fallback=None) or KAGGLE_API_URL).rstrip("/")
         self.top_n = top_n
-        self.kaggle_cred_path = kaggle_cred_path
+        self.kaggle_cred_path = kaggle_cred_path or get_config().get("Kaggle", "path", fallback=None)
+        self.sort_by = sort_by
+        self.category = category
+        self.search = search
+        self.max_pages = max_pages
         self.response = []
 
+    def _list_page(self, page: int) -> List[Dict]:
+        params = {"page": page, "sortBy": self.sort_by}
+        if self.category:
+            params["category"] = self.category
+        if self.search:
+            params["search"] = self.search
+        username, key = load_credentials(self.kaggle_cred_path)
+        # without credentials the public listing is requested anonymously, not with an empty basic auth
+        response = http_client().get(f"{self.base_url}/competitions/list", params=params,
+                                     auth=(username, key) if username and key else None)
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _to_competition(entry: Dict) -> Dict:
+        ref = entry.get("ref", "")
+        # older api versions return a slug in `ref`, newer ones the full url
+        link = entry.get("url") or (ref if ref.startswith("http") else f"{KAGGLE_SITE_URL}/competitions/{ref}")
+        return {
+            "name": entry.get("title") or link.rstrip("/").split("/")[-1],
+            "link": link,
+            "deadline": (entry.get("deadline") or "")[:10],
+            "reward": str(entry.get("reward") or "").lstrip("$")
+        }
+
     def _get_top_n_kaggle_competitions(self):
+        def fetch():
+            competitions = []
+            for page in range(1, self.max_pages + 1):
+                batch = self._list_page(page)
+                if not batch:
+                    break
+                competitions.extend(self._to_competition(entry) for entry in batch)
+                if len(competitions) >= self.top_n or len(batch) < PAGE_SIZE:
+                    break
+            return competitions[:self.top_n]
+
         try:
-            os.environ["KAGGLE_CONFIG_DIR"] = os.path.expanduser(self.kaggle_cred_path)
-            result = subprocess.run(
-                ["kaggle", "competitions", "list", "--sort-by", "prize"],
-                stdout=subprocess.PIPE,
-                text=True
-            )
-            if result.returncode != 0:
-                print("Error fetching Kaggle competitions:", result.stderr)
-                return
-
-            lines = result.stdout.strip().split("\n")
-            data_rows = [line for line in lines if "https://www.kaggle.com" in line]
-            response = []
-
-            for row in data_rows[:self.top_n]:
-                columns = row.split()
-                if len(columns) > 0:
-                    competition_link = columns[0]
-                    deadline = columns[1]
-                    reward = columns[4]
-
-                    competition_name = competition_link.split("/")[-1]
-
-                    response.append({
-                        "name": competition_name,
-                        "link": competition_link,
-                        "deadline": deadline,
-                        "reward": reward
-                    })
-            return response
+            return _list_cache.get_or_set((self.base_url, self.sort_by, self.category, self.search, self.top_n), fetch)
         except Exception as e:
-            print(f"Error: {e}")
+            print(f"Error fetching Kaggle competitions: {e}")
+            return []
 
     def get_new_competitions_launch(self):
         self.response = self._get_top_n_kaggle_competitions()
@@ -1,92 +1,130 @@
+import time
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from utils.cache import TTLCache
+from utils.http_client import http_client
+from utils.utility import get_config
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+
+PAGE_SIZE = 20
+# longest we will sleep for the rate-limit window to reset before returning what we have
+MAX_RATE_LIMIT_WAIT = 60
+
+# votes on a closed date window settle quickly; one fetch per window and size per hour
+_window_cache = TTLCache(60 * 60, maxsize=32)
+
+POSTS_QUERY = """
+query ($first: Int!, $after: String, $dateFrom: DateTime!, $dateTo: DateTime!) {
+  posts(first: $first, after: $after, postedAfter: $dateFrom, postedBefore: $dateTo, order: VOTES) {
+    pageInfo { hasNextPage endCursor }
+    edges {
+      node {
+        id
+        name
+        tagline
+        url
+        votesCount
+      }
+    }
+  }
+}
+"""
+
 
 class ProductHuntScanner:
-    def __init__(self, site_url, graph_url, top_n=5):
+    def __init__(self, site_url, graph_url, top_n=5, api_key=None):
         self.site_url = site_url
         self.graph_url = graph_url
         self.top_n = top_n
+        self.api_key = api_key or get_config().get("ProductHunt", "token", fallback=None)
+        # last seen rate-limit state: points left and seconds until the window resets
+        self.remaining: Optional[int] = None
+        self.reset_in: Optional[float] = None
+        self.last_cost = 0
         self.response = []
 
-    def get_last_week_top_products(self):
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        try:
-            response = requests.get(self.site_url, headers=headers)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-            last_week_section = soup.find("section", string="Last Week's Top Products")
-            if not last_week_section:
-                print("Could not find 'Last Week's Top Products' section.")
-                return []
-
-            products = []
-            for product in last_week_section.find_all("li"):
-                title = product.find("h3").get_text(strip=True) if product.find("h3") else "No Title"
-                link = product.find("a", href=True)["href"] if product.find("a", href=True) else "No Link"
-                products.append({"title": title, "link": f"{self.site_url}{link}"})
-
-            return products
-        except Exception as e:
-            print(f"Error fetching data: {e}")
-            return []
-
-    def get_last_month_top_products(self, api_key):
-        query = """
-        query ($dateFrom: DateTime!, $dateTo: DateTime!) {
-          posts(first: 10, postedAfter: $dateFrom, postedBefore: $dateTo, order: VOTES_COUNT) {
-            edges {
-              node {
-                id
-                name
-                tagline
-                url
-                votesCount
-              }
-            }
-          }
-        }
+    def _pace(self) -> bool:
         """
-        today = datetime.utcnow()
-        first_day_of_this_month = datetime(today.year, today.month, 1)
-        last_day_of_last_month = first_day_of_this_month - timedelta(days=1)
-        first_day_of_last_month = datetime(last_day_of_last_month.year, last_day_of_last_month.month, 1)
-
-        variables = {
-            "dateFrom": first_day_of_last_month.isoformat(),
-            "dateTo": last_day_of_last_month.isoformat()
-        }
-
-        # Set headers with API key
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-
-        try:
-            response = requests.post(self.graph_url, json={"query": query, "variables": variables}, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        Wait for the rate-limit window when the next page would not fit in what is left;
+        False when the reset is further off than MAX_RATE_LIMIT_WAIT.
+        """
+        if self.remaining is None or self.remaining > self.last_cost:
+            return True
+        wait = self.reset_in or 0
+        if wait > MAX_RATE_LIMIT_WAIT:
+            return False
+        time.sleep(wait)
+        self.remaining = None
+        return True
 
-            products = data.get("data", {}).get("posts", {}).get("edges", [])
-            if not products:
-                print("No products found for last month.")
-                return []
+    def _track_limits(self, response: requests.Response):
+        remaining = response.headers.get("X-Rate-Limit-Remaining")
+        if remaining is None:
+            return
+        remaining = int(remaining)
+        if self.remaining is not None and self.remaining >= remaining:
+            self.last_cost = self.remaining - remaining
+        self.remaining = remaining
+        self.reset_in = float(response.headers.get("X-Rate-Limit-Reset", 0))
 
-            result = []
-            for product in products:
-                node = product["node"]
-                result.append({
-                    "title": node["name"],
-                    "summary": node["tagline"],
-                    "link": node["url"],
-                    "engagement": node["votesCount"],
+    def _posts(self, date_from: datetime, date_to: datetime, limit: int) -> List[Dict]:
+        """Top posts by votes in [date_from, date_to), following cursors until `limit`"""
+        def fetch():
+            headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+            results, cursor = [], None
+            while len(results) < limit:
+                if not self._pace():
+                    print(f"ProductHunt rate limit exhausted for {int(self.reset_in or 0)}s, "
+                          f"returning {len(results)} of {limit} posts")
+                    return results, False
+                variables = {"first": min(PAGE_SIZE, limit - len(results)), "after": cursor,
+                             "dateFrom": date_from.isoformat(), "dateTo": date_to.isoformat()}
+                response = http_client().post(self.graph_url, json={"query": POSTS_QUERY, "variables": variables},
+                                              headers=headers)
+                self._track_limits(response)
+                response.raise_for_status()
+                body = response.json()
+                if body.get("errors"):
+                    raise RuntimeError(body["errors"][0].get("message", "GraphQL error"))
+                posts = body["data"]["posts"]
+                results.extend({
+                    "title": edge["node"]["name"],
+                    "summary": edge["node"]["tagline"],
+                    "link": edge["node"]["url"],
+                    "engagement": str(edge["node"]["votesCount"]),
                     "source": "Product Hunt"
-                })
+                } for edge in posts["edges"])
+                if not posts["pageInfo"]["hasNextPage"]:
+                    break
+                cursor = posts["pageInfo"]["endCursor"]
+            return results[:limit], True
 
-            return result
+        if not self.api_key:
+            return []
+        key = (date_from.date(), date_to.date(), limit)
+        cached = _window_cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            results, complete = fetch()
+            # a page cut short by the rate limit is served, but the next call tries for the full list
+            if complete:
+                _window_cache.set(key, results)
+            return results
         except Exception as e:
             print(f"Error fetching data: {e}")
             return []
+
+    def get_last_week_top_products(self):
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.response = self._posts(today - timedelta(days=7), today, self.top_n)
+        return self.response
+
+    def get_last_month_top_products(self, api_key=None):
+        self.api_key = api_key or self.api_key
+        today = datetime.now(timezone.utc)
+        first_day_of_this_month = datetime(today.year, today.month, 1, tzinfo=timezone.utc)
+        last_day_of_last_month = first_day_of_this_month - timedelta(days=1)
+        first_day_of_last_month = datetime(last_day_of_last_month.year, last_day_of_last_month.month, 1,
+                                           tzinfo=timezone.utc)
+        return self._posts(first_day_of_last_month, first_day_of_this_month, self.top_n)
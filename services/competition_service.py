@@ -7,12 +7,13 @@ class CompetitionService:
         self.competitions = []
 
     async def get_latest_competitions(self):
-        kaggle = self.kaggle.get_new_competitions_launch()
-        self.competitions.extend([Competitions(
+        kaggle = self.kaggle.get_new_competitions_launch() or []
+        competitions = [Competitions(
             name = comp["name"],
             link = comp["link"],
             deadline = comp["deadline"],
             reward = comp["reward"]
-        ) for comp in kaggle])
+        ) for comp in kaggle]
 
-        return self.competitions
\ No newline at end of file
+        self.competitions = competitions
+        return competitions
\ No newline at end of file
@@ -3,6 +3,7 @@ from services.crawler.blog_crawler import SubstackCrawler, MediumCrawler
 from services.crawler.social_media_crawler import LinkedinCrawler, TwitterCrawler
 
 __all__ = [
+    "RssCrawler",
     "SubstackCrawler",
     "MediumCrawler",
     "LinkedinCrawler",
@@ -0,0 +1,110 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from dataclasses import dataclass, asdict
+from urllib.parse import urljoin
+from typing import Iterable, List, Optional
+from utils.http_client import http_client
+from services.crawler.rss_crawler import looks_like_feed, FEED_CONTENT_TYPES
+from services.crawler.feed_reader import read_feed
+
+BROWSER_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                   'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, text/html;q=0.8'}
+
+
+@dataclass
+class FeedCheck:
+    url: str
+    ok: bool
+    title: str = ""
+    site: Optional[str] = None
+    entries: int = 0
+    size_bytes: int = 0
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+
+
+def alternate_feeds(html: bytes, base_url: str) -> List[str]:
+    """Feed urls advertised through <link rel="alternate"> on an html page"""
+    from lxml import html as lxml_html
+    try:
+        document = lxml_html.fromstring(html)
+    except Exception:
+        return []
+    urls = []
+    for link in document.xpath('//link[@href]'):
+        rel = (link.get('rel') or '').lower().split()
+        if 'alternate' in rel and (link.get('type') or '').lower() in FEED_CONTENT_TYPES:
+            url = urljoin(base_url, link.get('href').strip())
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+class FeedDiscovery:
+    """
+    Bulk feed validation and discovery.
+    Candidates are fetched concurrently through the shared client's async face, on a
+    thread pool of `concurrency` workers so the default executor does not cap it. Feeds
+    are parsed on the same pool to count entries and timed; html pages are searched for
+    alternate feed links, which are then validated the same way.
+    """
+
+    def __init__(self, concurrency: int = 32, max_latency_ms: Optional[float] = None):
+        self.concurrency = concurrency
+        self.max_latency_ms = max_latency_ms
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _check(self, url: str, semaphore: asyncio.Semaphore, site: Optional[str] = None,
+                     discover: bool = True) -> List[FeedCheck]:
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                response = await http_client().aget(url, self._executor, headers=BROWSER_HEADERS)
+            except Exception as e:
+                return [FeedCheck(url, False, site=site, error=str(e))]
+            latency_ms = (time.monotonic() - start) * 1000
+        if response.status_code != 200:
+            return [FeedCheck(url, False, site=site, latency_ms=latency_ms, error=f"HTTP {response.status_code}")]
+
+        content_type = response.headers.get('content-type', '')
+        if looks_like_feed(content_type, response.content):
+            title, entries = await asyncio.get_running_loop().run_in_executor(
+                self._executor, partial(read_feed, response.content, headers=response.headers))
+            check = FeedCheck(response.url or url, True, title, site, len(entries), len(response.content), latency_ms)
+            if self.max_latency_ms is not None and latency_ms > self.max_latency_ms:
+                check.ok, check.error = False, f"slower than {self.max_latency_ms:.0f}ms"
+            return [check]
+
+        if discover and 'html' in content_type.lower():
+            found = alternate_feeds(response.content, response.url or url)
+            if found:
+                checks = await asyncio.gather(*(self._check(feed, semaphore, site=url, discover=False)
+                                                for feed in found))
+                return [check for group in checks for check in group]
+        return [FeedCheck(url, False, site=site, size_bytes=len(response.content), latency_ms=latency_ms,
+                          error="no feed found")]
+
+    async def check_all(self, urls: Iterable[str]) -> List[FeedCheck]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="feed-discovery") as executor:
+            self._executor = executor
+            try:
+                groups = await asyncio.gather(*(self._check(url, semaphore) for url in dict.fromkeys(urls)))
+            finally:
+                self._executor = None
+        # a feed listed directly and also advertised by a page is reported once, passing if either check did
+        checks = {}
+        for check in (check for group in groups for check in group):
+            if check.url not in checks or (check.ok and not checks[check.url].ok):
+                checks[check.url] = check
+        return list(checks.values())
+
+    def run(self, urls: Iterable[str], registry=None) -> List[FeedCheck]:
+        """Check every url and, given a FeedRegistry, record passes and count failures"""
+        checks = asyncio.run(self.check_all(urls))
+        if registry is not None:
+            registry.record_valid([asdict(check) for check in checks if check.ok])
+            registry.record_failed({check.url: check.error or "" for check in checks if not check.ok})
+        return checks
@@ -0,0 +1,173 @@
+import io
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+
+ENTRY_TAGS = {"item", f"{RSS1}item", f"{ATOM}entry"}
+FEED_TITLE_PARENTS = {"channel", f"{RSS1}channel", f"{ATOM}feed"}
+# entries are mostly newest first, but not strictly; stop after this many in a row fall outside the window
+STALE_RUN = 5
+
+
+def parse_date(text: Optional[str]) -> float:
+    """RFC 822 (RSS) or ISO 8601 (Atom, dc:date) timestamp as epoch seconds, 0.0 when unreadable"""
+    if not text:
+        return 0.0
+    text = text.strip()
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return 0.0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _text(element) -> str:
+    # itertext also covers inline xhtml content in Atom feeds
+    return "".join(element.itertext()).strip() if element is not None else ""
+
+
+def _entry(element) -> Dict[str, Any]:
+    """Flatten one <item>/<entry> into the fields FeedItem needs"""
+    fields: Dict[str, Any] = {"title": "", "description": "", "link": "", "published": 0.0,
+                              "author": None, "categories": (), "guid": None}
+    content, categories = "", []
+    for child in element:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        name = tag.rsplit("}", 1)[-1]
+        if name == "title":
+            fields["title"] = _text(child)
+        elif tag in ("description", f"{RSS1}description", f"{ATOM}summary"):
+            fields["description"] = _text(child)
+        elif tag in (f"{CONTENT}encoded", f"{ATOM}content"):
+            content = _text(child)
+        elif tag == f"{ATOM}link":
+            if child.get("rel", "alternate") == "alternate" and not fields["link"]:
+                fields["link"] = child.get("href", "")
+        elif name == "link":
+            fields["link"] = fields["link"] or _text(child)
+        elif tag in ("pubDate", f"{ATOM}published", f"{DC}date") or \
+                (tag == f"{ATOM}updated" and not fields["published"]):
+            fields["published"] = parse_date(child.text)
+        elif tag == f"{ATOM}author":
+            fields["author"] = _text(child.find(f"{ATOM}name")) or None
+        elif tag in ("author", f"{DC}creator"):
+            fields["author"] = _text(child) or None
+        elif name == "category":
+            term = child.get("term") or _text(child)
+            if term:
+                categories.append(term)
+        elif tag in ("guid", f"{ATOM}id"):
+            fields["guid"] = _text(child) or None
+    # same preference as the feedparser path: the summary, else the full content
+    fields["description"] = fields["description"] or content
+    fields["categories"] = tuple(categories)
+    return fields
+
+
+def iter_entries(content: bytes, since: float = 0.0, meta: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield entries while the document is being parsed, releasing each element once read.
+    Entries published before `since` are skipped, and parsing stops after STALE_RUN of
+    them in a row, so a long feed costs what its recent entries cost. Undated entries
+    are always yielded. The feed title lands in meta["title"] when it is seen.
+    Raises lxml's XMLSyntaxError on malformed documents.
+    """
+    from lxml import etree
+    stale = 0
+    depth = 0
+    events = etree.iterparse(io.BytesIO(content), events=("start", "end"), resolve_entities=False,
+                             no_network=True, huge_tree=True, recover=False)
+    for event, element in events:
+        if element.tag in ENTRY_TAGS:
+            depth += 1 if event == "start" else -1
+            if event == "start":
+                continue
+            entry = _entry(element)
+            element.clear()
+            # drop already-read siblings so the tree never holds more than one entry
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+            if since and entry["published"] and entry["published"] < since:
+                stale += 1
+                if stale >= STALE_RUN:
+                    return
+                continue
+            stale = 0
+            yield entry
+        elif event == "end" and depth == 0 and meta is not None and "title" not in meta \
+                and element.tag in (f"{ATOM}title", "title", f"{RSS1}title") \
+                and element.getparent() is not None and element.getparent().tag in FEED_TITLE_PARENTS:
+            meta["title"] = _text(element)
+
+
+def _feedparser_entries(content: bytes, since: float, headers: Optional[Dict[str, str]]) -> Tuple[str, List[Dict]]:
+    import feedparser
+    feed = feedparser.parse(content, response_headers=headers or {})
+    entries = []
+    for entry in feed.entries:
+        description = entry.get('description', '')
+        if not description and 'content' in entry:
+            description = entry.content[0].value
+        published = parse_date(entry.get('published') or entry.get('updated'))
+        if since and published and published < since:
+            continue
+        entries.append({
+            "title": entry.get('title', ''),
+            "description": description,
+            "link": entry.get('link', ''),
+            "published": published,
+            "author": entry.get('author', None),
+            "categories": tuple(tag.get('term') or '' for tag in entry.get('tags', [])),
+            "guid": entry.get('id', None)
+        })
+    return feed.feed.get('title', ''), entries
+
+
+def read_feed(content: bytes, since: float = 0.0, headers: Optional[Dict[str, str]] = None) -> Tuple[str, List[Dict]]:
+    """(feed title, entries in the window), streamed when the XML is well formed, else through feedparser"""
+    from lxml import etree
+    meta: Dict[str, str] = {}
+    try:
+        entries = list(iter_entries(content, since, meta))
+        return meta.get("title", ""), entries
+    except etree.XMLSyntaxError as e:
+        logger.info(f"Falling back to feedparser for a malformed feed: {e}")
+        return _feedparser_entries(content, since, headers)
+
+
+def clean_html(text: str) -> str:
+    if not text:
+        return ""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(text, "html.parser").get_text().strip()
+
+
+def feed_records(url: str, content: bytes, since: float = 0.0,
+                 headers: Optional[Dict[str, str]] = None) -> Tuple[str, List[Tuple]]:
+    """
+    Parse-pool entry point: (feed title, records) with descriptions already reduced to
+    text. Records are (title, description, link, published, author, categories, guid)
+    tuples, cheaper to pickle than dicts or dataclasses.
+    """
+    try:
+        title, entries = read_feed(content, since, headers)
+    except Exception as e:
+        logger.error(f"Error parsing feed {url}: {str(e)}")
+        return "", []
+    return title, [(entry["title"], clean_html(entry["description"]), entry["link"], entry["published"],
+                    entry["author"], entry["categories"], entry["guid"]) for entry in entries]
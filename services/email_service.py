@@ -1,19 +1,24 @@
 import logging
-import configparser
-from typing import List, Optional
+from functools import lru_cache
+from utils.utility import get_config
+from typing import Callable, List, Optional
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Content
 
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
-api_key = config["Sendgrid"]["api_key"]
+
+@lru_cache(maxsize=1)
+def shared_client() -> SendGridAPIClient:
+    """One SendGrid client per process, reused across requests and jobs"""
+    return SendGridAPIClient(api_key=get_config()["Sendgrid"]["api_key"])
+
 
 class EmailService:
     def __init__(self, recipients: Optional[List[str]] = None,
                  subject: Optional[str] = None,
                  body_text: Optional[str] = None,
-                 template_id: Optional[str] = None):
+                 template_id: Optional[str] = None,
+                 sg_client: Optional[SendGridAPIClient] = None):
         self.sender = "weekly@ailert.tech"
         self.recipients = recipients if recipients else []
         self.subject = subject if subject else "Weekly Newsletter"
@@ -23,7 +28,7 @@ class EmailService:
 
         # Initialize SendGrid client
         try:
-            self.sg_client = SendGridAPIClient(api_key=api_key)
+            self.sg_client = sg_client or shared_client()
         except Exception as e:
             logging.error(f"Failed to initialize SendGrid client: {str(e)}")
             raise
@@ -48,9 +53,13 @@ class EmailService:
 
         return mail
 
-    def send_email(self) -> dict:
+    def send_email(self, on_progress: Optional[Callable[[int, int, int], None]] = None,
+                   progress_every: int = 25) -> dict:
         """
         Send emails to all recipients using SendGrid
+        Args:
+            on_progress: called as on_progress(sent, failed, total) every `progress_every` recipients
+            progress_every: how often to report progress
         Returns:
             dict: Status of email sending operation
         """
@@ -64,7 +73,9 @@ class EmailService:
         failed_recipients = []
         successful_count = 0
 
-        for recipient in self.recipients:
+        for index, recipient in enumerate(self.recipients, 1):
+            if on_progress and index > 1 and (index - 1) % progress_every == 0:
+                on_progress(successful_count, len(failed_recipients), len(self.recipients))
             try:
                 mail = self._create_mail_object(recipient)
                 response = self.sg_client.send(mail)
@@ -86,6 +97,9 @@ class EmailService:
                 })
                 logging.error(f"Exception while sending email to {recipient}: {str(e)}")
 
+        if on_progress:
+            on_progress(successful_count, len(failed_recipients), len(self.recipients))
+
         status = "success" if not failed_recipients else "partial_success" if successful_count else "error"
 
         return {
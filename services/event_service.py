@@ -1,18 +1,169 @@
+import re
+import time
+import asyncio
+import calendar
 import logging
 import feedparser
 import requests
+import concurrent.futures
 from bs4 import BeautifulSoup
-from typing import List, Dict
-from db_handler import Event, sites
+from utils.http_client import http_client, FEED_DISK_TTL
+from utils.parse_pool import parse_pool
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from db_handler import Event, EventIndex, sites
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# re-scrape the event sites at most this often; in between, upcoming events come from the index
+REFRESH_SECONDS = 6 * 60 * 60
+# dateutil fills fields missing from the text from its default; parsing against two defaults
+# that differ in every field shows which ones the text actually gave
+_DEFAULTS = (datetime(2000, 1, 1), datetime(2001, 2, 2))
+
+
+def parse_event_date(text: str) -> Optional[float]:
+    """
+    Start of an event as epoch seconds (UTC), None unless the text names a day, month
+    and year: "March 2027" or "in 3 days" must not become a confident date.
+    """
+    from dateutil import parser as date_parser
+    if not text:
+        return None
+    # "15-17 March 2026" and similar ranges: keep the first day
+    text = re.sub(r"(?<![\d-])(\d{1,2})\s*[-\u2013]\s*\d{1,2}(?![\d-])", r"\1", text)
+    try:
+        first, second = (date_parser.parse(text, default=default, fuzzy=True).date() for default in _DEFAULTS)
+    except (ValueError, OverflowError):
+        return None
+    if (first.year, first.month, first.day) != (second.year, second.month, second.day):
+        return None
+    return float(calendar.timegm(first.timetuple()))
+
+
+def parse_conference_alerts(soup: BeautifulSoup) -> List[Dict]:
+    events = []
+    # Updated selectors based on current site structure
+    items = soup.find_all('div', class_='conference-item')  # Changed from 'event-item'
+
+    if not items:
+        # Fallback to alternative selectors
+        items = soup.find_all('div', class_='conf-item')
+
+    for item in items:
+        try:
+            title_elem = item.find(['h2', 'h3', 'h4']) or item.find(class_='conf-title')
+            date_elem = item.find(class_=['date', 'conf-date'])
+            location_elem = item.find(class_=['location', 'conf-location'])
+            desc_elem = item.find(class_=['description', 'conf-description'])
+
+            if not title_elem:
+                continue
+
+            event = {
+                "title": title_elem.text.strip(),
+                "date": date_elem.text.strip() if date_elem else "",
+                "location": location_elem.text.strip() if location_elem else "",
+                "description": desc_elem.text.strip() if desc_elem else "",
+                "engagement": 0  # Default value if not found
+            }
+            events.append(event)
+        except Exception as e:
+            logger.error(f"Error parsing conference alert item: {e}")
+            continue
+    return events
+
+def parse_aideadlines(soup: BeautifulSoup) -> List[Dict]:
+    events = []
+    items = soup.select('.conference-item, .deadline-item')
+
+    for item in items:
+        try:
+            title_elem = item.find(['h3', 'h4']) or item.select_one('.conf-title')
+            date_elem = item.select_one('.deadline, .date')
+            location_elem = item.select_one('.location, .venue')
+            desc_elem = item.select_one('.description, .abstract')
+
+            if not title_elem:
+                continue
+
+            event = {
+                "title": title_elem.text.strip(),
+                "date": date_elem.text.strip() if date_elem else "",
+                "location": location_elem.text.strip() if location_elem else "",
+                "description": desc_elem.text.strip() if desc_elem else "",
+                "engagement": 0  # Default if not found
+            }
+            events.append(event)
+        except Exception as e:
+            logger.error(f"Error parsing aideadlines item: {e}")
+            continue
+    return events
+
+
+# host fragment -> parser; adding a site is one entry here. Parsers run in the parse pool,
+# so they must be module-level functions
+EVENT_PARSERS = {
+    "conferencealerts": parse_conference_alerts,
+    "aideadlin.es": parse_aideadlines
+}
+
+
+def _parse_event_page(url: str, content: bytes, parser) -> List[Dict]:
+    try:
+        events = parser(BeautifulSoup(content, 'html.parser'))
+    except Exception as e:
+        logger.error(f"Error processing {url}: {e}")
+        return []
+    for event in events:
+        event["source"] = url
+        event["starts"] = parse_event_date(event["date"])
+    return events
+
+
+def _parse_event_feed(url: str, content: bytes, headers: Dict[str, str]) -> List[Dict]:
+    try:
+        feed = feedparser.parse(content, response_headers=headers)
+    except Exception as e:
+        logger.error(f"Error parsing RSS feed: {e}")
+        return []
+    if not feed.entries:
+        logger.warning(f"No entries found in RSS feed: {url}")
+        return []
+
+    events = []
+    for entry in feed.entries:
+        event = {
+            "title": entry.get('title', ''),
+            "description": entry.get('description', ''),
+            "date": entry.get('published', ''),
+            "location": "",  # RSS feed might not have location
+            "source": url,
+            "engagement": 0
+        }
+        # the feed's date is when the post went out, not when the event happens: stored undated,
+        # these reach the newsletter through EventIndex.undated while they stay in the feed
+        event["starts"] = None
+        events.append(event)
+    return events
+
+
+def parse_event_source(url: str, content: bytes, headers: Dict[str, str], parser=None) -> List[Dict]:
+    """Parse-pool entry point: a site page through its parser, the events RSS feed when there is none"""
+    if parser is None:
+        return _parse_event_feed(url, content, headers)
+    return _parse_event_page(url, content, parser)
+
+
 class EventsService:
-    def __init__(self, rss_feed_url=sites["events_feed"], html_links=sites["events_url"], top_n=3):
+    def __init__(self, rss_feed_url=sites["events_feed"], html_links=sites["events_url"], top_n=3,
+                 index: Optional[EventIndex] = None):
         self.rss_feed_url = rss_feed_url
-        self.html_links = html_links  # Fixed variable name from html_link to html_links
+        self.html_links = html_links
         self.top_n = top_n
+        self.index = index or EventIndex()
+        self.parsers = dict(EVENT_PARSERS)
         self.events = []
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -21,129 +172,57 @@ class EventsService:
             'Connection': 'keep-alive',
         }
 
-    def _get_events_from_rss_feed(self) -> List[Dict]:
+    def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None,
+               disk_ttl: Optional[float] = None) -> Optional[requests.Response]:
         try:
-            feed = feedparser.parse(self.rss_feed_url)
-            if not feed.entries:
-                logger.warning(f"No entries found in RSS feed: {self.rss_feed_url}")
-                return []
-
-            events = []
-            for entry in feed.entries[:self.top_n]:
-                event = {
-                    "title": entry.get('title', ''),
-                    "description": entry.get('description', ''),
-                    "date": entry.get('published', ''),
-                    "location": "",  # RSS feed might not have location
-                    "engagement": 0
-                }
-                events.append(event)
-            return events
-        except Exception as e:
-            logger.error(f"Error parsing RSS feed: {e}")
-            return []
-
-    def _get_events_from_html_link(self) -> List[Dict]:  # Fixed method name typo
-        events = []
-        for url in self.html_links:
-            try:
-                response = requests.get(url, headers=self.headers, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                if "conferencealerts" in url:
-                    # Updated selector based on current site structure
-                    events.extend(self._parse_conference_alerts(soup))
-                elif "aideadlin.es" in url:
-                    events.extend(self._parse_aideadlines(soup))
-
-                if len(events) >= self.top_n:
-                    return events[:self.top_n]
-            except requests.RequestException as e:
-                logger.error(f"Error fetching {url}: {e}")
-                continue
-            except Exception as e:
-                logger.error(f"Error processing {url}: {e}")
-                continue
-        return events
-
-    def _parse_conference_alerts(self, soup: BeautifulSoup) -> List[Dict]:
-        events = []
-        # Updated selectors based on current site structure
-        items = soup.find_all('div', class_='conference-item')  # Changed from 'event-item'
-
-        if not items:
-            # Fallback to alternative selectors
-            items = soup.find_all('div', class_='conf-item')
-
-        for item in items:
-            try:
-                title_elem = item.find(['h2', 'h3', 'h4']) or item.find(class_='conf-title')
-                date_elem = item.find(class_=['date', 'conf-date'])
-                location_elem = item.find(class_=['location', 'conf-location'])
-                desc_elem = item.find(class_=['description', 'conf-description'])
-
-                if not title_elem:
-                    continue
-
-                event = {
-                    "title": title_elem.text.strip(),
-                    "date": date_elem.text.strip() if date_elem else "",
-                    "location": location_elem.text.strip() if location_elem else "",
-                    "description": desc_elem.text.strip() if desc_elem else "",
-                    "engagement": 0  # Default value if not found
-                }
-                events.append(event)
-            except Exception as e:
-                logger.error(f"Error parsing conference alert item: {e}")
-                continue
-        return events
-
-    def _parse_aideadlines(self, soup: BeautifulSoup) -> List[Dict]:
-        events = []
-        items = soup.select('.conference-item, .deadline-item')
-
-        for item in items:
-            try:
-                title_elem = item.find(['h3', 'h4']) or item.select_one('.conf-title')
-                date_elem = item.select_one('.deadline, .date')
-                location_elem = item.select_one('.location, .venue')
-                desc_elem = item.select_one('.description, .abstract')
-
-                if not title_elem:
-                    continue
-
-                event = {
-                    "title": title_elem.text.strip(),
-                    "date": date_elem.text.strip() if date_elem else "",
-                    "location": location_elem.text.strip() if location_elem else "",
-                    "description": desc_elem.text.strip() if desc_elem else "",
-                    "engagement": 0  # Default if not found
-                }
-                events.append(event)
-            except Exception as e:
-                logger.error(f"Error parsing aideadlines item: {e}")
-                continue
-        return events
+            response = http_client().get(url, headers=headers, disk_ttl=disk_ttl)
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+
+    def _fetch_source(self, url: str) -> Optional[Tuple]:
+        """Raw payload for the parse pool: the feed, or a site page with its parser"""
+        parser = None
+        if url != self.rss_feed_url:
+            parser = next((parse for host, parse in self.parsers.items() if host in url), None)
+            if parser is None:
+                logger.warning(f"No event parser registered for {url}")
+                return None
+        if parser is None:
+            response = self._fetch(url, disk_ttl=FEED_DISK_TTL)
+        else:
+            response = self._fetch(url, self.headers)
+        if response is None:
+            return None
+        return url, response.content, {"content-type": response.headers.get("content-type", "")}, parser
+
+    def refresh(self) -> int:
+        """Fetch every event source concurrently, parse them in the parse pool and upsert into the index"""
+        urls = list(self.html_links) + [self.rss_feed_url]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            payloads = [payload for payload in executor.map(self._fetch_source, urls) if payload]
+        events = [event for batch in parse_pool().imap(parse_event_source, payloads) for event in batch]
+        return self.index.upsert(events)
 
     async def get_upcoming_events(self):
-        # Get events from both sources
-        html_events = self._get_events_from_html_link()
-        rss_events = self._get_events_from_rss_feed()
+        if time.time() - self.index.last_collected() > REFRESH_SECONDS:
+            # fetching and parsing every source blocks; keep it off the event loop
+            await asyncio.to_thread(self.refresh)
 
-        # Combine and deduplicate events
-        temp_dict = {event["title"]: event for event in html_events + rss_events}
-        temp_list = list(temp_dict.values())
+        upcoming = self.index.upcoming(limit=self.top_n)
+        if len(upcoming) < self.top_n:
+            # fill with recently seen events whose dates did not parse
+            upcoming += self.index.undated(time.time() - REFRESH_SECONDS, self.top_n - len(upcoming))
 
-        # Create Event objects
-        new_events = [
+        events = [
             Event(
                 title=event["title"],
                 date=event["date"],
                 location=event["location"],
                 description=event["description"]
-            ) for event in temp_list[:self.top_n]
+            ) for event in upcoming
         ]
-
-        self.events.extend(new_events)
-        return self.events
\ No newline at end of file
+        self.events = events
+        return events
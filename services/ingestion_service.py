@@ -0,0 +1,178 @@
+import time
+import logging
+from threading import Event
+from typing import Dict, List, Optional
+from utils.utility import get_config
+from utils.tracking_utility import item_key
+from db_handler import (sites, engagement_log, FeedRegistry, save_ingested, prune_ingested, mark_ingested, last_ingested,
+                        load_ingested, load_paper_index, save_paper_index, load_rank_model, save_rank_model,
+                        prune_http_cache)
+from services.news_service import NewsService, store_key
+from services.event_service import EventsService
+from services.search_service import SearchService
+from services.keyword_index import KeywordIndex
+from services.vector_index import VectorIndex
+from services.rank_model import RankModel, engagement_labels, paper_text
+from services.apps import ArxivScanner, GitHubScanner, HuggingFaceScanner
+from utils.http_client import http_client, DISK_TTL
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# seconds between sweeps of each source
+DEFAULT_INTERVALS = {
+    "news": 15 * 60,
+    "paper": 60 * 60,
+    "product": 60 * 60,
+    "repo": 60 * 60,
+    "event": 6 * 60 * 60
+}
+
+
+class IngestionService:
+    def __init__(self, rss_urls: List[str], intervals: Optional[Dict[str, int]] = None,
+                 retention_days: int = 8, top_n: int = 25):
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.retention_days = retention_days
+        self.paper_index = load_paper_index() or KeywordIndex()
+        self.vector_index = VectorIndex.load()
+        self.rank_model = load_rank_model() or RankModel()
+        self.rss_urls = rss_urls
+        self.feed_registry = FeedRegistry()
+        self.news_service = NewsService(rss_urls)
+        self.events_service = EventsService()
+        self.search_service = SearchService()
+        self.arxiv = ArxivScanner(sites["arxiv_url"], top_n=top_n)
+        self.hf_scanner = HuggingFaceScanner(sites["hf_base_url"], top_n)
+        self.gh_scanners = [
+            GitHubScanner(sites["gh_daily_url"], "daily", top_n=top_n),
+            GitHubScanner(sites["gh_weekly_url"], "weekly", top_n=top_n)
+        ]
+
+    def _ingest_news(self, now: float) -> int:
+        # feeds added by discover_feeds.py join on the next sweep, no restart needed
+        self.news_service.rss_urls = self.feed_registry.urls(self.rss_urls)
+        items = {}
+        for item in self.news_service.fetch_all(since=now - self.retention_days * 24 * 60 * 60):
+            key = store_key(item)
+            items[key] = {"item": item, "time": item.published or None, "ingested": now}
+        save_ingested("news", items)
+        self.search_service.index_news(items)
+        new = [key for key in items if key not in self.vector_index]
+        self.vector_index.add(new, [items[key]["item"].text for key in new],
+                              [items[key]["time"] or now for key in new])
+        self.vector_index.save()
+        return len(items)
+
+    def _ingest_papers(self, now: float) -> int:
+        items = {}
+        # the same query the newsletter ranks with, so from_store builds see the papers a live fetch would
+        query = get_config().get("Arxiv", "q", fallback=None)
+        if not query:
+            query = self.arxiv.default_query
+            logger.warning("No [Arxiv] q configured, ingesting papers with the default arXiv query")
+        for paper in self.arxiv.fetch_papers(query, max_papers=200):
+            paper['time'] = paper['_time']
+            paper['ingested'] = now
+            items[f"paper-{paper['_id']}"] = paper
+            self.paper_index.add_paper(paper)
+        save_ingested("paper", items)
+        self.search_service.index_papers(items)
+        save_paper_index(self.paper_index)
+        new = [key for key in items if key not in self.vector_index]
+        self.vector_index.add(new, [paper_text(items[key]) for key in new],
+                              [items[key]['_time'] for key in new])
+        self.vector_index.save()
+        self.train_rank_model([items[key] for key in new])
+        return len(items)
+
+    def train_rank_model(self, papers: Optional[List[Dict]] = None, epochs: int = 1) -> int:
+        """partial_fit the persisted paper ranker on `papers`, or on the whole stored history"""
+        papers = load_ingested("paper") if papers is None else papers
+        if not papers:
+            return 0
+        keys = [item_key("paper", f"https://arxiv.org/abs/{p['_id']}") for p in papers]
+        clicks = engagement_log().counts(keys)
+        labels = engagement_labels(papers, [clicks[key] for key in keys])
+        for _ in range(epochs):
+            self.rank_model.partial_fit(papers, labels)
+        # a one-class first batch leaves the model unfitted; persisting it would break decision_function
+        if not self.rank_model.trained:
+            return 0
+        save_rank_model(self.rank_model)
+        return len(papers)
+
+    def _ingest_products(self, now: float) -> int:
+        snapshot = self.hf_scanner.weekly_scanner()
+        save_ingested("product", {
+            f"hf-{category}": {"category": category, "items": products, "ingested": now}
+            for category, products in snapshot.items()
+        }, time_key="ingested")
+        self.search_service.index_products(product for products in snapshot.values() for product in products)
+        return sum(len(products) for products in snapshot.values())
+
+    def _ingest_repos(self, now: float) -> int:
+        count = 0
+        for scanner in self.gh_scanners:
+            repos = scanner.trending()
+            save_ingested("repo", {
+                f"gh-{scanner.ftype}": {"ftype": scanner.ftype, "repos": repos, "ingested": now}
+            }, time_key="ingested")
+            self.search_service.index_repos(repos)
+            count += len(repos)
+        return count
+
+    def _ingest_events(self, now: float) -> int:
+        return self.events_service.refresh()
+
+    def run_once(self, force: bool = False) -> Dict[str, int]:
+        """Sweep every source whose interval has elapsed and return the item counts per source"""
+        sources = {
+            "news": self._ingest_news,
+            "paper": self._ingest_papers,
+            "product": self._ingest_products,
+            "repo": self._ingest_repos,
+            "event": self._ingest_events
+        }
+        counts = {}
+        for source, ingest in sources.items():
+            now = time.time()
+            if not force and now - last_ingested(source) < self.intervals[source]:
+                continue
+            try:
+                counts[source] = ingest(now)
+                mark_ingested(source, now)
+                logger.info(f"Ingested {counts[source]} {source} items")
+            except Exception as e:
+                logger.error(f"Error ingesting {source}: {str(e)}")
+
+        before = time.time() - self.retention_days * 24 * 60 * 60
+        pruned = prune_ingested(before) + self.events_service.index.prune(before) + self.search_service.prune(before)
+        # the tracker folds on every flush; folding here too means a crash between its append and
+        # aggregate cannot leave events that prune (which only drops folded rows) keeps forever
+        engagement_log().aggregate()
+        pruned += engagement_log().prune(before)
+        if self.paper_index.prune(before):
+            save_paper_index(self.paper_index)
+        if self.vector_index.prune(before):
+            self.vector_index.save()
+        if http_client().cache_mode == "cache":
+            # responses are stored with at most DISK_TTL to live; older files are dead weight
+            prune_http_cache(time.time() - DISK_TTL)
+        if pruned:
+            logger.info(f"Pruned {pruned} stale items")
+        return counts
+
+    def run_forever(self, stop_event: Optional[Event] = None, poll_seconds: int = 30):
+        stop_event = stop_event or Event()
+        logger.info("Ingestion worker started")
+        while not stop_event.is_set():
+            self.run_once()
+            stop_event.wait(poll_seconds)
+        logger.info("Ingestion worker stopped")
+
+
+def is_store_fresh(source: str = "news", max_age: Optional[int] = None) -> bool:
+    """True when the ingestion worker has swept `source` recently enough to build from the store"""
+    max_age = max_age or 2 * DEFAULT_INTERVALS[source]
+    return time.time() - last_ingested(source) < max_age
@@ -0,0 +1,44 @@
+import numpy as np
+from typing import List, Optional, Sequence
+from db_handler import FeedItem
+
+
+class ItemTable:
+    """
+    Column-oriented view of a batch of news items for the digest ranking.
+    Timestamps and scores are NumPy arrays, so the date window and top-k are plain
+    array ops instead of per-item Python comparisons and a full sort.
+    """
+
+    def __init__(self, timestamps: Sequence[float]):
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.scores = np.zeros(len(self.timestamps), dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_feed_items(cls, items: List[FeedItem]) -> "ItemTable":
+        return cls([item.published for item in items])
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Indices of items with start <= timestamp < end"""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.timestamps >= start
+        if end is not None:
+            mask &= self.timestamps < end
+        return np.flatnonzero(mask)
+
+    def top_k(self, k: int, scores: Optional[np.ndarray] = None, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Indices of the k best items by (score, timestamp), best first"""
+        scores = self.scores if scores is None else scores
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices)
+        if len(indices) == 0 or k <= 0:
+            return indices[:0]
+        if k < len(indices):
+            # argpartition on the score alone, widened to keep every item tied with the k-th score
+            best = np.argpartition(-scores[indices], k - 1)[:k]
+            indices = indices[scores[indices] >= scores[indices[best]].min()]
+        order = np.lexsort((-self.timestamps[indices], -scores[indices]))
+        return indices[order][:k]
@@ -0,0 +1,120 @@
+import re
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# per-field weights, matching the substring scorer this index replaces
+PAPER_FIELD_WEIGHTS = {"title": 20.0, "authors": 10.0, "summary": 5.0}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def paper_fields(paper: Dict) -> Dict[str, str]:
+    return {
+        "title": paper.get('title', ''),
+        "authors": ' '.join(a['name'] for a in paper.get('authors', [])),
+        "summary": paper.get('summary', '')
+    }
+
+
+class KeywordIndex:
+    """
+    Token-level inverted index with per-field weights.
+    A document scores, for every query term it contains, the sum of the weights
+    of the fields that contain it. Documents are added incrementally; search uses
+    MaxScore-style early termination so common terms only touch live candidates.
+    """
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None):
+        self.field_weights = dict(field_weights or PAPER_FIELD_WEIGHTS)
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}
+        self.doc_times: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_terms
+
+    @classmethod
+    def from_papers(cls, papers: Iterable[Dict]) -> "KeywordIndex":
+        index = cls()
+        for paper in papers:
+            index.add_paper(paper)
+        return index
+
+    def add(self, doc_id: str, fields: Dict[str, str], timestamp: float = 0.0) -> None:
+        if doc_id in self.doc_terms:
+            self.remove(doc_id)
+        weights: Dict[str, float] = {}
+        for name, weight in self.field_weights.items():
+            for term in set(tokenize(fields.get(name, ""))):
+                weights[term] = weights.get(term, 0.0) + weight
+        for term, weight in weights.items():
+            self.postings.setdefault(term, {})[doc_id] = weight
+        self.doc_terms[doc_id] = tuple(weights)
+        self.doc_times[doc_id] = timestamp
+
+    def add_paper(self, paper: Dict) -> None:
+        self.add(paper['_id'], paper_fields(paper), paper.get('_time', 0.0))
+
+    def remove(self, doc_id: str) -> None:
+        for term in self.doc_terms.pop(doc_id, ()):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.doc_times.pop(doc_id, None)
+
+    def prune(self, before: float) -> int:
+        stale = [doc_id for doc_id, t in self.doc_times.items() if t < before]
+        for doc_id in stale:
+            self.remove(doc_id)
+        return len(stale)
+
+    def score_fields(self, query: str, fields: Dict[str, str]) -> float:
+        """Score a document that is not in the index, exactly as search would once it was added"""
+        terms = set(tokenize(query))
+        return sum(weight for name, weight in self.field_weights.items()
+                   for term in terms & set(tokenize(fields.get(name, ""))))
+
+    def search(self, query: str, k: int = 10, doc_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) for the query, ties broken by recency; `doc_ids` restricts the candidates"""
+        allowed = None if doc_ids is None else set(doc_ids)
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+        if not terms or k <= 0:
+            return []
+        max_weight = sum(self.field_weights.values())
+        # rare terms first: they seed a small candidate set that common terms then only update
+        terms.sort(key=lambda t: len(self.postings[t]))
+        remaining = max_weight * len(terms)
+        scores: Dict[str, float] = {}
+        open_set = True
+
+        for term in terms:
+            posting = self.postings[term]
+            remaining -= max_weight
+            if open_set:
+                for doc_id, weight in posting.items():
+                    if allowed is None or doc_id in allowed:
+                        scores[doc_id] = scores.get(doc_id, 0.0) + weight
+            else:
+                for doc_id in scores:
+                    weight = posting.get(doc_id)
+                    if weight:
+                        scores[doc_id] += weight
+
+            if len(scores) >= k:
+                threshold = heapq.nlargest(k, scores.values())[-1]
+                # once nothing unseen can reach the k-th score, stop admitting new documents
+                if open_set and threshold > remaining:
+                    open_set = False
+                if not open_set:
+                    scores = {d: s for d, s in scores.items() if s + remaining >= threshold}
+
+        return heapq.nlargest(k, scores.items(), key=lambda kv: (kv[1], self.doc_times.get(kv[0], 0.0)))
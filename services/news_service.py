@@ -1,14 +1,17 @@
+import sys
 import pytz
 import logging
-import feedparser
 import numpy as np
 import concurrent.futures
-from bs4 import BeautifulSoup
-from datetime import datetime
-from typing import Dict, List
-from db_handler import NewsItem
-from email.utils import parsedate_to_datetime
-from sklearn.feature_extraction.text import TfidfVectorizer
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from utils.utility import generate_deterministic_id
+from utils.tracking_utility import item_key
+from utils.http_client import http_client, FEED_DISK_TTL
+from utils.parse_pool import parse_pool
+from db_handler import NewsItem, FeedItem, engagement_log, load_ingested, get_ingested
+from services.item_table import ItemTable
+from services.crawler.feed_reader import feed_records
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,71 +19,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# feeds are fetched in parallel; the shared client keeps per-host pools and pacing, and the
+# fetched bytes are parsed in the process pool so parsing scales with cores, not the GIL
+FETCH_WORKERS = 32
+
+# weight of log(1 + clicks from earlier issues) next to the 0..1 importance score
+ENGAGEMENT_WEIGHT = 0.25
+
+
+def store_key(item: FeedItem) -> str:
+    """Key of a news item in the ingestion store and the semantic index"""
+    return generate_deterministic_id({"key": item.key}, ["key"], prefix="news")
+
+
+class NewsDigest(NamedTuple):
+    """Result of one highlights run: the summary list and the matching news items"""
+    summary: List[Dict]
+    news: List[NewsItem]
+
 
 class NewsService:
-    def __init__(self, rss_urls: List[str]):
+    def __init__(self, rss_urls: List[str], from_store: bool = False, window: Optional[timedelta] = None):
         self.rss_urls = rss_urls
-        self.tfidf = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2)
-        )
-        self.summary = []
-        self.news = []
-
-    def _clean_html(self, text: str) -> str:
-        if not text:
-            return ''
-        soup = BeautifulSoup(text, 'html.parser')
-        return soup.get_text().strip()
-
-    def _parse_date(self, date_str: str) -> datetime:
-        try:
-            parsed_date = parsedate_to_datetime(date_str)
-            return parsed_date.replace(tzinfo=pytz.UTC)
-        except:
-            return datetime.min.replace(tzinfo=pytz.UTC)
+        self.from_store = from_store
+        self.window = window or timedelta(days=1)
+        # last completed run; replaced, never extended, so a long-lived service stays bounded
+        self.digest = NewsDigest([], [])
 
-    def _fetch_feed(self, url: str) -> List[Dict]:
+    def _fetch_raw(self, url: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
         try:
-            feed = feedparser.parse(url)
-            news_items = []
-
-            for entry in feed.entries:
-                description = entry.get('description', '')
-                if not description and 'content' in entry:
-                    description = entry.content[0].value
-
-                additional_info = {
-                    'published_date': self._parse_date(entry.get('published', '')),
-                    'author': entry.get('author', None),
-                    'categories': entry.get('tags', []),
-                    'guid': entry.get('id', None)
-                }
-
-                item = {
-                    'title': entry.get('title', ''),
-                    'description': self._clean_html(description),
-                    'link': entry.get('link', ''),
-                    'source': feed.feed.get('title', 'Unknown Source'),
-                    'engagement': None,  # Can be updated if engagement metrics are available
-                    'additional_info': additional_info,
-                    'full_text': f"{entry.get('title', '')} {self._clean_html(description)}"  # for ranking
-                }
-
-                news_items.append(item)
-
-            return news_items
+            response = http_client().get(url, disk_ttl=FEED_DISK_TTL)
+            response.raise_for_status()
+            return response.content, {"content-type": response.headers.get("content-type", "")}
         except Exception as e:
             print(f"Error fetching feed {url}: {str(e)}")
-            return []
-
-    def _calculate_importance_scores(self, news_items: List[Dict]) -> List[float]:
+            return None
+
+    @staticmethod
+    def _to_items(title: str, records: List[Tuple]) -> List[FeedItem]:
+        source = sys.intern(title or 'Unknown Source')
+        return [FeedItem(
+            title=title_,
+            description=description,
+            link=link,
+            source=source,
+            published=published,
+            author=author,
+            categories=tuple(sys.intern(term) for term in categories),
+            guid=guid
+        ) for title_, description, link, published, author, categories, guid in records]
+
+    def _calculate_importance_scores(self, news_items: List[FeedItem]) -> List[float]:
         if not news_items:
             return []
         try:
-            texts = [item['full_text'] for item in news_items]
-            x = self.tfidf.fit_transform(texts)
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            # fitted per call: runs may overlap when the service is shared between builds
+            tfidf = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 2))
+            texts = [item.text for item in news_items]
+            x = tfidf.fit_transform(texts)
             doc_lengths = x.sum(axis=1).A1
             term_importance = np.sqrt(np.asarray(x.mean(axis=0)).ravel())
             scores = doc_lengths * np.dot(x.toarray(), term_importance)
@@ -98,57 +95,86 @@ class NewsService:
         seconds = int((total_minutes - minutes) * 60)
         return minutes
 
-    async def get_highlights(self, max_items: int = 5) -> List[NewsItem]:
+    def fetch_all(self, since: float = 0.0) -> List[FeedItem]:
+        """Items from every feed; entries published before `since` (epoch seconds) are never materialized"""
+        pool = parse_pool().start()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            futures = {executor.submit(self._fetch_raw, url): url for url in self.rss_urls}
+
+            def fetched() -> Iterator[Tuple]:
+                # handed to the parse pool as each download lands, so parsing overlaps the slow feeds
+                for future in concurrent.futures.as_completed(futures):
+                    raw = future.result()
+                    if raw is not None:
+                        yield futures[future], raw[0], since, raw[1]
+
+            all_news = []
+            for title, records in pool.imap(feed_records, fetched()):
+                all_news.extend(self._to_items(title, records))
+        return all_news
+
+    @staticmethod
+    def _dedupe(items: List[FeedItem]) -> List[FeedItem]:
+        # the same story often appears in several aggregator feeds
+        unique = {}
+        for item in items:
+            unique.setdefault(item.key, item)
+        return list(unique.values())
+
+    async def get_digest(self, max_items: int = 5) -> NewsDigest:
         today = datetime.now(pytz.UTC)
-        all_news = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_url = {
-                executor.submit(self._fetch_feed, url): url
-                for url in self.rss_urls
-            }
-
-            for future in concurrent.futures.as_completed(future_to_url):
-                news_items = future.result()
-                all_news.extend(news_items)
-
-        today_news = [
-            item for item in all_news
-            if item['additional_info']['published_date'].date() == today.date()
-        ]
-
-        if not today_news:
-            return []
-
-        importance_scores = self._calculate_importance_scores(today_news)
-
-        for item, score in zip(today_news, importance_scores):
-            item['additional_info']['importance_score'] = float(score)
-
-        if len(today_news) > 1:
-            sorted_news = sorted(
-                today_news,
-                key=lambda x: (
-                    x['additional_info']['importance_score'],
-                    x['additional_info']['published_date']
-                ),
-                reverse=True
-            )
+        if self.from_store:
+            candidates = [
+                entry['item'] for entry in load_ingested("news", (today - self.window).timestamp())
+                if 'item' in entry
+            ]
+        else:
+            midnight = today.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+            candidates = self.fetch_all(since=midnight)
+        candidates = self._dedupe(candidates)
+
+        table = ItemTable.from_feed_items(candidates)
+        if self.from_store:
+            # the store already applied the window, using first-seen time for undated items
+            in_window = np.arange(len(table))
         else:
-            sorted_news = today_news
-
-        for item in sorted_news[:max_items]:
-            read_time = self._calculate_read_time(item['description'])
-            self.news.append(NewsItem(
-                title=item['title'],
-                description=item['description'],
-                link=item['link'],
-                read_time=read_time,
-                source=item['source'],
-                engagement=item['engagement'],
-                additional_info=item['additional_info']
-            ))
-            self.summary.append({"title": item['title'], "read_time": read_time})
-        return self.summary
-
-    async def get_news(self):
-        return self.news
+            midnight = today.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+            in_window = table.window(midnight, midnight + 24 * 60 * 60)
+        if len(in_window) == 0:
+            self.digest = NewsDigest([], [])
+            return self.digest
+
+        today_news = [candidates[i] for i in in_window]
+        clicks = engagement_log().counts(item_key("news", item.link) for item in today_news)
+        table.scores[in_window] = np.asarray(self._calculate_importance_scores(today_news)) + \
+            ENGAGEMENT_WEIGHT * np.log1p([clicks[item_key("news", item.link)] for item in today_news])
+
+        summary, news = [], []
+        for i in table.top_k(max_items, indices=in_window):
+            item = candidates[i]
+            item.score = float(table.scores[i])
+            read_time = self._calculate_read_time(item.description)
+            engaged = clicks[item_key("news", item.link)]
+            news.append(item.to_news_item(read_time, str(engaged) if engaged else None))
+            summary.append({"title": item.title, "read_time": read_time})
+        self.digest = NewsDigest(summary, news)
+        return self.digest
+
+    async def get_highlights(self, max_items: int = 5) -> List[Dict]:
+        return (await self.get_digest(max_items)).summary
+
+    def similar_news(self, text: Optional[str] = None, item: Optional[FeedItem] = None,
+                     k: int = 5, key: Optional[str] = None) -> List[FeedItem]:
+        """Stored news closest to a text, or to another item given as a FeedItem or its store key"""
+        from services.vector_index import VectorIndex
+        hits = dict(VectorIndex.load().query(
+            text=text, item_id=key or (store_key(item) if item else None), k=k, prefix="news-"))
+        # get_ingested skips keys pruned from the store since they were indexed, so match by key
+        similar = []
+        for entry in get_ingested(list(hits)):
+            entry['item'].score = hits[store_key(entry['item'])]
+            similar.append(entry['item'])
+        return similar
+
+    async def get_news(self) -> List[NewsItem]:
+        return self.digest.news
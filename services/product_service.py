@@ -1,23 +1,32 @@
-from db_handler import Products, sites
+import asyncio
+from db_handler import Products, sites, load_ingested
 from services.apps import HuggingFaceScanner, ProductHuntScanner
 
 class ProductService:
-    def __init__(self):
-        self.hf_scanner = HuggingFaceScanner(sites["hf_base_url"],1)
-        self.ph_scanner = ProductHuntScanner(sites["ph_site_url"], sites["ph_url"],1)
+    def __init__(self, from_store: bool = False, top_n: int = 3):
+        self.from_store = from_store
+        self.hf_scanner = HuggingFaceScanner(sites["hf_base_url"], top_n)
+        self.ph_scanner = ProductHuntScanner(sites["ph_site_url"], sites["ph_url"], top_n)
         self.products = []
 
+    def _ingested_products(self):
+        snapshots = load_ingested("product")
+        return {snap["category"]: snap["items"][:self.hf_scanner.top_n] for snap in snapshots}
+
     async def get_latest_products(self):
-        hf_products = self.hf_scanner.weekly_scanner()
-        ph_products = None #self.ph_scanner.get_last_week_top_products()
-        final_dict = hf_products #+ ph_products
-        for key, items in final_dict.items():
-            for item in items:
-                self.products.append(Products(
-                    name = item["title"],
-                    link = item["link"],
-                    summary = item["summary"],
-                    source = item["source"],
-                    engagement = item["engagement"]
-                    ))
-        return self.products
+        # both sources are network-bound, so ProductHunt is fetched while HuggingFace runs
+        ph_task = asyncio.create_task(asyncio.to_thread(self.ph_scanner.get_last_week_top_products))
+        hf_products = self._ingested_products() if self.from_store else None
+        if not hf_products:
+            hf_products = await asyncio.to_thread(self.hf_scanner.weekly_scanner)
+        ph_products = await ph_task
+        final_dict = {**hf_products, "producthunt": ph_products}
+        products = [Products(
+            name = item["title"],
+            link = item["link"],
+            summary = item["summary"],
+            source = item["source"],
+            engagement = item["engagement"]
+            ) for items in final_dict.values() for item in items]
+        self.products = products
+        return products
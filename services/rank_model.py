@@ -0,0 +1,55 @@
+import numpy as np
+from typing import Dict, List, Sequence
+
+
+def paper_text(p: Dict) -> str:
+    """Text of a raw arXiv entry or a formatted paper dict, in one consistent layout"""
+    authors = p.get('authors', [])
+    names = [a['name'] if isinstance(a, dict) else a for a in authors]
+    return f"{p.get('title', '')} {p.get('abstract') or p.get('summary', '')} {' '.join(names)}"
+
+
+def recency_labels(papers: Sequence[Dict]) -> np.ndarray:
+    """1 for papers newer than the batch median, the signal the per-run SVM used to learn"""
+    times = np.array([p.get('_time', 0.0) for p in papers])
+    return (times > np.median(times)).astype(int) if len(times) else np.zeros(0, dtype=int)
+
+
+def engagement_labels(papers: Sequence[Dict], clicks: Sequence[int]) -> np.ndarray:
+    """Papers readers clicked in earlier issues are positives; the rest fall back to recency"""
+    labels = recency_labels(papers)
+    labels[np.asarray(clicks) > 0] = 1
+    return labels
+
+
+class RankModel:
+    """
+    Linear paper ranker over hashed unigram+bigram features.
+    Trained incrementally with partial_fit by the ingestion worker and persisted,
+    so newsletter generation only calls decision_function.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, seed: int = 42):
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words='english',
+            ngram_range=(1, 2)
+        )
+        # hinge loss is a linear SVM, trained online
+        self.clf = SGDClassifier(loss='hinge', alpha=1e-5, random_state=seed)
+        self.trained = 0
+
+    def partial_fit(self, papers: List[Dict], labels: Sequence[int]) -> None:
+        labels = np.asarray(labels)
+        if not papers or len(np.unique(labels)) < 2 and not self.trained:
+            return
+        x = self.vectorizer.transform([paper_text(p) for p in papers])
+        self.clf.partial_fit(x, labels, classes=np.array([0, 1]))
+        self.trained += len(papers)
+
+    def decision_function(self, papers: List[Dict]) -> np.ndarray:
+        if not papers:
+            return np.zeros(0)
+        return self.clf.decision_function(self.vectorizer.transform([paper_text(p) for p in papers]))
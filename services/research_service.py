@@ -1,66 +1,73 @@
 import numpy as np
-import configparser
-from sklearn import svm
-from db_handler import sites
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta
+from utils.utility import get_config
+from utils.tracking_utility import item_key
+from db_handler import sites, engagement_log, load_ingested, get_ingested, load_rank_model
 
 from db_handler import ResearchPaper
 from services.apps import ArxivScanner
 from services.apps import OpenReviewScanner
-from sklearn.feature_extraction.text import TfidfVectorizer
 
+# weight of log(1 + clicks from earlier issues) added to the model's decision value
+ENGAGEMENT_WEIGHT = 0.5
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
 
 class ResearchService:
-    def __init__(self, top_n:int = 3):
+    def __init__(self, top_n:int = 3, from_store: bool = False, window: Optional[timedelta] = None):
         self.top_n = top_n
+        self.from_store = from_store
+        self.window = window or timedelta(days=1)
         self. arxiv = ArxivScanner(sites["arxiv_url"], top_n=top_n)
         self.open_review = OpenReviewScanner(top_n=top_n)
+        self.rank_model = load_rank_model()
+        self.arxiv.rank_model = self.rank_model
         self.top_papers = []
 
-    def _rerank(self, arxiv_papers: List[Dict], open_papers: List[Dict]) -> List[Dict]:
-        all_papers = arxiv_papers + open_papers
-        texts = [f"{p['title']} {p['abstract']} {' '.join(p['authors'])}" for p in all_papers]
+    @property
+    def model_ready(self) -> bool:
+        return self.rank_model is not None and self.rank_model.trained > 0
 
-        vectorizer = TfidfVectorizer(
-            max_features=5000,
-            stop_words='english',
-            ngram_range=(1, 2)
-        )
-        x = vectorizer.fit_transform(texts)
-        y = np.zeros(len(all_papers))
-        for i, paper in enumerate(all_papers):
-            score = float(paper.get('score', 0))
-            citations = float(paper.get('citations', 0))
-            y[i] = score + 0.1 * citations
+    def _rerank(self, arxiv_papers: List[Dict], open_papers: Optional[List[Dict]]) -> List[Dict]:
+        all_papers = arxiv_papers + (open_papers or [])
+        if self.model_ready:
+            scores = self.rank_model.decision_function(all_papers)
+        else:
+            # no trained model yet: keep the upstream ranking, blended with citations as before
+            scores = [float(p.get('score', 0)) + 0.1 * float(p.get('citations', 0)) for p in all_papers]
+        clicks = engagement_log().counts(item_key("paper", p['url']) for p in all_papers)
+        for p in all_papers:
+            p['clicks'] = clicks[item_key("paper", p['url'])]
+        scores = np.asarray(scores) + ENGAGEMENT_WEIGHT * np.log1p([p['clicks'] for p in all_papers])
+        order = sorted(range(len(all_papers)), key=lambda i: scores[i], reverse=True)
+        return [all_papers[i] for i in order[:self.top_n]]
 
-        if y.max() > y.min():
-            y = (y - y.min()) / (y.max() - y.min())
-
-        clf = svm.LinearSVC(
-            class_weight='balanced',
-            max_iter=1000,
-            dual=False
-        )
-        clf.fit(x, y > np.median(y))
-        scores = clf.decision_function(x)
-        scored_papers = [(paper, score) for paper, score in zip(all_papers, scores)]
-        reranked = sorted(scored_papers, key=lambda x: x[1], reverse=True)
-        return [paper for paper, _ in reranked[:self.top_n]]
+    def similar_papers(self, text: Optional[str] = None, paper_id: Optional[str] = None,
+                       k: Optional[int] = None) -> List[Dict]:
+        """Stored papers closest to a text or to another paper, from the ingestion worker's semantic index"""
+        from services.vector_index import VectorIndex
+        hits = dict(VectorIndex.load().query(
+            text=text, item_id=f"paper-{paper_id}" if paper_id else None, k=k or self.top_n, prefix="paper-"))
+        return [self.arxiv._format_paper(p, hits[f"paper-{p['_id']}"]) for p in get_ingested(list(hits))]
 
     async def get_latest_papers(self):
-        search_query = config["Arxiv"]["q"]
-        arxiv_papers = self.arxiv.get_top_n_papers(search_query=search_query)
+        # cached per file version, so a warm service picks up a retrained model on its next run
+        self.rank_model = self.arxiv.rank_model = load_rank_model()
+        search_query = get_config()["Arxiv"]["q"]
+        papers = None
+        if self.from_store:
+            papers = load_ingested("paper", (datetime.now() - self.window).timestamp()) or None
+        arxiv_papers = self.arxiv.get_top_n_papers(search_query=search_query, papers=papers,
+                                                   rank_method='model' if self.model_ready else 'svm')
         open_r_papers = self.open_review.get_top_n_papers()
         reranked_papers = self._rerank(arxiv_papers, open_r_papers)
-        self.top_papers.extend(ResearchPaper(
+        top_papers = [ResearchPaper(
             title = paper["title"],
             abstract= paper["abstract"],
             authors = paper["authors"],
             publication = paper["publication"],
             date = paper["_time_str"],
             link = paper["url"],
-            engagement = "") for paper in reranked_papers)
-        return self.top_papers
+            engagement = str(paper["clicks"]) if paper.get("clicks") else "") for paper in reranked_papers]
+        self.top_papers = top_papers
+        return top_papers
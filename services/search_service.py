@@ -0,0 +1,75 @@
+import calendar
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from db_handler import SearchIndex
+from utils.tracking_utility import item_key
+
+# kinds the ingestion worker re-indexes and prunes; archived issues are kept for good
+INGESTED_KINDS = ("news", "paper", "product", "repo")
+MAX_PER_PAGE = 100
+
+
+def _issue_time(created: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an issue's YYYY-MM-DD `created` date"""
+    try:
+        return float(calendar.timegm(datetime.strptime(created[:10], "%Y-%m-%d").timetuple()))
+    except (TypeError, ValueError):
+        return None
+
+
+class SearchService:
+    """Feeds the full-text index from the ingestion store and the newsletter archive, and queries it"""
+
+    def __init__(self, index: Optional[SearchIndex] = None):
+        self.index = index or SearchIndex()
+
+    def index_news(self, entries: Dict[str, Dict[str, Any]]) -> int:
+        """Entries as saved by the ingestion worker: store key -> {"item": FeedItem, ...}"""
+        return self.index.add({
+            "key": key, "kind": "news", "title": entry["item"].title, "body": entry["item"].description,
+            "link": entry["item"].link, "source": entry["item"].source, "published": entry["item"].published or None
+        } for key, entry in entries.items())
+
+    def index_papers(self, papers: Dict[str, Dict[str, Any]]) -> int:
+        return self.index.add({
+            "key": key, "kind": "paper", "title": paper["title"],
+            "body": f"{paper.get('summary', '')} {' '.join(a['name'] for a in paper.get('authors', []))}",
+            "link": f"https://arxiv.org/abs/{paper['_id']}", "source": "arXiv", "published": paper.get("_time")
+        } for key, paper in papers.items())
+
+    def index_products(self, products: Iterable[Dict[str, Any]]) -> int:
+        return self.index.add({
+            "key": item_key("product", product["link"]), "kind": "product", "title": product["title"],
+            "body": product.get("summary", ""), "link": product["link"], "source": product.get("source")
+        } for product in products)
+
+    def index_repos(self, repos: Iterable[Dict[str, Any]]) -> int:
+        return self.index.add({
+            "key": item_key("repo", repo["link"]), "kind": "repo", "title": repo["name"],
+            "body": f"{repo.get('description', '')} {repo.get('language', '')}", "link": repo["link"],
+            "source": "GitHub"
+        } for repo in repos)
+
+    def index_newsletters(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Archived issues as stored in DynamoDB; the html is reduced to its text"""
+        from bs4 import BeautifulSoup
+        return self.index.add(({
+            "key": item["newsletterId"], "kind": "newsletter",
+            "title": f"{str(item.get('type', '')).title()} newsletter {item.get('created', '')}".strip(),
+            "body": BeautifulSoup(item.get("content") or "", "html.parser").get_text(" ", strip=True),
+            "source": item.get("type"), "published": _issue_time(item.get("created"))
+        } for item in items), replace=True)
+
+    def index_archive(self, dynamo) -> int:
+        """Backfill every archived issue from the newsletter table"""
+        return self.index_newsletters(dynamo.scan_all("newsletter"))
+
+    def prune(self, before: float) -> int:
+        return self.index.prune(before, INGESTED_KINDS)
+
+    def search(self, query: str, kinds: Optional[List[str]] = None, since: Optional[float] = None,
+               page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        page, per_page = max(1, page), min(max(1, per_page), MAX_PER_PAGE)
+        found = self.index.search(query, kinds=kinds, since=since, page=page, per_page=per_page)
+        return {"query": query, "page": page, "per_page": per_page,
+                "pages": -(-found["total"] // per_page), **found}
@@ -0,0 +1,179 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from db_handler import (append_vectors, write_vectors, drop_vectors, open_vectors, save_vector_index,
+                        load_vector_index)
+
+HASH_FEATURES = 2 ** 18
+
+
+class VectorIndex:
+    """
+    Disk-backed approximate nearest-neighbour index over news and paper text.
+    Text is feature-hashed (no fitted vocabulary) and sparsely projected to a
+    small dense vector, so every process embeds the same text the same way.
+    Vectors are appended to a memory-mapped file; sign-random-projection LSH
+    tables pick candidates which are then scored by exact cosine similarity.
+    Ids are the ingestion-store keys ("paper-...", "news-...").
+    """
+
+    def __init__(self, dim: int = 256, n_tables: int = 8, n_bits: int = 10, seed: int = 42):
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self.ids: List[Optional[str]] = []  # row -> id, None once removed
+        self.rows: Dict[str, int] = {}
+        self.times: List[float] = []
+        self.buckets: List[Dict[int, List[int]]] = [{} for _ in range(n_tables)]
+        # vectors file generation, bumped by compact()
+        self.generation = 0
+        self._init_transforms()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_vectorizer', '_projection', '_planes', '_powers', '_vectors'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('generation', 0)
+        self.__dict__.update(state)
+        self._init_transforms()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.rows
+
+    @classmethod
+    def load(cls) -> "VectorIndex":
+        return load_vector_index() or cls()
+
+    def save(self) -> None:
+        if len(self.ids) > 2 * len(self.rows) + 1000:
+            self.compact()
+        save_vector_index(self)
+        # the previous generation stays for readers that loaded the pickle just before this save
+        drop_vectors(self.generation - 1)
+
+    def _init_transforms(self):
+        from scipy import sparse
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self._vectorizer = HashingVectorizer(
+            n_features=HASH_FEATURES,
+            alternate_sign=False,
+            stop_words='english',
+            ngram_range=(1, 2)
+        )
+        # each hashed feature lands on 4 output dims with random signs: a sparse
+        # Johnson-Lindenstrauss projection that is cheap to regenerate from the seed
+        rng = np.random.default_rng(self.seed)
+        nnz = 4
+        cols = rng.integers(0, self.dim, (HASH_FEATURES, nnz))
+        vals = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), (HASH_FEATURES, nnz)) / np.sqrt(nnz)
+        self._projection = sparse.csr_matrix(
+            (vals.ravel(), cols.ravel(), np.arange(0, HASH_FEATURES * nnz + 1, nnz)),
+            shape=(HASH_FEATURES, self.dim)
+        )
+        self._planes = rng.standard_normal((self.dim, self.n_tables * self.n_bits)).astype(np.float32)
+        self._powers = 1 << np.arange(self.n_bits)
+        self._vectors = None
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._vectors is None or len(self._vectors) != len(self.ids):
+            self._vectors = open_vectors(self.dim, len(self.ids), self.generation)
+        return self._vectors
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        x = self._vectorizer.transform(texts) @ self._projection
+        v = np.asarray(x.todense(), dtype=np.float32)
+        norms = np.linalg.norm(v, axis=1, keepdims=True)
+        return v / np.maximum(norms, 1e-8)
+
+    def _signatures(self, vectors: np.ndarray) -> np.ndarray:
+        bits = (vectors @ self._planes > 0).reshape(len(vectors), self.n_tables, self.n_bits)
+        return bits @ self._powers
+
+    def _bucket(self, rows: Sequence[int], vectors: np.ndarray) -> None:
+        for row, keys in zip(rows, self._signatures(vectors)):
+            for table, key in zip(self.buckets, keys.tolist()):
+                table.setdefault(key, []).append(row)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], times: Sequence[float]) -> None:
+        """Embed and append items; re-adding an id replaces its vector"""
+        if not ids:
+            return
+        self.remove(ids)
+        vectors = self.embed(texts)
+        append_vectors(vectors, len(self.ids), self.generation)
+        start = len(self.ids)
+        for offset, (item_id, t) in enumerate(zip(ids, times)):
+            self.rows[item_id] = start + offset
+            self.ids.append(item_id)
+            self.times.append(t or 0.0)
+        self._bucket(range(start, start + len(ids)), vectors)
+        self._vectors = None
+
+    def remove(self, ids: Sequence[str]) -> None:
+        # rows are only tombstoned here; compact() rewrites the file
+        for item_id in ids:
+            row = self.rows.pop(item_id, None)
+            if row is not None:
+                self.ids[row] = None
+
+    def prune(self, before: float) -> int:
+        stale = [item_id for item_id, row in self.rows.items() if self.times[row] < before]
+        self.remove(stale)
+        return len(stale)
+
+    def compact(self) -> None:
+        alive = [row for row, item_id in enumerate(self.ids) if item_id is not None]
+        vectors = np.array(self.vectors[alive]) if alive else np.zeros((0, self.dim), dtype=np.float32)
+        self._vectors = None
+        # a new file: readers of the saved pickle keep mapping the old one until they reload
+        self.generation += 1
+        write_vectors(vectors, self.generation)
+        self.ids = [self.ids[row] for row in alive]
+        self.times = [self.times[row] for row in alive]
+        self.rows = {item_id: row for row, item_id in enumerate(self.ids)}
+        self.buckets = [{} for _ in range(self.n_tables)]
+        self._bucket(range(len(alive)), vectors)
+
+    def query(self, text: Optional[str] = None, item_id: Optional[str] = None, k: int = 10,
+              prefix: Optional[str] = None, exact: bool = False) -> List[Tuple[str, float]]:
+        """Nearest (id, cosine similarity) pairs to a text or to an indexed item"""
+        if item_id is not None:
+            if item_id not in self.rows:
+                return []
+            q = np.asarray(self.vectors[self.rows[item_id]])
+        elif text:
+            q = self.embed([text])[0]
+        else:
+            return []
+
+        def keep(row):
+            found = self.ids[row]
+            return found is not None and found != item_id and (prefix is None or found.startswith(prefix))
+
+        candidates = set()
+        if not exact:
+            # multi-probe: also visit the buckets one bit flip away from the query's
+            for table, key in zip(self.buckets, self._signatures(q[None, :])[0].tolist()):
+                for probe in [key] + [key ^ int(bit) for bit in self._powers]:
+                    candidates.update(table.get(probe, ()))
+        rows = [row for row in candidates if keep(row)]
+        if len(rows) < k:
+            # too few collisions to trust the buckets: scan exactly instead
+            rows = [row for row in self.rows.values() if keep(row)]
+        if not rows:
+            return []
+
+        rows = np.asarray(rows)
+        sims = self.vectors[rows] @ q
+        if k < len(rows):
+            best = np.argpartition(-sims, k - 1)[:k]
+            rows, sims = rows[best], sims[best]
+        order = np.argsort(-sims)
+        return [(self.ids[row], float(sim)) for row, sim in zip(rows[order], sims[order])]
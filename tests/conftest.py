@@ -0,0 +1,63 @@
+import threading
+import http.server
+import pytest
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """
+    Local stand-in for an upstream API. Each path answers with its scripted
+    (status, headers, body) answers in turn, repeating the last one; a callable
+    answer is called with the handler and returns the triple.
+    """
+
+    def __init__(self, routes):
+        self.routes = {path: list(answers) for path, answers in routes.items()}
+        self.hits = []
+        super().__init__(("127.0.0.1", 0), StubHandler)
+
+    def url(self, path=""):
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+    def paths(self):
+        return [path for _, path, _ in self.hits]
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    # keep-alive, so tests can see the client reuse its pooled connections
+    protocol_version = "HTTP/1.1"
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        self.server.hits.append((self.command, self.path, dict(self.headers, _port=self.client_address[1])))
+        route = self.path.split("?", 1)[0]
+        answers = self.server.routes.get(self.path) or self.server.routes.get(route) or [(404, {}, b"")]
+        answer = answers.pop(0) if len(answers) > 1 else answers[0]
+        status, headers, body = answer(self) if callable(answer) else answer
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(routes):
+        server = StubServer(routes)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
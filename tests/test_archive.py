@@ -0,0 +1,182 @@
+import gzip
+import asyncio
+import pytest
+from app import archive as archive_module
+from app.archive import Archive, content_etag, decode_cursor, encode_cursor, MIN_COMPRESS_BYTES
+
+HTML = "<html><body>" + "<p>Issue body</p>" * 200 + "</body></html>"
+
+
+class FakeDynamo:
+    """The newsletter table: query_page over the type/created index and get_item by id"""
+
+    def __init__(self, items):
+        self.items = {item["newsletterId"]: item for item in items}
+        self.reads = []
+
+    def query_page(self, table, condition, values, expression_names=None, index_name=None, projection=None,
+                   limit=None, start_key=None, newest_first=False):
+        self.reads.append(("query", start_key))
+        rows = sorted((item for item in self.items.values() if item["type"] == values[":type"]
+                       and values.get(":since", "") <= item["created"] <= values.get(":until", "9999")),
+                      key=lambda item: item["created"], reverse=newest_first)
+        if start_key:
+            rows = rows[[row["newsletterId"] for row in rows].index(start_key["newsletterId"]) + 1:]
+        page = [{"newsletterId": row["newsletterId"], "type": row["type"], "created": row["created"]}
+                for row in rows[:limit]]
+        last_key = page[-1] if len(rows) > limit else None
+        return page, last_key
+
+    def get_item(self, table, key, raise_errors=False, projection=None):
+        self.reads.append(("get", projection))
+        item = self.items.get(key["newsletterId"], {})
+        return {projection: item[projection]} if projection and projection in item else dict(item)
+
+    def save(self, newsletter_id, content, created="2026-01-05", issue_type="daily"):
+        self.items[newsletter_id] = {"newsletterId": newsletter_id, "type": issue_type, "created": created,
+                                     "content": content, "etag": content_etag(content)}
+
+
+@pytest.fixture
+def dynamo():
+    dynamo = FakeDynamo([])
+    for day in range(1, 6):
+        dynamo.save(f"nl-{day}", HTML.replace("Issue", f"Issue {day}"), created=f"2026-01-0{day}")
+    dynamo.save("nl-small", "<p>short</p>", created="2026-01-06", issue_type="weekly")
+    return dynamo
+
+
+@pytest.fixture
+def archive(dynamo):
+    return Archive(lambda: dynamo)
+
+
+def test_cursor_round_trip_and_rejection():
+    key = {"newsletterId": "nl-1", "type": "daily", "created": "2026-01-01"}
+    assert decode_cursor(encode_cursor(key)) == key
+    assert encode_cursor(None) is None
+    for bad in ("not-a-cursor", encode_cursor({"a": 1})):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_list_pages_newest_first_and_follows_the_cursor(archive):
+    first = archive.list_issues("daily", limit=2)
+    assert [i["newsletterId"] for i in first["issues"]] == ["nl-5", "nl-4"]
+    second = archive.list_issues("daily", limit=2, cursor=first["next_cursor"])
+    assert [i["newsletterId"] for i in second["issues"]] == ["nl-3", "nl-2"]
+    last = archive.list_issues("daily", limit=2, cursor=second["next_cursor"])
+    assert [i["newsletterId"] for i in last["issues"]] == ["nl-1"] and last["next_cursor"] is None
+    ranged = archive.list_issues("daily", since="2026-01-02", until="2026-01-03")
+    assert [i["newsletterId"] for i in ranged["issues"]] == ["nl-3", "nl-2"]
+
+
+def test_pages_and_issues_are_cached(archive, dynamo):
+    archive.list_issues("daily", limit=2)
+    archive.list_issues("daily", limit=2)
+    assert archive.get_issue("nl-1") is archive.get_issue("nl-1")
+    assert archive.get_issue("nl-404") is None and archive.get_issue("nl-404") is None
+    assert [kind for kind, _ in dynamo.reads] == ["query", "get", "get"]
+
+
+def test_failures_propagate_and_are_not_cached(archive, dynamo):
+    def broken(*args, **kwargs):
+        raise ConnectionError("throttled")
+
+    get_item, dynamo.get_item = dynamo.get_item, broken
+    with pytest.raises(ConnectionError):
+        archive.get_issue("nl-1")
+    dynamo.get_item = get_item
+    assert archive.get_issue("nl-1").newsletter_id == "nl-1"
+
+
+def test_save_in_process_invalidates(archive, dynamo):
+    old = archive.get_issue("nl-1")
+    archive.list_issues("daily")
+    dynamo.save("nl-1", "<p>re-saved</p>", created="2026-01-01")
+    archive.invalidate("nl-1")
+    assert archive.get_issue("nl-1").etag != old.etag
+    assert len(archive.pages) == 0
+
+
+def test_resave_by_another_process_is_revalidated(dynamo):
+    archive = Archive(lambda: dynamo, revalidate=0)
+    old = archive.get_issue("nl-1")
+    assert archive.get_issue("nl-1") is old
+    assert dynamo.reads[-1] == ("get", "etag")
+    dynamo.save("nl-1", "<p>re-saved</p>", created="2026-01-01")
+    fresh = archive.get_issue("nl-1")
+    assert fresh.body == b"<p>re-saved</p>" and fresh.etag == content_etag("<p>re-saved</p>")
+
+
+def test_encodings(archive):
+    issue = archive.get_issue("nl-1")
+    assert issue.encodings()[-1] == "gzip"
+    assert gzip.decompress(issue.encoded("gzip")) == issue.body
+    assert issue.encoded("gzip") is issue.encoded("gzip")
+    small = archive.get_issue("nl-small")
+    assert len(small.body) < MIN_COMPRESS_BYTES and small.encodings() == []
+
+
+@pytest.fixture
+def client(archive, monkeypatch):
+    from launch import app
+    from router import routes
+    monkeypatch.setattr(routes, "archive", archive)
+    return app.test_client()
+
+
+def fetch(client, path, headers=None):
+    async def call():
+        response = await client.get(path, headers=headers or {})
+        return response.status_code, response.headers, await response.get_data()
+    return asyncio.run(call())
+
+
+def test_route_paginates(client):
+    import json
+    status, headers, body = fetch(client, "/archive/newsletters?type=daily&limit=3")
+    page = json.loads(body)
+    assert status == 200 and headers["Cache-Control"] == "public, max-age=60"
+    assert len(page["issues"]) == 3 and page["next_cursor"]
+    status, _, body = fetch(client, f"/archive/newsletters?type=daily&limit=3&cursor={page['next_cursor']}")
+    assert [i["newsletterId"] for i in json.loads(body)["issues"]] == ["nl-2", "nl-1"]
+    assert fetch(client, "/archive/newsletters?type=daily&cursor=garbage")[0] == 400
+    assert fetch(client, "/archive/newsletters?type=monthly")[0] == 400
+
+
+def test_route_answers_304_for_a_matching_etag(client):
+    status, headers, _ = fetch(client, "/archive/newsletters/nl-1")
+    assert status == 200
+    etag = headers["ETag"]
+    status, headers, body = fetch(client, "/archive/newsletters/nl-1", {"If-None-Match": etag})
+    assert status == 304 and body == b"" and headers["ETag"] == etag
+    assert fetch(client, "/archive/newsletters/nl-1", {"If-None-Match": '"other"'})[0] == 200
+
+
+def test_route_negotiates_content_encoding(client):
+    status, headers, body = fetch(client, "/archive/newsletters/nl-1", {"Accept-Encoding": "gzip"})
+    assert headers["Content-Encoding"] == "gzip" and "Accept-Encoding" in headers["Vary"]
+    assert b"Issue 1 body" in gzip.decompress(body)
+
+    brotli = pytest.importorskip("brotli")
+    status, headers, body = fetch(client, "/archive/newsletters/nl-1", {"Accept-Encoding": "gzip, br"})
+    assert headers["Content-Encoding"] == "br"
+    assert b"Issue 1 body" in brotli.decompress(body)
+
+    status, headers, body = fetch(client, "/archive/newsletters/nl-1", {"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in headers and b"Issue 1 body" in body
+    status, headers, _ = fetch(client, "/archive/newsletters/nl-small", {"Accept-Encoding": "gzip, br"})
+    assert "Content-Encoding" not in headers
+
+
+def test_route_reports_unavailable_archive_as_json_503(client, dynamo):
+    import json
+
+    def broken(*args, **kwargs):
+        raise ConnectionError("no credentials")
+
+    dynamo.get_item = broken
+    status, _, body = fetch(client, "/archive/newsletters/nl-3")
+    assert status == 503 and json.loads(body)["status"] == "error"
+    assert fetch(client, "/archive/newsletters/nl-404")[0] == 503
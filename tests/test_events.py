@@ -0,0 +1,43 @@
+import calendar
+from datetime import date
+from db_handler.event_index import event_key
+from services.event_service import parse_event_date
+
+
+def day(year, month, dom):
+    return float(calendar.timegm(date(year, month, dom).timetuple()))
+
+
+def test_event_key_collapses_title_variants_on_the_same_day():
+    starts = day(2026, 3, 15)
+    assert event_key("NeurIPS 2026: Main Conference", starts) == \
+        event_key("neurips 2026 - main   conference", starts + 3600)
+    assert event_key("NeurIPS 2026", starts) != event_key("NeurIPS 2026", day(2026, 3, 16))
+
+
+def test_event_key_without_a_date():
+    assert event_key("Meetup", None) == "meetup|"
+
+
+def test_parse_event_date_formats():
+    assert parse_event_date("March 15, 2026") == day(2026, 3, 15)
+    assert parse_event_date("2026-03-15") == day(2026, 3, 15)
+    assert parse_event_date("Date: 15 March 2026, Berlin") == day(2026, 3, 15)
+
+
+def test_parse_event_date_keeps_the_first_day_of_a_range():
+    assert parse_event_date("15-17 March 2026") == day(2026, 3, 15)
+    assert parse_event_date("15 – 17 March 2026") == day(2026, 3, 15)
+
+
+def test_parse_event_date_unreadable():
+    assert parse_event_date("") is None
+    assert parse_event_date("to be announced") is None
+
+
+def test_parse_event_date_rejects_partial_or_relative_dates():
+    # dateutil would fill the missing fields from today
+    assert parse_event_date("March 2027") is None
+    assert parse_event_date("2026") is None
+    assert parse_event_date("Deadline in 3 days") is None
+    assert parse_event_date("March 15") is None
@@ -0,0 +1,74 @@
+import pytest
+from services.crawler.feed_reader import iter_entries, parse_date, STALE_RUN
+
+DAY = 24 * 60 * 60
+BASE = parse_date("Mon, 05 Jan 2026 12:00:00 GMT")
+
+
+def rss(*items, title="Example feed"):
+    body = "".join(
+        f"<item><title>{name}</title><link>https://example.com/{name}</link>"
+        + (f"<pubDate>{date}</pubDate>" if date else "")
+        + "<description>summary</description><category>ml</category></item>"
+        for name, date in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{title}</title>{body}</channel></rss>'.encode()
+
+
+def test_rss_entries_and_title():
+    meta = {}
+    entries = list(iter_entries(rss(("a", "Mon, 05 Jan 2026 12:00:00 GMT")), meta=meta))
+    assert meta["title"] == "Example feed"
+    assert entries == [{"title": "a", "description": "summary", "link": "https://example.com/a",
+                        "published": BASE, "author": None, "categories": ("ml",), "guid": None}]
+
+
+def test_atom_entries():
+    atom = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Atom feed</title>
+        <entry><title>a</title><link rel="alternate" href="https://example.com/a"/><id>urn:a</id>
+        <updated>2026-01-05T12:00:00Z</updated><author><name>Ann</name></author>
+        <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">full <b>text</b></div></content></entry></feed>"""
+    meta = {}
+    [entry] = iter_entries(atom, meta=meta)
+    assert meta["title"] == "Atom feed"
+    assert (entry["link"], entry["guid"], entry["author"], entry["published"]) == \
+        ("https://example.com/a", "urn:a", "Ann", BASE)
+    assert entry["description"] == "full text"
+
+
+def test_old_entries_are_skipped_and_undated_kept():
+    old = "Mon, 01 Dec 2025 12:00:00 GMT"
+    entries = list(iter_entries(rss(("new", "Mon, 05 Jan 2026 12:00:00 GMT"), ("old", old), ("undated", None)),
+                                since=BASE - DAY))
+    assert [e["title"] for e in entries] == ["new", "undated"]
+
+
+def test_parsing_stops_after_a_run_of_stale_entries():
+    old = "Mon, 01 Dec 2025 12:00:00 GMT"
+    items = [(f"old{i}", old) for i in range(STALE_RUN)] + [("late", "Mon, 05 Jan 2026 12:00:00 GMT")]
+    assert list(iter_entries(rss(*items), since=BASE - DAY)) == []
+
+
+def test_malformed_feed_raises():
+    from lxml import etree
+    with pytest.raises(etree.XMLSyntaxError):
+        list(iter_entries(b"<rss><channel><item></channel>"))
+
+
+def test_parse_date():
+    assert parse_date("2026-01-05T12:00:00Z") == BASE
+    assert parse_date("2026-01-05T12:00:00") == BASE
+    assert parse_date("yesterday") == 0.0
+    assert parse_date(None) == 0.0
+
+
+def test_crawler_entries_without_a_date_sort_last():
+    import feedparser
+    from services.crawler.rss_crawler import RssCrawler
+
+    crawler = RssCrawler()
+    crawler.feed_data = feedparser.parse(rss(("undated", None), ("old", "Sun, 04 Jan 2026 12:00:00 GMT"),
+                                             ("new", "Mon, 05 Jan 2026 12:00:00 GMT")))
+    entries = crawler.get_entries()
+    assert [entry["title"] for entry in entries] == ["new", "old", "undated"]
+    assert entries[-1]["timestamp"] is None
@@ -0,0 +1,84 @@
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from services.apps import gh_service
+from services.apps.gh_service import GitHubClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    for cache in (gh_service._tokens, gh_service._etags, gh_service._stats_cache):
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def key_pair(tmp_path):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem_path = tmp_path / "app.pem"
+    pem_path.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    return str(pem_path), key.public_key()
+
+
+def json_answer(body, status=200, headers=None):
+    return status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(body).encode()
+
+
+def test_app_jwt_and_installation_token_are_reused(serve, key_pair):
+    import jwt
+    pem_path, public_key = key_pair
+    expires = (datetime.now(timezone.utc) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    server = serve({"/app/installations/42/access_tokens": [json_answer({"token": "inst-1", "expires_at": expires})]})
+    client = GitHubClient(api_url=server.url(), pem_path=pem_path, client_id="app-1", installation_id="42")
+
+    app_jwt = client.app_jwt()
+    assert client.app_jwt() == app_jwt
+    assert jwt.decode(app_jwt, public_key, algorithms=["RS256"])["iss"] == "app-1"
+    assert client.installation_token() == client.installation_token() == "inst-1"
+    assert server.paths() == ["/app/installations/42/access_tokens"]
+    assert server.hits[0][2]["Authorization"] == f"Bearer {app_jwt}"
+
+
+def test_expiring_installation_token_is_reissued(serve, key_pair):
+    pem_path, _ = key_pair
+    soon = (datetime.now(timezone.utc) + timedelta(seconds=30)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    server = serve({"/app/installations/42/access_tokens": [json_answer({"token": "inst-1", "expires_at": soon})]})
+    client = GitHubClient(api_url=server.url(), pem_path=pem_path, client_id="app-1", installation_id="42")
+    client.installation_token()
+    client.installation_token()
+    assert len(server.hits) == 2
+
+
+def test_rest_get_revalidates_with_the_etag(serve):
+    def repo(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return json_answer({"full_name": "octo/cat"}, headers={"ETag": '"v1"'})
+
+    server = serve({"/repos/octo/cat": [repo]})
+    client = GitHubClient(api_url=server.url(), token="pat")
+    assert client.get("/repos/octo/cat") == {"full_name": "octo/cat"}
+    assert client.get("/repos/octo/cat") == {"full_name": "octo/cat"}
+    assert [headers.get("If-None-Match") for _, _, headers in server.hits] == [None, '"v1"']
+    assert server.hits[0][2]["Authorization"] == "Bearer pat"
+
+
+def test_repo_stats_batches_one_query_and_caches_it(serve):
+    def graphql(handler):
+        variables = json.loads(handler.body)["variables"]
+        assert (variables["o0"], variables["n0"], variables["o1"], variables["n1"]) == ("octo", "cat", "octo", "dog")
+        repo = {"stargazerCount": 10, "forkCount": 2, "pushedAt": "2026-01-05T00:00:00Z",
+                "repositoryTopics": {"nodes": [{"topic": {"name": "ml"}}]},
+                "defaultBranchRef": {"target": {"history": {"totalCount": 7}}}}
+        return json_answer({"data": {"r0": repo, "r1": None}})
+
+    server = serve({"/graphql": [graphql]})
+    client = GitHubClient(api_url=server.url(), token="pat")
+    stats = client.repo_stats(["octo/cat", "octo/dog", "octo/cat", "not-a-repo"])
+    assert stats == {"octo/cat": {"stars": "10", "forks": "2", "pushed_at": "2026-01-05T00:00:00Z",
+                                  "topics": ["ml"], "recent_commits": 7}}
+    assert client.repo_stats(["octo/dog", "octo/cat"]) == stats
+    assert server.paths() == ["/graphql"]
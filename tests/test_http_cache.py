@@ -0,0 +1,65 @@
+import time
+import pytest
+import db_handler.db
+from utils.http_client import HttpClient, ReplayMiss, freshness
+
+
+@pytest.fixture(autouse=True)
+def http_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_handler.db, "HTTP_CACHE_DIR", str(tmp_path / "http_cache"))
+
+
+def test_record_then_replay_without_upstream(serve):
+    server = serve({"/feed": [(200, {"Content-Type": "application/rss+xml"}, b"<rss/>")]})
+    url = server.url("/feed")
+    HttpClient(cache_mode="record").get(url)
+    server.shutdown()
+
+    replayed = HttpClient(cache_mode="replay").get(url)
+    assert replayed.status_code == 200 and replayed.content == b"<rss/>"
+    assert replayed.headers["Content-Type"] == "application/rss+xml"
+    with pytest.raises(ReplayMiss):
+        HttpClient(cache_mode="replay").get(server.url("/never-recorded"))
+
+
+def test_replay_answers_posts_by_method_and_url(serve):
+    server = serve({"/graphql": [(200, {}, b"{}")]})
+    HttpClient(cache_mode="record").post(server.url("/graphql"), json={"date": "2026-01-01"})
+    replayed = HttpClient(cache_mode="replay").post(server.url("/graphql"), json={"date": "2026-02-01"})
+    assert replayed.content == b"{}"
+
+
+def test_cache_mode_honours_cache_control(serve):
+    server = serve({"/fresh": [(200, {"Cache-Control": "max-age=60"}, b"a")],
+                    "/nostore": [(200, {"Cache-Control": "no-store"}, b"b")]})
+    client = HttpClient(cache_mode="cache")
+    for _ in range(2):
+        client.get(server.url("/fresh"))
+        client.get(server.url("/nostore"))
+    assert server.paths() == ["/fresh", "/nostore", "/nostore"]
+
+
+def test_cache_mode_respects_the_call_site_bound(serve, monkeypatch):
+    server = serve({"/feed": [(200, {"Cache-Control": "max-age=3600"}, b"a")]})
+    client = HttpClient(cache_mode="cache")
+    client.get(server.url("/feed"), disk_ttl=60)
+    clock = time.time() + 120
+    monkeypatch.setattr("utils.http_client.time.time", lambda: clock)
+    client.get(server.url("/feed"), disk_ttl=60)
+    assert len(server.hits) == 2
+
+
+def test_cache_mode_skips_conditional_requests(serve):
+    server = serve({"/repo": [(200, {"ETag": '"v1"'}, b"{}")]})
+    client = HttpClient(cache_mode="cache")
+    client.get(server.url("/repo"))
+    client.get(server.url("/repo"), headers={"If-None-Match": '"v1"'})
+    assert len(server.hits) == 2
+
+
+def test_freshness():
+    assert freshness({"Cache-Control": "max-age=100", "Age": "30"}) == 70
+    assert freshness({"Cache-Control": "private, max-age=100"}) == 0
+    assert freshness({"Expires": "Thu, 01 Jan 1970 00:00:00 GMT"}) == 0
+    assert freshness({"Expires": "not a date"}) == 0
+    assert freshness({}) is None
@@ -0,0 +1,90 @@
+import time
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+from utils import http_client as http_module
+from utils.http_client import HttpClient, TokenBucket, ResponseTooLarge
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    # retries back off without actually sleeping
+    monkeypatch.setattr(http_module.random, "uniform", lambda low, high: 0.0)
+
+
+def test_token_bucket_allows_the_burst_then_paces():
+    bucket = TokenBucket(rate=20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.04
+    for _ in range(2):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_hosts_are_paced_with_their_own_rate(serve):
+    server = serve({"/a": [(200, {}, b"")]})
+    host = server.url().split("//", 1)[1]
+    client = HttpClient(rates={host: (20, 1)})
+    start = time.monotonic()
+    for _ in range(3):
+        client.get(server.url("/a"))
+    assert time.monotonic() - start >= 0.09
+    assert client.stats[host]["requests"] == 3
+
+
+def test_connections_are_reused(serve):
+    server = serve({"/a": [(200, {}, b"ok")]})
+    client = HttpClient()
+    for _ in range(3):
+        client.get(server.url("/a"))
+    assert len({headers["_port"] for _, _, headers in server.hits}) == 1
+
+
+def test_retries_5xx_until_success(serve):
+    server = serve({"/flaky": [(503, {}, b""), (502, {}, b""), (200, {}, b"ok")]})
+    events = []
+    client = HttpClient(retries=3)
+    client.add_hook(events.append)
+    response = client.get(server.url("/flaky"))
+    assert response.status_code == 200 and response.content == b"ok"
+    assert len(server.hits) == 3
+    assert events[-1]["attempts"] == 3 and events[-1]["error"] is None
+
+
+def test_gives_up_after_retries_and_returns_last_answer(serve):
+    server = serve({"/down": [(503, {}, b"")]})
+    response = HttpClient(retries=2).get(server.url("/down"))
+    assert response.status_code == 503
+    assert len(server.hits) == 3
+
+
+def test_client_errors_are_not_retried(serve):
+    server = serve({"/missing": [(404, {}, b"")]})
+    assert HttpClient(retries=3).get(server.url("/missing")).status_code == 404
+    assert len(server.hits) == 1
+
+
+def test_backoff_honours_retry_after_and_caps_it():
+    client = HttpClient()
+    response = requests.Response()
+    response.headers = CaseInsensitiveDict({"Retry-After": "2"})
+    assert client._backoff(0, response) == 2.0
+    response.headers["Retry-After"] = "3600"
+    assert client._backoff(0, response) == http_module.BACKOFF_CAP
+    assert client._backoff(3, None) == 0.0
+
+
+def test_response_size_cap(serve):
+    server = serve({"/big": [(200, {}, b"x" * 2048)]})
+    with pytest.raises(ResponseTooLarge):
+        HttpClient(max_bytes=1024).get(server.url("/big"))
+
+
+def test_memory_cache_is_keyed_by_authorization(serve):
+    server = serve({"/me": [(200, {}, b"{}")]})
+    client = HttpClient()
+    for token in ("a", "a", "b"):
+        client.get(server.url("/me"), headers={"Authorization": token}, cache_ttl=60)
+    assert len(server.hits) == 2
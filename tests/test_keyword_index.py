@@ -0,0 +1,81 @@
+import random
+import pytest
+from services.apps import arx_service
+from services.apps.arx_service import ArxivScanner
+from services.keyword_index import KeywordIndex, tokenize, paper_fields
+
+
+def paper(paper_id, title, summary="", authors=("Ann Lee",), t=0.0):
+    return {"_id": paper_id, "title": title, "summary": summary, "authors": [{"name": a} for a in authors],
+            "_time": t}
+
+
+@pytest.fixture
+def index():
+    return KeywordIndex.from_papers([
+        paper("p1", "Diffusion models for video", "We scale diffusion.", t=1.0),
+        paper("p2", "Graph networks", "Diffusion on graphs.", t=2.0),
+        paper("p3", "Vision transformers", "Patches.", authors=("Diffusion Smith",), t=3.0),
+        paper("p4", "Diffusion policies", "Robots.", t=4.0),
+    ])
+
+
+def test_tokenize():
+    assert tokenize("GAN-based Text2Image, v2!") == ["gan", "based", "text2image", "v2"]
+    assert tokenize(None) == []
+
+
+def test_scores_sum_the_weights_of_matching_fields(index):
+    assert dict(index.search("diffusion", k=10)) == {"p1": 25.0, "p2": 5.0, "p3": 10.0, "p4": 20.0}
+    # each query term counts once per field, however often it appears
+    assert dict(index.search("diffusion video", k=1)) == {"p1": 45.0}
+
+
+def test_top_k_order_breaks_ties_by_recency(index):
+    assert [doc for doc, _ in index.search("diffusion", k=3)] == ["p1", "p4", "p3"]
+    index.add_paper(paper("p5", "Diffusion models for audio", "We scale diffusion.", t=5.0))
+    assert [doc for doc, _ in index.search("diffusion", k=2)] == ["p5", "p1"]
+
+
+def test_search_restricted_to_candidates(index):
+    assert index.search("diffusion", k=2, doc_ids=["p2", "p3"]) == [("p3", 10.0), ("p2", 5.0)]
+    assert index.search("diffusion", k=2, doc_ids=[]) == []
+
+
+def test_early_termination_matches_an_exhaustive_scan():
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(40)]
+    papers = [paper(f"p{i}", " ".join(rng.sample(words, 4)), " ".join(rng.sample(words, 8)), t=float(i))
+              for i in range(300)]
+    index = KeywordIndex.from_papers(papers)
+    for _ in range(50):
+        query = " ".join(rng.sample(words, 3))
+        exhaustive = sorted(((p["_id"], index.score_fields(query, paper_fields(p)), p["_time"]) for p in papers),
+                            key=lambda hit: (hit[1], hit[2]), reverse=True)
+        expected = [(doc, score) for doc, score, _ in exhaustive if score > 0][:10]
+        assert index.search(query, k=10) == expected
+
+
+def test_whole_tokens_only(index):
+    # the substring scorer this replaced matched "net" inside "networks" and "vision" inside "revision"
+    assert index.search("net", k=10) == []
+    index.add_paper(paper("p6", "A revision of attention"))
+    assert [doc for doc, _ in index.search("vision", k=10)] == ["p3"]
+
+
+def test_remove_and_prune(index):
+    index.add_paper(paper("p1", "Something else", t=1.0))
+    assert "p1" not in dict(index.search("diffusion", k=10))
+    assert index.prune(3.0) == 2
+    assert sorted(dict(index.search("diffusion", k=10))) == ["p3", "p4"]
+    assert "video" not in index.postings
+
+
+def test_rank_papers_uses_the_persisted_index(index, monkeypatch):
+    monkeypatch.setattr(arx_service, "load_paper_index", lambda: index)
+    monkeypatch.setattr(KeywordIndex, "from_papers", classmethod(lambda cls, papers: pytest.fail("rebuilt")))
+    candidates = [paper("p2", "Graph networks", "Diffusion on graphs.", t=2.0),
+                  paper("p4", "Diffusion policies", "Robots.", t=4.0),
+                  paper("new", "Diffusion everywhere", "Diffusion.", t=9.0)]
+    ranked = ArxivScanner("", top_n=5).rank_papers(candidates, method="search", query="diffusion")
+    assert [(p["_id"], score) for p, score in ranked] == [("new", 25.0), ("p4", 20.0), ("p2", 5.0)]
@@ -0,0 +1,61 @@
+import json
+import base64
+import pytest
+from services.apps import kg_service
+from services.apps.kg_service import KaggleScanner, PAGE_SIZE
+
+
+@pytest.fixture(autouse=True)
+def no_credentials(monkeypatch):
+    kg_service._list_cache.clear()
+    monkeypatch.delenv("KAGGLE_USERNAME", raising=False)
+    monkeypatch.delenv("KAGGLE_KEY", raising=False)
+    yield
+    kg_service._list_cache.clear()
+
+
+def competitions(page, count):
+    return [{"ref": f"comp-{page}-{i}", "title": f"Competition {page}-{i}", "deadline": "2026-12-31T23:59:00Z",
+             "reward": "$10,000"} for i in range(count)]
+
+
+def listing(pages):
+    def answer(handler):
+        page = int(handler.path.split("page=", 1)[1].split("&", 1)[0])
+        return 200, {"Content-Type": "application/json"}, json.dumps(pages.get(page, [])).encode()
+    return answer
+
+
+def test_pagination_stops_on_a_short_page(serve):
+    server = serve({"/competitions/list": [listing({1: competitions(1, PAGE_SIZE), 2: competitions(2, 3),
+                                                    3: competitions(3, PAGE_SIZE)})]})
+    found = KaggleScanner(server.url(), top_n=100).get_new_competitions_launch()
+    assert len(found) == PAGE_SIZE + 3
+    assert len(server.hits) == 2
+    assert found[0] == {"name": "Competition 1-0", "link": "https://www.kaggle.com/competitions/comp-1-0",
+                        "deadline": "2026-12-31", "reward": "10,000"}
+
+
+def test_pagination_stops_once_top_n_is_reached(serve):
+    server = serve({"/competitions/list": [listing({1: competitions(1, PAGE_SIZE), 2: competitions(2, PAGE_SIZE)})]})
+    assert len(KaggleScanner(server.url(), top_n=5).get_new_competitions_launch()) == 5
+    assert len(server.hits) == 1
+
+
+def test_listing_is_cached_within_the_ttl(serve):
+    server = serve({"/competitions/list": [listing({1: competitions(1, 2)})]})
+    first = KaggleScanner(server.url(), top_n=5).get_new_competitions_launch()
+    assert KaggleScanner(server.url(), top_n=5).get_new_competitions_launch() == first
+    assert len(server.hits) == 1
+    KaggleScanner(server.url(), top_n=5, category="featured").get_new_competitions_launch()
+    assert len(server.hits) == 2
+
+
+def test_credentials_are_sent_only_when_present(serve, tmp_path, monkeypatch):
+    server = serve({"/competitions/list": [listing({1: []})]})
+    KaggleScanner(server.url(), kaggle_cred_path=str(tmp_path)).get_new_competitions_launch()
+    assert "Authorization" not in server.hits[0][2]
+
+    (tmp_path / "kaggle.json").write_text(json.dumps({"username": "ann", "key": "secret"}))
+    KaggleScanner(server.url(), kaggle_cred_path=str(tmp_path), search="vision").get_new_competitions_launch()
+    assert server.hits[1][2]["Authorization"] == "Basic " + base64.b64encode(b"ann:secret").decode()
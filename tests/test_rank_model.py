@@ -0,0 +1,108 @@
+import pytest
+from db_handler import EngagementLog, save_rank_model, load_rank_model
+from services import research_service
+from services.apps.arx_service import ArxivScanner
+from services.rank_model import RankModel, paper_text, engagement_labels
+from services.research_service import ResearchService
+
+TOPICS = {
+    1: ["diffusion image generation", "image synthesis with diffusion", "text to image diffusion models",
+        "video diffusion generation", "latent diffusion for image editing"],
+    0: ["stock market volatility", "portfolio risk in equity markets", "bond market liquidity",
+        "market microstructure of stocks", "credit risk in bond portfolios"],
+}
+
+
+def paper(paper_id, title, t=0.0, **extra):
+    return {"_id": paper_id, "title": title, "summary": f"We study {title}.", "authors": [{"name": "Ann Lee"}],
+            "_time": t, **extra}
+
+
+def toy_set():
+    papers, labels = [], []
+    for label, titles in TOPICS.items():
+        for i, title in enumerate(titles):
+            papers.append(paper(f"{label}-{i}", title))
+            labels.append(label)
+    return papers, labels
+
+
+@pytest.fixture
+def trained():
+    model = RankModel()
+    papers, labels = toy_set()
+    for _ in range(20):
+        model.partial_fit(papers, labels)
+    return model
+
+
+def test_paper_text_is_the_same_for_raw_and_formatted_papers():
+    raw = paper("1", "Diffusion", summary="Abstract text")
+    formatted = {"title": "Diffusion", "abstract": "Abstract text", "authors": ["Ann Lee"]}
+    assert paper_text(raw) == paper_text(formatted) == "Diffusion Abstract text Ann Lee"
+
+
+def test_partial_fit_separates_a_separable_set(trained):
+    papers, labels = toy_set()
+    scores = trained.decision_function(papers)
+    assert [int(score > 0) for score in scores] == labels
+    unseen = trained.decision_function([paper("a", "diffusion for image generation"),
+                                        paper("b", "equity market risk")])
+    assert unseen[0] > 0 > unseen[1]
+
+
+def test_one_class_first_batch_leaves_the_model_untrained():
+    model = RankModel()
+    model.partial_fit([paper("1", "a"), paper("2", "b")], [1, 1])
+    assert model.trained == 0
+
+
+def test_engagement_labels_mark_clicked_papers_positive():
+    papers = [paper("1", "a", t=1.0), paper("2", "b", t=2.0), paper("3", "c", t=3.0)]
+    assert engagement_labels(papers, [4, 0, 0]).tolist() == [1, 0, 1]
+
+
+def test_save_and_load_round_trip(trained, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_rank_model(trained)
+    loaded = load_rank_model()
+    papers, _ = toy_set()
+    assert loaded.trained == trained.trained
+    assert loaded.decision_function(papers).tolist() == pytest.approx(trained.decision_function(papers).tolist())
+    # reused until the file changes
+    assert load_rank_model() is loaded
+
+
+def test_untrained_model_falls_back_to_the_per_run_svm():
+    scanner = ArxivScanner("")
+    papers = [paper(f"{label}-{i}", title, t=float(i + 5 * label))
+              for label, titles in TOPICS.items() for i, title in enumerate(titles)]
+    expected = [p["_id"] for p, _ in scanner.rank_papers(papers, method="svm")]
+    for model in (None, RankModel()):
+        scanner.rank_model = model
+        assert [p["_id"] for p, _ in scanner.rank_papers(papers, method="model")] == expected
+
+
+def test_rerank_without_a_model_keeps_upstream_scores_and_citations(tmp_path, monkeypatch):
+    log = EngagementLog(str(tmp_path / "engagement.db"))
+    monkeypatch.setattr(research_service, "engagement_log", lambda: log)
+    monkeypatch.setattr(research_service, "load_rank_model", lambda: None)
+    service = ResearchService(top_n=3)
+    assert not service.model_ready
+    formatted = [
+        {"title": "a", "url": "https://arxiv.org/abs/a", "score": 1.0},
+        {"title": "b", "url": "https://arxiv.org/abs/b", "score": 2.0},
+        {"title": "c", "url": "https://openreview.net/c", "score": 0.5, "citations": 30},
+    ]
+    assert [p["title"] for p in service._rerank(formatted[:2], formatted[2:])] == ["c", "b", "a"]
+
+
+def test_rerank_with_an_unfitted_model_uses_the_fallback(tmp_path, monkeypatch):
+    log = EngagementLog(str(tmp_path / "engagement.db"))
+    monkeypatch.setattr(research_service, "engagement_log", lambda: log)
+    monkeypatch.setattr(research_service, "load_rank_model", RankModel)
+    service = ResearchService(top_n=2)
+    assert not service.model_ready
+    formatted = [{"title": "a", "url": "https://arxiv.org/abs/a", "score": 1.0},
+                 {"title": "b", "url": "https://arxiv.org/abs/b", "score": 2.0}]
+    assert [p["title"] for p in service._rerank(formatted, None)] == ["b", "a"]
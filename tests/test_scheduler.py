@@ -0,0 +1,93 @@
+import time
+import pytest
+from datetime import datetime
+from app.scheduler import CronTrigger
+from db_handler import JobQueue, JobStatus
+
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("0 0 * * *", datetime(2026, 1, 5, 13, 30), datetime(2026, 1, 6, 0, 0)),
+    ("*/15 * * * *", datetime(2026, 1, 5, 13, 30, 20), datetime(2026, 1, 5, 13, 45)),
+    # 2026-01-05 is a monday
+    ("0 0 * * 1", datetime(2026, 1, 5, 0, 0), datetime(2026, 1, 12, 0, 0)),
+    ("0 9 * * 7", datetime(2026, 1, 5, 0, 0), datetime(2026, 1, 11, 9, 0)),
+    ("30 8 1 */3 *", datetime(2026, 2, 10), datetime(2026, 4, 1, 8, 30)),
+    # day-of-month and day-of-week both restricted: either one fires
+    ("0 0 13 * 5", datetime(2026, 1, 5), datetime(2026, 1, 9, 0, 0)),
+    ("0 0 29 2 *", datetime(2026, 1, 1), datetime(2028, 2, 29, 0, 0)),
+])
+def test_next_after(expression, after, expected):
+    assert CronTrigger(expression).next_after(after) == expected
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "0 0 32 * *", "5-1 * * * *", "*/0 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronTrigger(expression)
+
+
+def test_impossible_expression():
+    with pytest.raises(ValueError):
+        CronTrigger("0 0 31 2 *").next_after(datetime(2026, 1, 1))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+def test_claim_takes_due_jobs_once_in_order(queue):
+    now = time.time()
+    later = queue.enqueue("daily", run_at=now + 3600)
+    second = queue.enqueue("daily", {"n": 2}, run_at=now - 10)
+    first = queue.enqueue("weekly", {"n": 1}, run_at=now - 20)
+    jobs = queue.claim(limit=5)
+    assert [job["id"] for job in jobs] == [first, second]
+    assert jobs[0]["payload"] == {"n": 1}
+    assert all(job["status"] == JobStatus.RUNNING.value and job["attempts"] == 1 for job in jobs)
+    assert queue.claim(limit=5) == []
+    assert queue.claim(limit=0) == []
+    assert later not in [job["id"] for job in queue.claim()]
+
+
+def test_fail_requeues_with_backoff_until_retries_run_out(queue):
+    job_id = queue.enqueue("daily", max_retries=1)
+    queue.claim()
+    before = time.time()
+    assert queue.fail(job_id, "boom", backoff=60) == JobStatus.QUEUED.value
+    assert queue.claim() == []  # not due until the backoff passes
+
+    job = queue.get(job_id)
+    assert job["error"] == "boom"
+    assert before + 60 <= job["run_at"] <= time.time() + 60
+    with queue._connection() as conn:
+        conn.execute("UPDATE jobs SET run_at = 0 WHERE id = ?", (job_id,))
+    [job] = queue.claim()
+    assert job["attempts"] == 2
+    assert queue.fail(job_id, "boom again") == JobStatus.FAILED.value
+    assert queue.fail("unknown", "boom") == JobStatus.FAILED.value
+
+
+def test_dispatch_requeues_claimed_jobs_when_the_pool_is_broken(queue):
+    from concurrent.futures.process import BrokenProcessPool
+    from app.scheduler import Scheduler
+
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("a child process terminated abruptly")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut = True
+
+    scheduler = Scheduler(queue, {"daily": "app.main:send_daily"}, max_workers=2, retry_backoff=0)
+    broken = scheduler._pool = BrokenPool()
+    job_ids = [queue.enqueue("daily"), queue.enqueue("daily")]
+    try:
+        scheduler._dispatch()
+        assert broken.shut and scheduler._pool is not broken
+        for job_id in job_ids:
+            job = queue.get(job_id)
+            assert job["status"] == JobStatus.QUEUED.value and "Dispatch failed" in job["error"]
+        assert scheduler._running == {}
+    finally:
+        scheduler._pool.shutdown()
@@ -0,0 +1,58 @@
+import pytest
+from db_handler import SearchIndex
+from db_handler.search_index import match_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    index.add([
+        {"key": "n1", "kind": "news", "title": "Diffusion transformers scale", "body": "a new model",
+         "published": 200.0},
+        {"key": "p1", "kind": "paper", "title": "Graph networks", "body": "diffusion on graphs", "published": 100.0},
+        {"key": "r1", "kind": "repo", "title": "transformer toolkit", "body": "", "published": None},
+    ])
+    return index
+
+
+def test_match_query_quotes_words_and_keeps_prefixes():
+    assert match_query("diffusion transform*") == '"diffusion" "transform"*'
+    # fts5 syntax typed by a user is matched as plain words
+    assert match_query('NOT "a" OR b:c (d)') == '"NOT" "a" "OR" "b" "c" "d"'
+    assert match_query("  ") == ""
+
+
+def test_title_hits_rank_first(index):
+    found = index.search("diffusion")
+    assert found["total"] == 2
+    assert [r["key"] for r in found["results"]] == ["n1", "p1"]
+    assert "<mark>" in found["results"][1]["snippet"]
+
+
+def test_prefix_stemming_and_filters(index):
+    assert {r["key"] for r in index.search("transform*")["results"]} == {"n1", "r1"}
+    assert [r["key"] for r in index.search("diffusion", kinds=["paper"])["results"]] == ["p1"]
+    assert [r["key"] for r in index.search("diffusion", since=150.0)["results"]] == ["n1"]
+    assert index.search("")["total"] == 0
+
+
+def test_paging(index):
+    first = index.search("transform*", per_page=1)
+    second = index.search("transform*", page=2, per_page=1)
+    assert first["total"] == second["total"] == 2
+    assert first["results"][0]["key"] != second["results"][0]["key"]
+
+
+def test_add_skips_known_keys_unless_replacing(index):
+    doc = {"key": "n1", "kind": "news", "title": "Renamed", "body": ""}
+    assert index.add([doc]) == 0
+    assert index.search("renamed")["total"] == 0
+    assert index.add([doc], replace=True) == 1
+    assert [r["key"] for r in index.search("renamed")["results"]] == ["n1"]
+    assert index.search("scale")["total"] == 0
+
+
+def test_prune_by_kind_and_age(index):
+    assert index.prune(150.0, ["news", "paper"]) == 1
+    assert len(index) == 2
+    assert index.search("graph")["total"] == 0
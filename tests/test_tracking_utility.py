@@ -0,0 +1,20 @@
+from utils.tracking_utility import sign, verify
+
+
+def test_signature_round_trip():
+    signature = sign("news-abc", "daily-2026-01-05", "https://example.com/a")
+    assert len(signature) == 16
+    assert verify(signature, "news-abc", "daily-2026-01-05", "https://example.com/a")
+
+
+def test_tampered_parts_or_signature_fail():
+    signature = sign("news-abc", "daily-2026-01-05", "https://example.com/a")
+    assert not verify(signature, "news-abc", "daily-2026-01-05", "https://evil.example/a")
+    assert not verify(signature[:-1] + ("0" if signature[-1] != "0" else "1"),
+                      "news-abc", "daily-2026-01-05", "https://example.com/a")
+    assert not verify("", "news-abc")
+    assert not verify(None, "news-abc")
+
+
+def test_parts_are_delimited():
+    assert sign("ab", "c") != sign("a", "bc")
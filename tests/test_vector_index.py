@@ -0,0 +1,91 @@
+import asyncio
+import os
+import numpy as np
+import pytest
+from services.vector_index import VectorIndex
+from utils.utility import get_config
+
+TEXTS = {
+    "news-1": "Diffusion models generate video from text prompts",
+    "news-2": "New diffusion model generates high resolution video",
+    "news-3": "Central bank raises interest rates to fight inflation",
+    "news-4": "Inflation cools as interest rates stay high",
+    "paper-1": "Graph neural networks for molecule property prediction",
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    get_config()  # read the secrets file before leaving the repo root
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def index(data_dir):
+    index = VectorIndex()
+    index.add(list(TEXTS), list(TEXTS.values()), [float(i) for i in range(len(TEXTS))])
+    return index
+
+
+def test_stored_item_is_its_own_nearest_neighbour(index):
+    for item_id, text in TEXTS.items():
+        best, similarity = index.query(text=text, k=1)[0]
+        assert best == item_id
+        assert similarity == pytest.approx(1.0, abs=1e-5)
+
+
+def test_query_by_id_excludes_the_item_and_filters_by_prefix(index):
+    hits = index.query(item_id="news-1", k=3, prefix="news-")
+    assert [item_id for item_id, _ in hits][0] == "news-2"
+    assert "news-1" not in dict(hits) and "paper-1" not in dict(hits)
+    assert index.query(item_id="news-404") == []
+
+
+def test_results_survive_a_memmap_reload(index):
+    before = index.query(text="interest rates and inflation", k=3)
+    index.save()
+    reloaded = VectorIndex.load()
+    assert reloaded is not index
+    assert isinstance(reloaded.vectors, np.memmap)
+    assert reloaded.query(text="interest rates and inflation", k=3) == before
+
+
+def test_compaction_keeps_results_and_drops_old_files(index, data_dir):
+    index.save()
+    stale = VectorIndex.load()
+    index.add(["news-5"], ["Stocks rally as inflation eases"], [9.0])
+    index.remove(["news-2", "news-5"])
+    index.compact()
+    index.save()
+    reloaded = VectorIndex.load()
+    assert reloaded.generation == 1 and len(reloaded) == 4
+    assert reloaded.query(text=TEXTS["news-4"], k=1)[0][0] == "news-4"
+    # a reader still holding the previous pickle maps the previous generation, which is kept
+    assert stale.query(text=TEXTS["news-2"], k=1)[0][0] == "news-2"
+    assert sorted(os.listdir(data_dir / "data")) == ["vector_index.p", "vectors.1.f32", "vectors.f32"]
+    index.compact()
+    index.save()
+    assert sorted(os.listdir(data_dir / "data")) == ["vector_index.p", "vectors.1.f32", "vectors.2.f32"]
+
+
+def test_exact_and_lsh_queries_agree_on_the_best_match(index):
+    assert index.query(text=TEXTS["news-3"], k=1) == index.query(text=TEXTS["news-3"], k=1, exact=True)
+
+
+def test_similar_route(data_dir, monkeypatch):
+    from launch import app
+    monkeypatch.setitem(app.config, "QUART_RATE_LIMITER_ENABLED", False)
+    from utils.auth_utility import create_token
+    VectorIndex().save()
+    headers = {"Authorization": f"Bearer {create_token(get_config()['JWT']['user_id'])}"}
+
+    async def call(query):
+        response = await app.test_client().get(f"/internal/v1/similar?{query}", headers=headers)
+        return response.status_code, await response.get_json()
+
+    for query in ("kind=news&id=news-unknown", "kind=paper&id=unknown"):
+        status, body = asyncio.run(call(query))
+        assert status == 200 and body["results"] == []
+    assert asyncio.run(call("kind=news"))[0] == 400
+    assert asyncio.run(call("kind=repo&q=x"))[0] == 400
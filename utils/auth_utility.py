@@ -1,15 +1,11 @@
 import logging
 
 import jwt
-import configparser
 from functools import wraps
-from flask import request, jsonify
+from quart import request, jsonify
+from utils.utility import get_config
 from datetime import datetime, timedelta
 
-config = configparser.ConfigParser()
-config.read('db_handler/vault/secrets.ini')
-JWT_SECRET_KEY = config["JWT"]["token"]
-
 
 def create_token(user_id):
     payload = {
@@ -19,7 +15,7 @@ def create_token(user_id):
 
     token = jwt.encode(
         payload,
-        JWT_SECRET_KEY,
+        get_config()["JWT"]["token"],
         algorithm='HS256'
     )
     return token
@@ -27,7 +23,7 @@ def create_token(user_id):
 
 def token_required(f):
     @wraps(f)
-    def decorated(*args, **kwargs):
+    async def decorated(*args, **kwargs):
         token = None
 
         # Check for token in headers
@@ -42,7 +38,7 @@ def token_required(f):
 
         try:
             # Decode token
-            data = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
+            data = jwt.decode(token, get_config()["JWT"]["token"], algorithms=["HS256"])
             current_user = data['sub']
         except Exception as e:
             logging.info("Token error" + str(e))
@@ -51,6 +47,6 @@ def token_required(f):
                 'status': 'error'
             }), 401
 
-        return f(*args, **kwargs)
+        return await f(*args, **kwargs)
 
     return decorated
@@ -0,0 +1,356 @@
+import os
+import time
+import random
+import hashlib
+import asyncio
+import logging
+import threading
+import requests
+from functools import lru_cache, partial
+from concurrent.futures import Executor
+from collections import defaultdict
+from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+from urllib3.util.request import ACCEPT_ENCODING
+from requests.structures import CaseInsensitiveDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.cache import TTLCache
+from utils.utility import get_config
+from db_handler import save_http_response, load_http_response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 15
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RESPONSE_BYTES = 20 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# host -> (requests per second, burst); hosts not listed share DEFAULT_RATE each
+HOST_RATES = {
+    "export.arxiv.org": (1 / 3, 1),  # arXiv API terms: one request every three seconds
+    "github.com": (1, 4),
+    "api.github.com": (5, 10),
+    "huggingface.co": (5, 10),
+    "www.kaggle.com": (2, 4),
+    "api.producthunt.com": (2, 4)
+}
+DEFAULT_RATE = (5, 10)
+
+# disk cache modes, picked with AILERT_HTTP_CACHE (or [Http] cache_mode):
+#   off    - no disk cache
+#   cache  - successful GETs are kept on disk while fresh: Cache-Control max-age or Expires,
+#            else DEFAULT_DISK_TTL, bounded by the call's disk_ttl and never past DISK_TTL;
+#            conditional GETs (If-None-Match / If-Modified-Since) always go upstream
+#   record - every request goes upstream and every response is written, for fixtures
+#   replay - nothing goes upstream; responses come from disk and a miss is an error
+CACHE_MODES = ("off", "cache", "record", "replay")
+DISK_TTL = 6 * 60 * 60
+DEFAULT_DISK_TTL = 10 * 60
+# feeds are polled every sweep; a cached copy must not outlive a couple of them
+FEED_DISK_TTL = 5 * 60
+CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+
+
+def freshness(headers) -> Optional[float]:
+    """
+    Seconds a response may be reused, from its Cache-Control or Expires header;
+    0 when it must not be stored, None when the server says nothing.
+    """
+    directives = {}
+    for part in (headers.get("Cache-Control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    if directives.keys() & {"no-store", "no-cache", "private"}:
+        return 0.0
+    age = headers.get("Age")
+    age = float(age) if age and age.isdigit() else 0.0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name, "").isdigit():
+            return max(0.0, float(directives[name]) - age)
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            date = headers.get("Date")
+            now = parsedate_to_datetime(date).timestamp() if date else time.time()
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - now)
+        except (TypeError, ValueError):
+            # an invalid Expires means already expired
+            return 0.0
+    return None
+
+
+class ResponseTooLarge(requests.RequestException):
+    pass
+
+
+class ReplayMiss(requests.ConnectionError):
+    """Replay mode has no recorded response for a request"""
+
+
+class DiskCache:
+    """
+    Response store under the shared client, see the http cache section of db_handler/db.py.
+    Keys leave out the Authorization header, since tokens rotate between runs and a recording
+    has to replay with fresh credentials. Each response is also filed under its method and
+    url alone, so replay still answers POST bodies that carry the current date.
+    """
+
+    @staticmethod
+    def keys(method: str, url: str, body: Any) -> Tuple[str, str]:
+        exact = hashlib.sha256(repr((method, url, body)).encode()).hexdigest()
+        loose = hashlib.sha256(repr((method, url)).encode()).hexdigest()
+        return exact, loose
+
+    @staticmethod
+    def load(keys: Tuple[str, ...], fresh: bool = True) -> Optional[requests.Response]:
+        for key in keys:
+            record = load_http_response(key)
+            if record is None or (fresh and record["expires"] is not None and record["expires"] < time.time()):
+                continue
+            response = requests.Response()
+            response.status_code = record["status"]
+            response.reason = record["reason"]
+            response.url = record["url"]
+            response.headers = CaseInsensitiveDict(record["headers"])
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            response._content = record["content"]
+            return response
+        return None
+
+    @staticmethod
+    def save(keys: Tuple[str, ...], response: requests.Response, ttl: Optional[float] = None):
+        headers = {name: value for name, value in response.headers.items()
+                   # the stored body is already decoded
+                   if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        record = {"status": response.status_code, "reason": response.reason, "url": response.url,
+                  "headers": headers, "content": response.content, "stored": time.time(),
+                  "expires": time.time() + ttl if ttl else None}
+        for key in keys:
+            save_http_response(key, record)
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` requests per second with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpClient:
+    """
+    Process-wide HTTP client for every scanner.
+    Keeps pooled keep-alive connections per host, paces each host with a token bucket,
+    retries connection errors and 429/5xx answers with jittered exponential backoff
+    (honouring Retry-After), caps response sizes and can cache successful GETs.
+    Hooks receive one event dict per request for metrics. The async methods run the
+    same calls in a worker thread so coroutines never block the event loop.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, retries: int = MAX_RETRIES,
+                 max_bytes: int = MAX_RESPONSE_BYTES, pool_size: int = 8,
+                 rates: Optional[Dict[str, Tuple[float, int]]] = None, cache: Optional[Any] = None,
+                 cache_mode: str = "off"):
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown HTTP cache mode {cache_mode!r}, expected one of {CACHE_MODES}")
+        self.timeout = timeout
+        self.retries = retries
+        self.max_bytes = max_bytes
+        self.rates = {**HOST_RATES, **(rates or {})}
+        # anything with get(key, default) and set(key, value, ttl), keyed by request
+        self.cache = cache if cache is not None else TTLCache(30 * 60, maxsize=256)
+        self.cache_mode = cache_mode
+        self.disk = DiskCache()
+        self.session = requests.Session()
+        # pool_block caps concurrent connections per host at pool_size instead of opening extras
+        adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "AiLert"
+        # gzip/deflate always; br and zstd when urllib3 finds their decoders installed
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self.hooks: List[Callable[[Dict[str, Any]], None]] = []
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        self.hooks.append(hook)
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(*self.rates.get(host, DEFAULT_RATE))
+            return self._buckets[host]
+
+    def _emit(self, event: Dict[str, Any]):
+        with self._lock:
+            host_stats = self.stats[event["host"]]
+            host_stats["requests"] += 1
+            host_stats["retries"] += event["attempts"] - 1
+            host_stats["bytes"] += event["bytes"]
+            host_stats["cache_hits"] += int(event["cached"])
+            host_stats["errors"] += int(bool(event["error"]) or event["status"] >= 400)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                logger.error(f"HTTP metrics hook failed: {e}")
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(BACKOFF_CAP, float(retry_after))
+            except ValueError:
+                try:
+                    return min(BACKOFF_CAP, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        return min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _read(self, response: requests.Response, max_bytes: int):
+        """Read a streamed body, failing as soon as it grows past max_bytes"""
+        declared = response.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            response.close()
+            raise ResponseTooLarge(f"{response.url} declares {declared} bytes, over the {max_bytes} cap")
+        chunks, size = [], 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                response.close()
+                raise ResponseTooLarge(f"{response.url} exceeded the {max_bytes} byte cap")
+            chunks.append(chunk)
+        response._content = b"".join(chunks)
+
+    @staticmethod
+    def cache_key(method: str, url: str, params: Any = None, data: Any = None, json: Any = None,
+                  headers: Optional[Dict[str, str]] = None) -> Tuple:
+        prepared = requests.Request(method, url, params=params, data=data, json=json).prepare()
+        return method, prepared.url, prepared.body, (headers or {}).get("Authorization")
+
+    def request(self, method: str, url: str, *, params: Any = None, headers: Optional[Dict[str, str]] = None,
+                json: Any = None, data: Any = None, auth: Any = None, timeout: Optional[float] = None,
+                retries: Optional[int] = None, max_bytes: Optional[int] = None,
+                cache_ttl: Optional[float] = None, disk_ttl: Optional[float] = None) -> requests.Response:
+        """
+        Send a request and return the fully read response; status errors are left to the caller.
+        cache_ttl enables the in-memory cache for this request, keyed by method, final url, body
+        and Authorization header; only 200 answers are stored. The disk cache follows cache_mode;
+        disk_ttl (cache_ttl when unset) caps how long this call's response is served from disk.
+        """
+        host = urlparse(url).netloc
+        key = self.cache_key(method, url, params, data, json, headers)
+        disk_keys = self.disk.keys(*key[:3])
+        # a conditional request wants the server's answer; a stored 200 would hide its 304
+        disk_cached = (self.cache_mode == "cache" and method == "GET"
+                       and not any(name.lower() in CONDITIONAL_HEADERS for name in headers or {}))
+        cached = self.cache.get(key) if cache_ttl else None
+        if cached is None and self.cache_mode == "replay":
+            cached = self.disk.load(disk_keys, fresh=False)
+            if cached is None:
+                raise ReplayMiss(f"No recorded response for {method} {url}")
+        elif cached is None and disk_cached:
+            cached = self.disk.load(disk_keys[:1])
+        if cached is not None:
+            self._emit({"method": method, "host": host, "url": url, "status": cached.status_code,
+                        "elapsed": 0.0, "bytes": len(cached.content), "attempts": 1, "cached": True,
+                        "error": None})
+            return cached
+
+        retries = self.retries if retries is None else retries
+        start = time.monotonic()
+        response, error, attempt = None, None, 0
+        for attempt in range(retries + 1):
+            self._bucket(host).acquire()
+            try:
+                response = self.session.request(method, url, params=params, headers=headers, json=json, data=data,
+                                                auth=auth, timeout=timeout or self.timeout, stream=True)
+                self._read(response, max_bytes or self.max_bytes)
+                error = None
+            except ResponseTooLarge as e:
+                error = e
+                break
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            if error is None and response.status_code not in RETRY_STATUSES:
+                break
+            if attempt < retries:
+                time.sleep(self._backoff(attempt, response))
+
+        self._emit({"method": method, "host": host, "url": url,
+                    "status": response.status_code if response is not None and error is None else 0,
+                    "elapsed": time.monotonic() - start,
+                    "bytes": len(response.content) if response is not None and error is None else 0,
+                    "attempts": attempt + 1, "cached": False, "error": str(error) if error else None})
+        if error is not None:
+            raise error
+        if cache_ttl and response.status_code == 200:
+            self.cache.set(key, response, cache_ttl)
+        if self.cache_mode == "record":
+            self.disk.save(disk_keys, response)
+        elif disk_cached and response.status_code == 200:
+            ttl = self._disk_ttl(response, disk_ttl or cache_ttl)
+            if ttl > 0:
+                self.disk.save(disk_keys[:1], response, ttl)
+        return response
+
+    @staticmethod
+    def _disk_ttl(response: requests.Response, bound: Optional[float]) -> float:
+        ttl = freshness(response.headers)
+        if ttl is None:
+            ttl = bound or DEFAULT_DISK_TTL
+        elif bound:
+            ttl = min(ttl, bound)
+        return min(ttl, DISK_TTL)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    async def arequest(self, method: str, url: str, executor: Optional[Executor] = None,
+                       **kwargs) -> requests.Response:
+        """request() on a worker thread; pass an executor sized to the caller's concurrency to go past the default pool's"""
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, partial(self.request, method, url, **kwargs))
+
+    async def aget(self, url: str, executor: Optional[Executor] = None, **kwargs) -> requests.Response:
+        return await self.arequest("GET", url, executor, **kwargs)
+
+    async def apost(self, url: str, executor: Optional[Executor] = None, **kwargs) -> requests.Response:
+        return await self.arequest("POST", url, executor, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def http_client() -> HttpClient:
+    """The shared client, configured from the [Http] section of the secrets file"""
+    config = get_config()
+    return HttpClient(
+        cache_mode=os.environ.get("AILERT_HTTP_CACHE") or config.get("Http", "cache_mode", fallback="off"),
+        timeout=config.getfloat("Http", "timeout", fallback=DEFAULT_TIMEOUT),
+        retries=config.getint("Http", "retries", fallback=MAX_RETRIES),
+        max_bytes=int(config.getfloat("Http", "max_response_mb", fallback=MAX_RESPONSE_BYTES / 2 ** 20) * 2 ** 20),
+        pool_size=config.getint("Http", "pool_size", fallback=8)
+    )
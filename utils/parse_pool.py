@@ -0,0 +1,121 @@
+import os
+import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from utils.utility import get_config
+
+logger = logging.getLogger(__name__)
+
+# payloads per task: enough to amortize pickling and the round trip, few enough to spread over the workers
+DEFAULT_CHUNK_SIZE = 8
+
+
+def _noop(_):
+    return None
+
+
+def _run_chunk(func: Callable, chunk: List[Tuple]) -> List[Any]:
+    return [func(*args) for args in chunk]
+
+
+class ParsePool:
+    """
+    Process pool for the CPU-bound half of a crawl.
+    Threads fetch raw bytes; the parse functions run here, off the GIL, on chunks of
+    payloads submitted while the remaining fetches are still in flight. Functions must
+    be module-level, take picklable arguments, return compact picklable records and
+    handle their own errors. With one worker, or where processes cannot be started,
+    chunks run inline in the calling thread.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 1:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(self.workers)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Parse pool unavailable, parsing inline: {str(e)}")
+                    self.workers = 1
+            return self._executor
+
+    def start(self) -> "ParsePool":
+        """
+        Bring every worker up now. Call before starting fetch threads: forked workers
+        then never inherit a lock some fetch thread happened to hold.
+        """
+        pool = self._pool()
+        if pool is not None:
+            try:
+                list(pool.map(_noop, range(self.workers)))
+            except BrokenProcessPool as e:
+                logger.error(f"Parse pool failed to start: {str(e)}")
+                self.shutdown()
+        return self
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def imap(self, func: Callable, payloads: Iterable[Tuple]) -> Iterator[Any]:
+        """
+        func(*payload) for every payload, in order. `payloads` may be a generator fed by
+        in-flight fetches: each chunk is submitted as soon as it fills.
+        """
+        pending = []
+
+        def flush(chunk):
+            pool = self._pool()
+            if pool is not None:
+                try:
+                    pending.append((pool.submit(_run_chunk, func, chunk), chunk))
+                    return
+                except BrokenProcessPool:
+                    self.shutdown()
+            pending.append((None, chunk))
+
+        chunk = []
+        for payload in payloads:
+            chunk.append(payload)
+            if len(chunk) >= self.chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+        for future, chunk in pending:
+            if future is None:
+                yield from _run_chunk(func, chunk)
+                continue
+            try:
+                yield from future.result()
+            except BrokenProcessPool as e:
+                # a worker died (OOM, signal); finish this chunk inline and start a fresh pool next time
+                logger.error(f"Parse pool broke, parsing {len(chunk)} payloads inline: {str(e)}")
+                self.shutdown()
+                yield from _run_chunk(func, chunk)
+
+    def map(self, func: Callable, payloads: Iterable[Tuple]) -> List[Any]:
+        return list(self.imap(func, payloads))
+
+
+@lru_cache(maxsize=1)
+def parse_pool() -> ParsePool:
+    """The shared pool, configured from the [Parse] section of the secrets file"""
+    config = get_config()
+    return ParsePool(
+        workers=int(os.environ.get("AILERT_PARSE_WORKERS") or config.getint("Parse", "workers", fallback=0)),
+        chunk_size=config.getint("Parse", "chunk_size", fallback=DEFAULT_CHUNK_SIZE)
+    )
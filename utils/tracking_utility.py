@@ -0,0 +1,48 @@
+import hmac
+import hashlib
+from typing import Optional
+from urllib.parse import urlencode
+from utils.utility import get_config, generate_deterministic_id
+
+
+def item_key(kind: str, link: str) -> str:
+    """Engagement key of a newsletter item; news keys match the ingestion store's"""
+    return generate_deterministic_id({"key": link}, ["key"], prefix=kind)
+
+
+def tracking_base() -> Optional[str]:
+    """Public base URL of the tracking endpoints, None when tracking is not configured"""
+    base = get_config().get("Tracking", "base_url", fallback=None)
+    return base.rstrip("/") if base else None
+
+
+def sign(*parts: str) -> str:
+    # links are signed so the click endpoint cannot be used as an open redirect
+    secret = get_config()["JWT"]["token"].encode()
+    return hmac.new(secret, "|".join(parts).encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def verify(signature: str, *parts: str) -> bool:
+    return hmac.compare_digest(signature or "", sign(*parts))
+
+
+def click_link(link: str, key: str, edition: str) -> str:
+    base = tracking_base()
+    if not base or not link:
+        return link
+    return f"{base}/t/c?" + urlencode({"k": key, "e": edition, "u": link, "s": sign(key, edition, link)})
+
+
+def open_pixel(edition: str) -> str:
+    base = tracking_base()
+    if not base:
+        return ""
+    src = f"{base}/t/o/{edition}.gif?" + urlencode({"s": sign(edition)})
+    return f'<img src="{src}" width="1" height="1" alt="" style="display:none">'
+
+
+def feedback_link(edition: str, vote: str) -> str:
+    base = tracking_base()
+    if not base:
+        return "#"
+    return f"{base}/t/f?" + urlencode({"e": edition, "v": vote, "s": sign(edition, vote)})
@@ -3,11 +3,25 @@ import re
 import csv
 import hashlib
 import logging
+import configparser
 from pathlib import Path
+from functools import lru_cache
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 
+SECRETS_PATH = 'db_handler/vault/secrets.ini'
+
+
+@lru_cache(maxsize=None)
+def get_config(path: str = SECRETS_PATH) -> configparser.ConfigParser:
+    """Parse the secrets file once per process and share the result"""
+    config = configparser.ConfigParser()
+    config.read(path)
+    return config
+
+
+@lru_cache(maxsize=8)
 def load_template(template_path="static/newsletter.html") -> str:
     with open(template_path, 'r') as f:
         return f.read()